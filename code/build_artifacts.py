@@ -0,0 +1,232 @@
+# code/build_artifacts.py
+# ============================================================
+# Golden Unification — cached runner for generated shared/*.tex artifacts
+# Writes: ../shared/paperIX_null_pvalues.tex, paperIX_null_v3.tex,
+#         paperV_mixing_results.tex (whichever generators are selected)
+# ============================================================
+#
+# The rx_*.ps1 build chain used to rerun every numerical script on every
+# paper rebuild. This runner content-addresses each generator instead:
+#
+#   key = sha256( script source + declared dependency files + CLI args )
+#
+# The script source covers defaults; CLI args cover N/seed/sigma; declared
+# deps cover data files and the shared golden_unification modules (scan
+# box, observed set OBS_MASSES_MEV, anchored fit). None of the generators
+# reads data/pdg/sm_masses_latest.csv, so a PDG refresh leaves every key
+# unchanged; a change to the hard-coded masses is caught through lattice.py.
+#
+# On a hit, the cached output is copied into shared/ without running
+# anything. On a miss, only the affected generators run, in parallel.
+#
+# Usage examples (run from repo root):
+#   python .\code\build_artifacts.py
+#   python .\code\build_artifacts.py null_v2 mixing --jobs 2
+#   python .\code\build_artifacts.py --list
+#   python .\code\build_artifacts.py --force
+#
+# Notes:
+# - shared/paperIII_results.tex has no numerical generator in this repo (it
+#   is written verbatim by write_paperIII_results.ps1), so it is not managed here.
+# - Cached outputs live in code/.artifact_cache/<key>/ (git-ignored);
+#   deleting that directory is always safe.
+#
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.normpath(os.path.join(HERE, ".."))
+SHARED = os.path.join(ROOT, "shared")
+
+CACHE_VERSION = 2
+
+
+@dataclass(frozen=True)
+class Generator:
+    name: str
+    script: str               # path relative to code/
+    out_name: str             # file name in shared/
+    out_flag: str             # CLI flag that receives the output path
+    args: Tuple[str, ...] = ()
+    deps: Tuple[str, ...] = field(default=())   # extra inputs, relative to repo root
+
+# Arguments reproduce the committed shared/*.tex files byte for byte (checked
+# for all three; null_v2 needs the legacy single RNG stream for that).
+GENERATORS: Dict[str, Generator] = {
+    "null_v2": Generator(
+        name="null_v2",
+        script="null_tests_fast_v2.py",
+        out_name="paperIX_null_pvalues.tex",
+        out_flag="--out-tex",
+        args=("--N", "2000", "--seed", "1", "--sigma", "0.15", "0.30", "0.50", "--streams", "legacy"),
+        deps=(
+            "code/golden_unification/lattice.py",
+            "code/golden_unification/scoring.py",
+            "code/golden_unification/ensembles.py",
+            "code/golden_unification/blocks.py",
+        ),
+    ),
+    "null_v3": Generator(
+        name="null_v3",
+        script="null_tests_v3.py",
+        out_name="paperIX_null_v3.tex",
+        out_flag="--out",
+        args=("--N", "2000", "--seed", "12345", "--sigma_list", "0.150,0.300,0.500"),
+        deps=("code/golden_unification/lattice.py",),
+    ),
+    "mixing": Generator(
+        name="mixing",
+        script="verify_mixing.py",
+        out_name="paperV_mixing_results.tex",
+        out_flag="--out_tex",
+        args=("--write_tex",),
+        deps=("code/golden_unification/mixing.py", "code/golden_unification/blocks.py"),
+    ),
+}
+
+
+# ----------------------------
+# Hashing / cache layout
+# ----------------------------
+
+def _sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def generator_inputs(gen: Generator) -> Dict[str, object]:
+    """Everything that determines a generator's output (recorded in the manifest)."""
+    files = {"code/" + gen.script: _sha256_file(os.path.join(HERE, gen.script))}
+    for dep in gen.deps:
+        files[dep] = _sha256_file(os.path.join(ROOT, dep))
+    return {
+        "cache_version": CACHE_VERSION,
+        "generator": gen.name,
+        "args": list(gen.args),
+        "files": files,
+    }
+
+
+def generator_key(gen: Generator) -> str:
+    blob = json.dumps(generator_inputs(gen), sort_keys=True).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()
+
+
+def default_cache_dir() -> str:
+    return os.path.join(HERE, ".artifact_cache")
+
+
+def cached_output(cache_dir: str, gen: Generator, key: str) -> Optional[str]:
+    path = os.path.join(cache_dir, key, gen.out_name)
+    if os.path.exists(path) and os.path.exists(os.path.join(cache_dir, key, "manifest.json")):
+        return path
+    return None
+
+
+# ----------------------------
+# Running generators
+# ----------------------------
+
+@dataclass
+class BuildResult:
+    name: str
+    key: str
+    hit: bool
+    seconds: float
+    out_path: str
+
+
+def run_generator(gen: Generator, key: str, cache_dir: str) -> None:
+    """Run one generator into a fresh cache slot; publish the slot only on success."""
+    final_dir = os.path.join(cache_dir, key)
+    work_dir = final_dir + f".tmp{os.getpid()}_{gen.name}"
+    shutil.rmtree(work_dir, ignore_errors=True)
+    os.makedirs(work_dir)
+    out = os.path.join(work_dir, gen.out_name)
+    cmd = [sys.executable, os.path.join(HERE, gen.script), *gen.args, gen.out_flag, out]
+    proc = subprocess.run(cmd, cwd=HERE, capture_output=True, text=True)
+    with open(os.path.join(work_dir, "stdout.log"), "w", encoding="utf-8") as f:
+        f.write(proc.stdout)
+        f.write(proc.stderr)
+    if proc.returncode != 0 or not os.path.exists(out):
+        raise RuntimeError(
+            f"{gen.name}: {gen.script} failed (exit {proc.returncode}); see {work_dir}/stdout.log"
+        )
+    with open(os.path.join(work_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump({"key": key, "inputs": generator_inputs(gen), "cmd": cmd[1:]}, f, indent=2)
+    shutil.rmtree(final_dir, ignore_errors=True)
+    os.replace(work_dir, final_dir)
+
+
+def build_one(gen: Generator, cache_dir: str, out_dir: str, force: bool) -> BuildResult:
+    t0 = time.perf_counter()
+    key = generator_key(gen)
+    hit = not force and cached_output(cache_dir, gen, key) is not None
+    if not hit:
+        run_generator(gen, key, cache_dir)
+    src = os.path.join(cache_dir, key, gen.out_name)
+    dst = os.path.join(out_dir, gen.out_name)
+    os.makedirs(out_dir, exist_ok=True)
+    shutil.copyfile(src, dst)
+    return BuildResult(gen.name, key, hit, time.perf_counter() - t0, dst)
+
+
+def build(names: List[str], cache_dir: str, out_dir: str, jobs: int, force: bool) -> List[BuildResult]:
+    """Build the selected artifacts; cache misses run concurrently (one subprocess each)."""
+    gens = [GENERATORS[n] for n in names]
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = [pool.submit(build_one, g, cache_dir, out_dir, force) for g in gens]
+        return [f.result() for f in futures]
+
+
+# ----------------------------
+# Main
+# ----------------------------
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Content-addressed cached runner for shared/*.tex artifacts.")
+    ap.add_argument("names", nargs="*", help=f"generators to build (default: all of {', '.join(GENERATORS)})")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="max generators run in parallel")
+    ap.add_argument("--force", action="store_true", help="ignore the cache and rerun")
+    ap.add_argument("--cache-dir", type=str, default=default_cache_dir(), help="cache directory")
+    ap.add_argument("--out-dir", type=str, default=SHARED, help="where artifacts are published")
+    ap.add_argument("--list", action="store_true", help="show generators, keys and cache state, then exit")
+    args = ap.parse_args()
+
+    names = args.names or list(GENERATORS)
+    unknown = [n for n in names if n not in GENERATORS]
+    if unknown:
+        ap.error(f"unknown generator(s): {', '.join(unknown)}")
+
+    if args.list:
+        for n in names:
+            gen = GENERATORS[n]
+            key = generator_key(gen)
+            state = "cached" if cached_output(args.cache_dir, gen, key) else "stale"
+            print(f"{n:>8s}  {key[:16]}  {state:>6s}  -> shared/{gen.out_name}")
+        return
+
+    for r in build(names, args.cache_dir, args.out_dir, args.jobs, args.force):
+        how = "hit " if r.hit else "RUN "
+        print(f"[{how}] {r.name:>8s}  {r.key[:16]}  {r.seconds:7.2f}s  -> {r.out_path}")
+
+
+if __name__ == "__main__":
+    main()
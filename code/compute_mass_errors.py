@@ -1,17 +1,14 @@
-import math
 from dataclasses import dataclass
 from typing import Dict, List, Tuple
 
-PHI = (1.0 + math.sqrt(5.0)) / 2.0
+from golden_unification.lattice import PHI
+from golden_unification.lattice import q_from_abc as q
 
 @dataclass(frozen=True)
 class Particle:
     name: str
     m_exp_gev: float
 
-def q(a: int, b: int, c: int) -> int:
-    return 8*a + 15*b + 24*c
-
 def m_pred(m0_gev: float, a: int, b: int, c: int) -> float:
     return m0_gev * (PHI ** (q(a,b,c)/4.0))
 
@@ -1,17 +1,14 @@
-import math
 from dataclasses import dataclass
 from typing import Dict, List, Tuple, Optional
 
-PHI = (1.0 + math.sqrt(5.0)) / 2.0
+from golden_unification.lattice import A_MAX, A_MIN, B_MAX, B_MIN, C_MAX, C_MIN, PHI
+from golden_unification.lattice import q_from_abc as q
 
 @dataclass(frozen=True)
 class Particle:
     name: str
     m_exp_gev: float
 
-def q(a: int, b: int, c: int) -> int:
-    return 8*a + 15*b + 24*c
-
 def m_pred_relative(m_e_gev: float,
                     a: int, b: int, c: int,
                     a_e: int, b_e: int, c_e: int) -> float:
@@ -54,15 +51,18 @@ PARTICLES: List[Particle] = [
     Particle("top",      172.76),
 ]
 
-# Scan bounds
-A_MIN, A_MAX = -80, 20
-B_MIN, B_MAX = -40, 40
-C_MIN, C_MAX = -40, 60
+# Scan bounds: the pre-registered box of golden_unification.lattice (imported above)
 
 # Tolerance for “solutions”
 TAU_FRAC = 0.05  # 0.1%
 # For diagnostic runs, you can temporarily try 0.02 or 0.05.
 
+# Anchor choice:
+# Option 1 (recommended immediately): use the best-fit electron found previously
+#            (-60, -16, 30) from your output.
+# Option 2: replace with YOUR canonical electron triple once you decide it.
+ANCHOR_ABC: Tuple[int,int,int] = (-60, -16, 30)
+
 def scan_best_and_solutions(p: Particle,
                             m_e_gev: float,
                             anchor: Tuple[int,int,int]) -> Tuple[Tuple[int,int,int,float,float], List[Tuple[int,int,int,float]]]:
@@ -88,11 +88,7 @@ def main():
     # Electron mass defines the base scale
     m_e = next(pp.m_exp_gev for pp in PARTICLES if pp.name == "electron")
 
-    # Anchor choice:
-    # Option 1 (recommended immediately): use the best-fit electron found previously
-    #            (-60, -16, 30) from your output.
-    # Option 2: replace with YOUR canonical electron triple once you decide it.
-    anchor = (-60, -16, 30)
+    anchor = ANCHOR_ABC
 
     q_e = q(*anchor)
 
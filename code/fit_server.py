@@ -0,0 +1,261 @@
+# code/fit_server.py
+# ============================================================
+# Golden Unification — warm fit server (JSON-lines protocol)
+# ============================================================
+#
+# Every code/ script pays Python start-up, q-set construction and particle
+# table setup before doing microseconds of work. This server keeps those
+# resident (q-set + NearestQ table, prefix-count index, PDG table) and
+# answers one JSON request per line, in order, on:
+#
+#   stdin/stdout                    (default; good for notebooks / PowerShell)
+#   a Unix socket   --socket PATH   (one thread per connection)
+#   localhost TCP   --port N        (for Windows, where AF_UNIX may be missing)
+#
+# Clients may pipeline: write many request lines without waiting, then read
+# the same number of response lines. A line may also hold a JSON array of
+# requests; the response line is then an array in the same order.
+#
+# Requests ("id" is optional and echoed back):
+#   {"op": "ping"}
+#   {"op": "fit", "masses_gev": [...], "anchor_gev": 0.00051099895}
+#       -> per-mass {"eps", "q"} on the anchored q/4 lattice (anchor at q = 0)
+#   {"op": "score", "masses_gev": [...], "mode": "anchored"|"pairwise"|"free"}
+#   {"op": "multiplicity", "masses_gev": [...], "tau": 0.05}
+#   {"op": "null", "ensemble": "A"|"B", "sigma": 0.3, "N": 2000, "seed": 1}
+#       -> summary (min, med, p16, p84, p_emp, max) of one ensemble on its own
+#          keyed stream, i.e. null_tests_fast_v2.py --streams keyed; Null B
+#          differs from the default --streams legacy run, whose draws depend on
+#          every ensemble run before it (the reply carries "streams": "keyed")
+#   {"op": "mixing", "theta_pred_deg": 68.8, "s12": .., "s23": .., "s13": ..,
+#    "step_deg": 0.1, "match": "sin"|"deg"}
+#   {"op": "pdg", "name": "mu"}          -> matching rows of the PDG table
+# Responses: {"id": .., "ok": true, "result": ..} or {"id": .., "ok": false, "error": ".."}
+#
+# Usage examples (run from repo root):
+#   python .\code\fit_server.py
+#   python .\code\fit_server.py --socket /tmp/gu_fit.sock
+#   python .\code\fit_server.py --port 8765
+#
+#   import json, subprocess
+#   srv = subprocess.Popen(["python", "code/fit_server.py"], stdin=subprocess.PIPE,
+#                          stdout=subprocess.PIPE, text=True)
+#   srv.stdin.write(json.dumps({"op": "fit", "masses_gev": [0.1056583755]}) + "\n")
+#   srv.stdin.flush(); print(srv.stdout.readline())
+#
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import socketserver
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, TextIO
+
+from golden_unification.ensembles import EnsembleState, TrialAccumulator, ensemble_rng, run_ensemble
+from golden_unification.lattice import OBS_MASSES_MEV, build_q_set, log_phi
+from golden_unification.mixing import scan_delta_match_deg, scan_delta_match_sin
+from golden_unification.scoring import NearestQ, anchored_fit_score, pairwise_mean_eps
+
+
+M_E_GEV = 0.00051099895
+
+
+class FitServer:
+    """Resident lattice/PDG state plus one handler per op."""
+
+    def __init__(self) -> None:
+        t0 = time.perf_counter()
+        self.q_list = build_q_set()
+        self.nq = NearestQ(self.q_list)
+        self._lock = threading.Lock()
+        self._index: Any = None
+        self._pdg: Optional[List[Any]] = None
+        self.n_requests = 0
+        self._count_lock = threading.Lock()     # handlers run on server threads
+        self.startup_s = time.perf_counter() - t0
+        self.ops: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "ping": self.op_ping,
+            "fit": self.op_fit,
+            "score": self.op_score,
+            "multiplicity": self.op_multiplicity,
+            "null": self.op_null,
+            "mixing": self.op_mixing,
+            "pdg": self.op_pdg,
+        }
+
+    # -- lazily built, then resident --
+
+    def index(self) -> Any:
+        with self._lock:
+            if self._index is None:
+                from multiplicity_curves import default_index
+                self._index = default_index()
+            return self._index
+
+    def pdg(self) -> List[Any]:
+        with self._lock:
+            if self._pdg is None:
+                from golden_unification.pdg import load_mass_width_json, massive
+                self._pdg = massive(load_mass_width_json())
+            return self._pdg
+
+    # -- ops --
+
+    def op_ping(self, req: Dict[str, Any]) -> Any:
+        return {"requests": self.n_requests, "startup_s": self.startup_s, "q_set": len(self.q_list)}
+
+    def _logs(self, req: Dict[str, Any]) -> List[float]:
+        anchor = float(req.get("anchor_gev", M_E_GEV))
+        return [log_phi(float(m) / anchor) for m in req["masses_gev"]]
+
+    def op_fit(self, req: Dict[str, Any]) -> Any:
+        out = []
+        for x in self._logs(req):
+            eps, qb = self.nq.nearest(4.0 * x)
+            out.append({"eps": eps, "q": qb})
+        return out
+
+    def op_score(self, req: Dict[str, Any]) -> Any:
+        mode = req.get("mode", "anchored")
+        logs = self._logs(req)
+        if mode == "anchored":
+            return self.nq.eps_sum([4.0 * x for x in logs]) / len(logs)
+        if mode == "pairwise":
+            return pairwise_mean_eps(self.nq, logs)
+        if mode == "free":
+            from free_scale_fit import sweep_fit
+            width = float(req.get("window", 1.0))
+            fit = sweep_fit(self.q_list, logs, -0.5 * width, 0.5 * width, req.get("stat", "mean"))
+            return {"value": fit.value, "m0_over_anchor": fit.m0, "q": fit.q_best}
+        raise ValueError(f"unknown score mode: {mode}")
+
+    def op_multiplicity(self, req: Dict[str, Any]) -> Any:
+        from compute_mass_errors_v2 import ANCHOR_ABC, q
+        from multiplicity_curves import multiplicity
+        idx = self.index()
+        q_e = q(*ANCHOR_ABC)
+        tau = float(req.get("tau", 0.05))
+        anchor = float(req.get("anchor_gev", M_E_GEV))
+        out = []
+        for m in req["masses_gev"]:
+            t, c = multiplicity(idx, math.log(float(m) / anchor), q_e, tau)
+            out.append({"triples": t, "classes": c})
+        return out
+
+    def op_null(self, req: Dict[str, Any]) -> Any:
+        seed = int(req.get("seed", 1))
+        n = int(req.get("N", 2000))
+        ensemble = req.get("ensemble", "A")
+        if ensemble not in ("A", "B"):
+            raise ValueError(f"unknown ensemble: {ensemble} (expected 'A' or 'B')")
+        if req.get("streams", "keyed") != "keyed":
+            raise ValueError("only streams 'keyed' is served (legacy draws depend on the whole run order)")
+        sigma = None if ensemble == "A" else float(req.get("sigma", 0.30))
+        obs = anchored_fit_score(self.q_list, OBS_MASSES_MEV).mean_eps
+        state = EnsembleState(ensemble, sigma, ensemble_rng(seed, ensemble, sigma), 0, TrialAccumulator(obs))
+        run_ensemble(self.q_list, state, n)
+        return dict(state.acc.summary(), obs=obs, N=n, streams="keyed")
+
+    def op_mixing(self, req: Dict[str, Any]) -> Any:
+        theta = float(req["theta_pred_deg"])
+        kw = dict(s12=float(req["s12"]), s23=float(req["s23"]), s13=float(req["s13"]),
+                  step_deg=float(req.get("step_deg", 0.1)))
+        if req.get("match", "sin") == "deg":
+            return scan_delta_match_deg(target_deg=theta, **kw)
+        return scan_delta_match_sin(target_sin=math.sin(math.radians(theta)), **kw)
+
+    def op_pdg(self, req: Dict[str, Any]) -> Any:
+        name = req.get("name")
+        mcid = req.get("mcid")
+        return [
+            {"name": e.name, "charges": e.charges, "mcids": list(e.mcids), "mass_gev": e.mass_gev,
+             "err_plus_gev": e.err_plus_gev, "err_minus_gev": e.err_minus_gev}
+            for e in self.pdg()
+            if (name is None or e.name == name) and (mcid is None or int(mcid) in e.mcids)
+        ]
+
+    # -- protocol --
+
+    def handle(self, req: Any) -> Any:
+        if isinstance(req, list):
+            return [self.handle(r) for r in req]
+        rid = req.get("id") if isinstance(req, dict) else None
+        try:
+            if not isinstance(req, dict) or "op" not in req:
+                raise ValueError("request must be an object with an 'op'")
+            fn = self.ops.get(req["op"])
+            if fn is None:
+                raise ValueError(f"unknown op: {req['op']}")
+            with self._count_lock:
+                self.n_requests += 1
+            return {"id": rid, "ok": True, "result": fn(req)}
+        except Exception as exc:                     # report, keep serving
+            return {"id": rid, "ok": False, "error": f"{type(exc).__name__}: {exc}"}
+
+    def handle_line(self, line: str) -> str:
+        try:
+            req = json.loads(line)
+        except json.JSONDecodeError as exc:
+            return json.dumps({"id": None, "ok": False, "error": f"bad JSON: {exc}"})
+        return json.dumps(self.handle(req))
+
+    def serve_stream(self, inp: TextIO, out: TextIO) -> None:
+        for line in inp:
+            if not line.strip():
+                continue
+            out.write(self.handle_line(line) + "\n")
+            out.flush()
+
+
+def serve_socket(server: FitServer, path: Optional[str], port: Optional[int]) -> None:
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            for raw in self.rfile:
+                if not raw.strip():
+                    continue
+                self.wfile.write((server.handle_line(raw.decode("utf-8")) + "\n").encode("utf-8"))
+                self.wfile.flush()
+
+    if path is not None:
+        if os.path.exists(path):
+            os.unlink(path)
+        srv: socketserver.BaseServer = socketserver.ThreadingUnixStreamServer(path, Handler)
+        where = path
+    else:
+        assert port is not None
+        srv = socketserver.ThreadingTCPServer(("127.0.0.1", port), Handler)
+        where = f"127.0.0.1:{port}"
+    srv.daemon_threads = True                        # open clients must not block shutdown
+    srv.block_on_close = False
+    print(f"fit server listening on {where} (startup {server.startup_s * 1e3:.1f} ms)", file=sys.stderr)
+    with srv:
+        try:
+            srv.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    if path is not None and os.path.exists(path):
+        os.unlink(path)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Warm JSON-lines fit server.")
+    grp = ap.add_mutually_exclusive_group()
+    grp.add_argument("--socket", type=str, default=None, help="serve on this Unix socket path")
+    grp.add_argument("--port", type=int, default=None, help="serve on 127.0.0.1:PORT")
+    args = ap.parse_args()
+
+    server = FitServer()
+    if args.socket is None and args.port is None:
+        server.serve_stream(sys.stdin, sys.stdout)
+    else:
+        serve_socket(server, args.socket, args.port)
+
+
+if __name__ == "__main__":
+    main()
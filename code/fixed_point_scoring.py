@@ -0,0 +1,160 @@
+# code/fixed_point_scoring.py
+# ============================================================
+# Golden Unification — fixed-point (ell-space) null scoring with a certified bound
+# ============================================================
+#
+# The anchored score of a trial is the mean over species of
+#
+#   eps_i = min_q | q/4 - x_i |,   x_i = log_phi(m_i / m_e)
+#
+# The float64 reference path (scoring.anchored_fit_score) binary-searches
+# the q-set per species and builds dicts per trial. The fixed-point path
+# instead rounds each target to an integer in ell-space,
+#
+#   Y_i = round(4 x_i * 2^F)                (F = frac_bits)
+#
+# and takes the distance to the nearest q from integer LUTs over the q span
+# (prev_le / next_ge as in scoring.NearestQ), summing integers only.
+#
+# Certified bound. |Y_i 2^-F - 4 x_i| <= 2^-(F+1), and nearest-q distance is
+# 1-Lipschitz in the target, so each eps_i is off by at most 2^-(F+3) and so
+# is the mean. The reference path itself rounds (one subtraction per species,
+# P-1 additions, one division): at most (P+1) 2^-53 relative to its result.
+# With v_fix the fixed-point mean,
+#
+#   |v_fix - v_ref| <= B(v_fix) = 2^-(F+3) + (P+3) 2^-52 (v_fix + 2^-(F+3))
+#
+# (one extra ulp of slack covers the final int -> float conversion). Any
+# trial with |v_fix - obs| <= B is re-scored on the float64 reference path,
+# so every "v <= obs" decision and hence p_emp is identical to float64.
+# Quantiles of non-rescored trials carry an absolute error <= B (~1e-8 at F=24).
+#
+# float32 / SIMD-width gains do not apply to pure-Python scalars; what the
+# fixed-point path buys here is skipping the per-species binary search and
+# dict building of the reference fit.
+#
+# ============================================================
+
+from __future__ import annotations
+
+from array import array
+from typing import Callable, Dict, List, Optional, Sequence
+
+from golden_unification.ensembles import EnsembleState, null_jittered, null_log_uniform
+from golden_unification.lattice import ANCHOR, OBS_MASSES_MEV, log_phi
+from golden_unification.scoring import anchored_fit_score
+
+
+DEFAULT_FRAC_BITS = 24
+
+
+class FixedPointQ:
+    """Integer nearest-q lookup for targets given on the log_phi scale."""
+
+    def __init__(self, q_list: Sequence[int], frac_bits: int = DEFAULT_FRAC_BITS) -> None:
+        if not q_list:
+            raise ValueError("FixedPointQ(): empty q-set")
+        self.frac_bits = frac_bits
+        self.scale = 4.0 * (1 << frac_bits)           # x -> Y; exact (power of two)
+        self.q_min = q_list[0]
+        self.q_max = q_list[-1]
+        span = self.q_max - self.q_min + 1
+        present = bytearray(span)
+        for qq in q_list:
+            present[qq - self.q_min] = 1
+        # fixed-point positions of the nearest q at or below / at or above each integer cell
+        self.prev_le = array("q", [0]) * span
+        self.next_ge = array("q", [0]) * span
+        last = self.q_min
+        for k in range(span):
+            if present[k]:
+                last = self.q_min + k
+            self.prev_le[k] = last << frac_bits
+        nxt = self.q_max
+        for k in range(span - 1, -1, -1):
+            if present[k]:
+                nxt = self.q_min + k
+            self.next_ge[k] = nxt << frac_bits
+        self.quant_err = 2.0 ** -(frac_bits + 3)      # per-species eps error from rounding Y
+
+    def eps_sum_fixed(self, xs: Sequence[float]) -> int:
+        """Sum over targets of the nearest-q distance, in units of 2^-F q."""
+        f = self.frac_bits
+        scale = self.scale
+        lo_b = self.q_min << f
+        hi_b = self.q_max << f
+        base = self.q_min
+        prev_le, next_ge = self.prev_le, self.next_ge
+        total = 0
+        for x in xs:
+            y = round(x * scale)
+            if y <= lo_b:
+                total += lo_b - y
+            elif y >= hi_b:
+                total += y - hi_b
+            else:
+                k = (y >> f) - base
+                d_lo = y - prev_le[k]
+                if d_lo:
+                    d_hi = next_ge[k + 1] - y
+                    total += d_lo if d_lo <= d_hi else d_hi
+        return total
+
+    def mean_eps(self, xs: Sequence[float], n_species: int) -> float:
+        """Mean eps over n_species (species not in xs, e.g. the anchor, contribute 0)."""
+        return self.eps_sum_fixed(xs) / (self.scale * n_species)
+
+    def bound(self, v: float, n_species: int) -> float:
+        """Certified |v_fixed - v_float64| for a fixed-point mean v."""
+        return self.quant_err + (n_species + 3) * 2.0 ** -52 * (v + self.quant_err)
+
+
+def draw_masses(state: EnsembleState) -> Dict[str, float]:
+    """One null spectrum from state's stream (the draws of ensembles.trial_fit)."""
+    if state.name == "A":
+        return null_log_uniform(state.rng, OBS_MASSES_MEV, n_nonanchor=len(OBS_MASSES_MEV) - 1)
+    assert state.sigma is not None
+    return null_jittered(state.rng, OBS_MASSES_MEV, sigma=state.sigma)
+
+
+def run_ensemble_fixed(
+    q_list: List[int],
+    fx: FixedPointQ,
+    state: EnsembleState,
+    n_target: int,
+    every: int = 0,
+    on_checkpoint: Optional[Callable[[], None]] = None,
+) -> int:
+    """
+    ensembles.run_ensemble on the fixed-point path: same RNG stream,
+    same p_emp; trials within the bound of the observed score are re-scored
+    in float64. Returns the number of re-scored trials.
+    """
+    me = OBS_MASSES_MEV[ANCHOR]
+    labels = [k for k in OBS_MASSES_MEV if k != ANCHOR]
+    n_species = len(OBS_MASSES_MEV)
+    obs = state.acc.obs_val
+    n_rescored = 0
+    while state.done < n_target:
+        masses = draw_masses(state)
+        v = fx.mean_eps([log_phi(masses[k] / me) for k in labels], n_species)
+        if abs(v - obs) <= fx.bound(v, n_species):
+            v = anchored_fit_score(q_list, masses).mean_eps
+            n_rescored += 1
+        state.acc.add(v)
+        state.done += 1
+        if every and on_checkpoint is not None and state.done % every == 0:
+            on_checkpoint()
+    return n_rescored
+
+
+def max_abs_error(q_list: List[int], fx: FixedPointQ, state: EnsembleState, n: int) -> float:
+    """Largest |v_fixed - v_float64| over n trials drawn from state's stream (diagnostic)."""
+    me = OBS_MASSES_MEV[ANCHOR]
+    labels = [k for k in OBS_MASSES_MEV if k != ANCHOR]
+    worst = 0.0
+    for _ in range(n):
+        masses = draw_masses(state)
+        v = fx.mean_eps([log_phi(masses[k] / me) for k in labels], len(OBS_MASSES_MEV))
+        worst = max(worst, abs(v - anchored_fit_score(q_list, masses).mean_eps))
+    return worst
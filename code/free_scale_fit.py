@@ -0,0 +1,315 @@
+# code/free_scale_fit.py
+# ============================================================
+# Golden Unification — exact free-scale (m0) fit by event sweep
+# Writes (optional): ../shared/paperIX_free_scale_null.tex
+# ============================================================
+#
+# compute_mass_errors.m_pred(m0, a, b, c) = m0 * PHI^(q/4) has a free overall
+# scale, but every script fixes m0 = m_e. Here m0 is optimized exactly.
+#
+# Work in q units: u = 4*log_phi(m0), c_i = 4*log_phi(m_i). Then
+#
+#   eps_i(u) = dist(c_i - u, Q) / 4
+#
+# is piecewise linear in u with slope +-1/4: zeros at u = c_i - q (q in Q)
+# and peaks at u = c_i - (q_k + q_{k+1})/2. Sorting those breakpoints and
+# sweeping once gives
+#   - the exact minimum of the mean eps (attained at a breakpoint), and
+#   - the exact minimum of the max eps (per interval: rising lines u - a_i,
+#     falling lines b_i - u; the optimum is at (min a + max b)/2, clamped;
+#     both extremes are kept in lazy heaps),
+# in O(P*K log(P*K)) for K breakpoints per particle, with no m0 grid.
+#
+# The interior of the q-set is every integer, so eps_i(u) has period 1 in u
+# there; the default window is one period centred on m0 = m_e, which makes
+# the optimum global. The same sweep runs per trial inside the null
+# ensembles, giving unanchored p-values at the cost of anchored ones.
+#
+# Usage examples (run from repo root):
+#   python .\code\free_scale_fit.py
+#   python .\code\free_scale_fit.py --stat max --N 5000
+#   python .\code\free_scale_fit.py --window 8 --out-tex shared\paperIX_free_scale_null.tex
+#
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import heapq
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from golden_unification.blocks import (
+    format_sci, format_summary, keyed_rng, null_row, tex_banner, write_tex_block,
+)
+from golden_unification.ensembles import TrialAccumulator
+from golden_unification.lattice import ANCHOR, OBS_MASSES_MEV, PHI, log_phi
+from golden_unification.lattice import build_q_set as build_feasible_q_set
+from golden_unification.scoring import anchored_fit_score
+
+
+# ----------------------------
+# Event sweep
+# ----------------------------
+
+@dataclass
+class ScaleFit:
+    u: float                 # 4*log_phi(m0) at the optimum
+    value: float             # optimal mean (or max) eps, log_phi units
+    q_best: List[int]        # per-particle q at the optimum
+
+    @property
+    def m0(self) -> float:
+        return PHI ** (self.u / 4.0)
+
+
+def _initial_line(q_list: Sequence[int], c: float, u0: float) -> Tuple[int, float]:
+    """
+    State of dist(c - u, Q) just to the right of u0: (+1, a) for a rising line
+    g = u - a, or (-1, b) for a falling line g = b - u.
+    """
+    y = c - u0
+    k = bisect.bisect_left(q_list, y)            # q_list[k] >= y > q_list[k-1]
+    q_hi = q_list[k] if k < len(q_list) else None
+    q_lo = q_list[k - 1] if k > 0 else None
+    # As u grows, y shrinks: the nearest q just below y0 decides the slope.
+    if q_lo is None or (q_hi is not None and q_hi - y < y - q_lo):
+        assert q_hi is not None
+        return +1, c - q_hi
+    return -1, c - q_lo
+
+
+def _events(q_list: Sequence[int], c: float, u_lo: float, u_hi: float) -> List[Tuple[float, int, float]]:
+    """Breakpoints of dist(c - u, Q) in (u_lo, u_hi]: (u, new slope, a or b)."""
+    out: List[Tuple[float, int, float]] = []
+    y_lo, y_hi = c - u_hi, c - u_lo
+    k0 = max(0, bisect.bisect_left(q_list, y_lo) - 1)
+    k1 = min(len(q_list), bisect.bisect_right(q_list, y_hi) + 1)
+    for k in range(k0, k1):
+        qq = q_list[k]
+        if y_lo <= qq < y_hi:                      # zero: becomes rising, g = u - (c - q)
+            out.append((c - qq, +1, c - qq))
+        if k + 1 < len(q_list):
+            mid = 0.5 * (qq + q_list[k + 1])
+            if y_lo <= mid < y_hi:                 # peak: becomes falling toward q_k
+                out.append((c - mid, -1, c - qq))
+    return out
+
+
+def sweep_fit(
+    q_list: Sequence[int],
+    logs_phi: Sequence[float],
+    u_lo: float,
+    u_hi: float,
+    stat: str = "mean",
+) -> ScaleFit:
+    """Exact minimizer over u in [u_lo, u_hi] of the mean ("mean") or max ("max") eps."""
+    if u_hi < u_lo:
+        raise ValueError("sweep_fit(): empty window")
+    cs = [4.0 * x for x in logs_phi]
+    p = len(cs)
+    slope: List[int] = []
+    param: List[float] = []
+    events: List[Tuple[float, int, int, float]] = []
+    for i, c in enumerate(cs):
+        s, ab = _initial_line(q_list, c, u_lo)
+        slope.append(s)
+        param.append(ab)
+        events.extend((u, i, s2, ab2) for (u, s2, ab2) in _events(q_list, c, u_lo, u_hi))
+    events.sort()
+
+    def g(i: int, u: float) -> float:
+        return u - param[i] if slope[i] > 0 else param[i] - u
+
+    best_u = u_lo
+    if stat == "mean":
+        total = sum(g(i, u_lo) for i in range(p))
+        net = sum(slope)
+        best_val = total
+        u_prev = u_lo
+        for u, i, s2, ab2 in events + [(u_hi, -1, 0, 0.0)]:
+            total += net * (u - u_prev)
+            u_prev = u
+            if total < best_val:
+                best_val, best_u = total, u
+            if i >= 0:
+                net += s2 - slope[i]
+                slope[i], param[i] = s2, ab2
+        value = best_val / (4.0 * p)
+    elif stat == "max":
+        # rising: min-heap of a_i; falling: min-heap of -b_i; stale entries skipped lazily
+        version = [0] * p
+        rising: List[Tuple[float, int, int]] = []
+        falling: List[Tuple[float, int, int]] = []
+
+        def push(i: int) -> None:
+            version[i] += 1
+            if slope[i] > 0:
+                heapq.heappush(rising, (param[i], i, version[i]))
+            else:
+                heapq.heappush(falling, (-param[i], i, version[i]))
+
+        def top(h: List[Tuple[float, int, int]]) -> Optional[float]:
+            while h and h[0][2] != version[h[0][1]]:
+                heapq.heappop(h)
+            return h[0][0] if h else None
+
+        for i in range(p):
+            push(i)
+        best_val = math.inf
+        u_a = u_lo
+        for u_b, i, s2, ab2 in events + [(u_hi, -1, 0, 0.0)]:
+            a_min = top(rising)
+            nb = top(falling)
+            b_max = None if nb is None else -nb
+            if a_min is None:
+                assert b_max is not None
+                u_star = u_b
+            elif b_max is None:
+                u_star = u_a
+            else:
+                u_star = min(max(0.5 * (a_min + b_max), u_a), u_b)
+            val = max(u_star - a_min if a_min is not None else -math.inf,
+                      b_max - u_star if b_max is not None else -math.inf)
+            if val < best_val:
+                best_val, best_u = val, u_star
+            if i >= 0:
+                slope[i], param[i] = s2, ab2
+                push(i)
+            u_a = u_b
+        value = best_val / 4.0
+    else:
+        raise ValueError(f"unknown statistic: {stat}")
+
+    q_best: List[int] = []
+    for c in cs:
+        y = c - best_u
+        k = bisect.bisect_left(q_list, y)
+        cands = [q_list[j] for j in (k - 1, k) if 0 <= j < len(q_list)]
+        q_best.append(min(cands, key=lambda qq: abs(qq - y)))
+    return ScaleFit(best_u, value, q_best)
+
+
+def default_window(width: float) -> Tuple[float, float]:
+    """Window in u (q units) of the given width centred on m0 = m_e."""
+    u_e = 4.0 * log_phi(OBS_MASSES_MEV[ANCHOR])
+    return u_e - 0.5 * width, u_e + 0.5 * width
+
+
+# ----------------------------
+# Null ensembles (unanchored)
+# ----------------------------
+
+def free_null(
+    q_list: Sequence[int],
+    logs_phi: Sequence[float],
+    obs_val: float,
+    window: Tuple[float, float],
+    stat: str,
+    ensemble: str,
+    sigma: Optional[float],
+    n: int,
+    seed: int,
+) -> TrialAccumulator:
+    """
+    Every mass is resampled (no anchor), then m0 is re-optimized per trial:
+      "A": i.i.d. log-uniform over the observed range
+      "B": ln-space jitter N(0, sigma^2)
+    """
+    rng = keyed_rng(seed, "free", stat, ensemble, sigma)
+    acc = TrialAccumulator(obs_val)
+    lo, hi = min(logs_phi), max(logs_phi)
+    s_phi = 0.0 if sigma is None else sigma / math.log(PHI)
+    for _ in range(n):
+        if ensemble == "A":
+            trial = [lo + (hi - lo) * rng.random() for _ in logs_phi]
+        else:
+            trial = [x + s_phi * rng.gauss(0.0, 1.0) for x in logs_phi]
+        acc.add(sweep_fit(q_list, trial, window[0], window[1], stat).value)
+    return acc
+
+
+def write_tex(
+    out_path: str,
+    stat: str,
+    fit: ScaleFit,
+    anchored: float,
+    rows: List[Tuple[str, Dict[str, float]]],
+    N: int,
+    seed: int,
+) -> None:
+    sym = "\\overline{\\epsilon}" if stat == "mean" else "\\epsilon_{\\max}"
+    lines = tex_banner("Free-scale (unanchored) null test", "free_scale_fit.py")
+    lines.append("\\paragraph{Free overall scale.}")
+    lines.append(
+        f"Optimizing $m_0$ exactly (event sweep over the breakpoints of ${sym}$) gives "
+        f"$m_0/m_e = {fit.m0 / OBS_MASSES_MEV[ANCHOR]:.6f}$ and"
+    )
+    lines.append("\\begin{equation}")
+    lines.append(f"{sym}^{{\\mathrm{{free}}}} = {format_sci(fit.value)}"
+                 f"\\quad(\\text{{anchored: }}{format_sci(anchored)}).")
+    lines.append("\\end{equation}")
+    lines.append("\\begin{center}")
+    lines.append("\\begin{tabular}{l c c c}")
+    lines.append("\\hline")
+    lines.append("Null & median & $[16\\%,84\\%]$ & $p_\\mathrm{emp}$ \\\\")
+    lines.append("\\hline")
+    for label, st in rows:
+        lines.append(null_row(label, st))
+    lines.append("\\hline")
+    lines.append("\\end{tabular}")
+    lines.append("\\end{center}")
+    lines.append(f"% N={N} trials per ensemble, seed={seed}; m0 re-optimized in every trial.")
+    write_tex_block(out_path, lines)
+
+
+# ----------------------------
+# Main
+# ----------------------------
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Exact free-scale (m0) lattice fit and unanchored nulls.")
+    ap.add_argument("--stat", choices=["mean", "max"], default="mean", help="statistic to minimize")
+    ap.add_argument("--window", type=float, default=1.0,
+                    help="m0 window width in q units, centred on m_e (1 = one full period)")
+    ap.add_argument("--N", type=int, default=2000, help="number of null trials per ensemble")
+    ap.add_argument("--seed", type=int, default=1, help="RNG seed")
+    ap.add_argument("--sigma", type=float, nargs="*", default=[0.15, 0.30, 0.50],
+                    help="sigma values for the jittered null (ln-space)")
+    ap.add_argument("--out-tex", type=str, default=None, help="optional LaTeX output path")
+    args = ap.parse_args()
+
+    q_list = build_feasible_q_set()
+    labels = list(OBS_MASSES_MEV.keys())
+    logs = [log_phi(OBS_MASSES_MEV[k]) for k in labels]
+    window = default_window(args.window)
+
+    fit = sweep_fit(q_list, logs, window[0], window[1], args.stat)
+    anchored_fit = anchored_fit_score(q_list, OBS_MASSES_MEV)
+    anchored = (anchored_fit.mean_eps if args.stat == "mean"
+                else max(anchored_fit.per_particle_eps.values()))
+    print(f"=== Free-scale fit ({args.stat} eps) ===")
+    print(f"m0 = {fit.m0:.9g} MeV  (m0/m_e = {fit.m0 / OBS_MASSES_MEV[ANCHOR]:.6f})")
+    print(f"{args.stat}_eps free = {fit.value:.6e}   anchored = {anchored:.6e}")
+    for k, x, qq in zip(labels, logs, fit.q_best):
+        print(f"  {k:>8s}  q={qq:5d}  eps={abs(qq / 4.0 - (x - fit.u / 4.0)):.6e}")
+    print("")
+
+    rows: List[Tuple[str, Dict[str, float]]] = []
+    ens: List[Tuple[str, Optional[float], str]] = [("A", None, "A (log-uniform)")]
+    ens += [("B", s, f"B ($\\sigma={s:.3f}$)") for s in args.sigma]
+    for name, sigma, label in ens:
+        st = free_null(q_list, logs, fit.value, window, args.stat, name, sigma, args.N, args.seed).summary()
+        rows.append((label, st))
+        tag = "Null A" if sigma is None else f"Null B sigma={sigma:.3f}"
+        print(f"{tag}: {format_summary(st)}")
+
+    if args.out_tex:
+        write_tex(args.out_tex, args.stat, fit, anchored, rows, N=args.N, seed=args.seed)
+        print(f"Wrote LaTeX block to: {args.out_tex}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# code/golden_unification/__init__.py
+# ============================================================
+# Golden Unification — importable core (lattice, scoring, ensembles, mixing, PDG tables)
+# ============================================================
+#
+# The code/ scripts remain the programs that write shared/*.tex; this package
+# holds the routines they share and is the in-process entry point to them,
+# for notebooks and pipelines:
+#
+#   >>> import sys; sys.path.insert(0, "code")        # from the repo root
+#   >>> import golden_unification as gu
+#   >>> q_list = gu.build_q_set()
+#   >>> gu.anchored_fit_score(q_list, gu.OBS_MASSES_MEV).mean_eps
+#   >>> nq = gu.NearestQ(q_list)                      # pairwise / free-scale fast paths
+#
+# Scripts import the package, never the other way round. Every name is
+# resolved on first access, so importing the package costs nothing beyond
+# this file and a caller only pays for the modules it actually touches.
+#
+# Command line (one subcommand per workflow): python .\code\gu.py --help
+#
+# ============================================================
+
+from __future__ import annotations
+
+import importlib
+
+
+# name -> package module that defines it.
+# Annotations here and in lattice are builtin generics: importing typing
+# alone would roughly double the CLI's cold start.
+_EXPORTS: dict[str, str] = {
+    # lattice
+    "PHI": ".lattice",
+    "LOG_PHI": ".lattice",
+    "q_from_abc": ".lattice",
+    "log_phi": ".lattice",
+    "ScanBox": ".lattice",
+    "SCAN_BOX": ".lattice",
+    "build_q_set": ".lattice",
+    "best_eps_for_mass_ratio": ".lattice",
+    "OBS_MASSES_MEV": ".lattice",
+    "ANCHOR": ".lattice",
+    # scoring
+    "FitResult": ".scoring",
+    "anchored_fit_score": ".scoring",
+    "NearestQ": ".scoring",
+    "pairwise_mean_eps": ".scoring",
+    # ensembles
+    "null_log_uniform": ".ensembles",
+    "null_jittered": ".ensembles",
+    "TrialAccumulator": ".ensembles",
+    "EnsembleState": ".ensembles",
+    "ensemble_rng": ".ensembles",
+    "new_ensembles": ".ensembles",
+    "run_ensemble": ".ensembles",
+    # keyed RNG blocks / LaTeX blocks
+    "keyed_rng": ".blocks",
+    "map_blocks": ".blocks",
+    "format_sci": ".blocks",
+    # mixing
+    "J_invariant": ".mixing",
+    "scan_delta_match_sin": ".mixing",
+    "scan_delta_match_deg": ".mixing",
+    "haar_u3": ".mixing",
+    "extract_params": ".mixing",
+    "run_null": ".mixing",
+    "null_pack": ".mixing",
+    # PDG tables
+    "PdgEntry": ".pdg",
+    "load_mass_width_json": ".pdg",
+    "massive": ".pdg",
+    "load_sm_masses": ".pdg",
+    "load_checked_sm_masses": ".pdg",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name: str) -> object:
+    mod = _EXPORTS.get(name)
+    if mod is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(mod, __name__), name)
+    globals()[name] = value                     # resolve once
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,97 @@
+# code/golden_unification/blocks.py
+# ============================================================
+# Golden Unification — keyed RNG blocks and LaTeX blocks shared by the scripts
+# ============================================================
+#
+# Every null script draws from string-keyed streams,
+#
+#   random.Random("seed:part1:part2:...")    (str parts verbatim, others by repr)
+#
+# so a stream depends only on what it is for (ensemble, sigma, block, shard,
+# species, ...), never on worker count or draw order. Trials are split into
+# fixed blocks, each with its own stream; map_blocks runs them serially or on
+# a process pool and returns the results in block order.
+#
+# The shared/*.tex writers all emit the same frame: a banner naming the
+# generator, LaTeX numbers via format_sci, and (for null tests) one
+# "median [16%, 84%] p_emp" row per ensemble from TrialAccumulator.summary().
+#
+# ============================================================
+
+from __future__ import annotations
+
+import math
+import os
+import random
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+# ----------------------------
+# Keyed RNG streams / blocks
+# ----------------------------
+
+def keyed_rng(seed: int, *key: object) -> random.Random:
+    """Independent stream for (seed, *key); e.g. keyed_rng(1, "pairs", "B", 0.3, 7)."""
+    parts = [str(seed)] + [k if isinstance(k, str) else repr(k) for k in key]
+    return random.Random(":".join(parts))
+
+
+def blocks(n_trials: int, block_trials: int) -> List[Tuple[int, int]]:
+    """(block index, trials in block) covering n_trials in blocks of block_trials."""
+    return [(block, min(block_trials, n_trials - start))
+            for block, start in enumerate(range(0, n_trials, block_trials))]
+
+
+def map_blocks(
+    fn: Callable[[Any], Any],
+    tasks: Sequence[Any],
+    workers: int = 1,
+    initializer: Optional[Callable[..., None]] = None,
+    initargs: Tuple[Any, ...] = (),
+) -> List[Any]:
+    """fn over tasks, in-process or on a pool of workers; results in task order."""
+    if workers <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        return [fn(t) for t in tasks]
+    import multiprocessing as mp
+    with mp.Pool(workers, initializer=initializer, initargs=initargs) as pool:
+        return pool.map(fn, tasks)
+
+
+# ----------------------------
+# Reporting / LaTeX blocks
+# ----------------------------
+
+def format_sci(x: float) -> str:
+    # LaTeX-friendly scientific notation
+    if x == 0:
+        return "0"
+    exp = int(math.floor(math.log10(abs(x))))
+    mant = x / (10 ** exp)
+    return f"{mant:.6f}\\times 10^{{{exp}}}"
+
+
+def format_summary(st: Dict[str, float]) -> str:
+    """One console line of a TrialAccumulator summary."""
+    return f"min={st['min']:.6e} med={st['med']:.6e} max={st['max']:.6e} p_emp={st['p_emp']:.6g}"
+
+
+def tex_banner(title: str, script: str) -> List[str]:
+    """Opening lines of an auto-generated block: '% <title> generated by code/<script>'."""
+    rule = "% ============================================================"
+    return [rule, f"% {title} generated by code/{script}", rule, ""]
+
+
+def null_row(label: str, st: Dict[str, float]) -> str:
+    """Table row 'label & median & [16%, 84%] & p_emp' of a TrialAccumulator summary."""
+    return (
+        f"{label} & ${format_sci(st['med'])}$ & "
+        f"$[{format_sci(st['p16'])},\\,{format_sci(st['p84'])}]$ & ${st['p_emp']:.6g}$ \\\\"
+    )
+
+
+def write_tex_block(out_path: str, lines: List[str]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
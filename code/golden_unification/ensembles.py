@@ -0,0 +1,362 @@
+# code/golden_unification/ensembles.py
+# ============================================================
+# Golden Unification — null ensembles and streaming trial summaries
+# ============================================================
+#
+#   Null A: i.i.d. log-uniform masses over the observed non-anchor range
+#   Null B: jittered spectrum (Gaussian noise of width sigma in ln-space)
+#
+# Each ensemble (EnsembleState) owns its RNG stream and a TrialAccumulator,
+# a mergeable streaming summary: exact up to EXACT_LIMIT trials, then a
+# log-binned sketch with exact counts, min and max. null_tests_fast_v2.py
+# adds checkpoints and the LaTeX table on top; the fixed-point, distributed,
+# multi-statistic and fit-server paths all draw through trial_fit.
+#
+# ============================================================
+
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .blocks import keyed_rng
+from .lattice import ANCHOR, OBS_MASSES_MEV
+from .scoring import FitResult, anchored_fit_score
+
+
+# ----------------------------
+# Quantiles
+# ----------------------------
+
+def quantile(sorted_vals: List[float], q: float) -> float:
+    """Linear interpolation quantile for 0<=q<=1 on a pre-sorted list."""
+    if not sorted_vals:
+        raise ValueError("quantile(): empty list")
+    if q <= 0:
+        return sorted_vals[0]
+    if q >= 1:
+        return sorted_vals[-1]
+    pos = (len(sorted_vals) - 1) * q
+    lo = int(math.floor(pos))
+    hi = int(math.ceil(pos))
+    if lo == hi:
+        return sorted_vals[lo]
+    w = pos - lo
+    return (1 - w) * sorted_vals[lo] + w * sorted_vals[hi]
+
+
+def summarize_trials(vals: List[float], obs_val: float) -> Dict[str, float]:
+    if not vals:
+        raise ValueError("No trials to summarize")
+    s = sorted(vals)
+    return {
+        "min": s[0],
+        "med": quantile(s, 0.5),
+        "p16": quantile(s, 0.16),
+        "p84": quantile(s, 0.84),
+        "p_emp": sum(1 for v in vals if v <= obs_val) / len(vals),
+    }
+
+
+# ----------------------------
+# Null ensembles
+# ----------------------------
+
+def null_log_uniform(
+    rng: random.Random,
+    base_masses: Dict[str, float],
+    n_nonanchor: int,
+) -> Dict[str, float]:
+    """
+    Null A: draw non-anchor masses i.i.d. log-uniform over observed range
+    of non-anchor masses. Keep anchor fixed.
+    """
+    me = base_masses[ANCHOR]
+    non_anchor = [m for k, m in base_masses.items() if k != ANCHOR]
+    mmin = min(non_anchor)
+    mmax = max(non_anchor)
+
+    ln_min = math.log(mmin)
+    ln_max = math.log(mmax)
+
+    out: Dict[str, float] = {ANCHOR: me}
+    # Preserve the same particle labels (except we resample their values)
+    labels = [k for k in base_masses.keys() if k != ANCHOR]
+    if len(labels) != n_nonanchor:
+        # In practice: n_nonanchor should equal len(labels)
+        labels = labels[:n_nonanchor]
+
+    for lbl in labels:
+        ln_m = ln_min + (ln_max - ln_min) * rng.random()
+        out[lbl] = math.exp(ln_m)
+    return out
+
+
+def null_jittered(
+    rng: random.Random,
+    base_masses: Dict[str, float],
+    sigma: float,
+) -> Dict[str, float]:
+    """
+    Null B: jitter observed non-anchor masses in ln-space by N(0, sigma^2).
+    Keep anchor fixed.
+    """
+    me = base_masses[ANCHOR]
+    out: Dict[str, float] = {ANCHOR: me}
+    for k, m in base_masses.items():
+        if k == ANCHOR:
+            continue
+        z = rng.gauss(0.0, 1.0)
+        out[k] = m * math.exp(sigma * z)
+    return out
+
+
+# ----------------------------
+# Streaming accumulator / ensemble state
+# ----------------------------
+
+# Trial scores are kept verbatim up to EXACT_LIMIT per ensemble (so default-size
+# runs report exactly the same quantiles as summarize_trials). Beyond that the
+# accumulator collapses into a log-binned sketch whose quantiles carry a relative
+# error <= SKETCH_ALPHA; counts (hence p_emp), min and max stay exact.
+EXACT_LIMIT = 100_000
+SKETCH_ALPHA = 1e-4
+_SKETCH_LOG_GAMMA = math.log((1.0 + SKETCH_ALPHA) / (1.0 - SKETCH_ALPHA))
+
+
+class TrialAccumulator:
+    """
+    Mergeable streaming summary of one ensemble's trial scores.
+    The state depends only on the multiset of scores added, so any split of a
+    run into pieces (checkpoint/resume, extension, shards) summarizes identically.
+    """
+
+    def __init__(self, obs_val: float) -> None:
+        self.obs_val = obs_val
+        self.count = 0
+        self.n_le = 0
+        self.vmin = math.inf
+        self.vmax = -math.inf
+        self.values: Optional[List[float]] = []
+        self.bins: Dict[int, int] = {}
+        self.zeros = 0
+
+    @property
+    def exact(self) -> bool:
+        return self.values is not None
+
+    def add(self, v: float) -> None:
+        self.count += 1
+        if v <= self.obs_val:
+            self.n_le += 1
+        if v < self.vmin:
+            self.vmin = v
+        if v > self.vmax:
+            self.vmax = v
+        if self.values is not None:
+            self.values.append(v)
+            if len(self.values) > EXACT_LIMIT:
+                self._collapse()
+        else:
+            self._bin(v)
+
+    def merge(self, other: "TrialAccumulator") -> None:
+        if other.obs_val != self.obs_val:
+            raise ValueError("cannot merge accumulators built against different observed scores")
+        self.count += other.count
+        self.n_le += other.n_le
+        self.vmin = min(self.vmin, other.vmin)
+        self.vmax = max(self.vmax, other.vmax)
+        if self.values is not None and other.values is not None:
+            self.values.extend(other.values)
+            if len(self.values) > EXACT_LIMIT:
+                self._collapse()
+            return
+        self._collapse()
+        if other.values is not None:
+            for v in other.values:
+                self._bin(v)
+        else:
+            self.zeros += other.zeros
+            for k, n in other.bins.items():
+                self.bins[k] = self.bins.get(k, 0) + n
+
+    @staticmethod
+    def bin_index(v: float) -> Optional[int]:
+        """Sketch bin of v (None for the zero bucket); bins are ordered like their values."""
+        if v <= 0.0:
+            return None
+        return math.ceil(math.log(v) / _SKETCH_LOG_GAMMA)
+
+    def _bin(self, v: float) -> None:
+        k = self.bin_index(v)
+        if k is None:
+            self.zeros += 1
+            return
+        self.bins[k] = self.bins.get(k, 0) + 1
+
+    def locate(self, k: int) -> Tuple[Optional[int], int]:
+        """(bin, number of scores in lower bins) of the k-th smallest score (sketch mode)."""
+        if k < self.zeros:
+            return None, 0
+        seen = self.zeros
+        for idx, n in sorted(self.bins.items()):
+            if k < seen + n:
+                return idx, seen
+            seen += n
+        raise IndexError(f"locate(): rank {k} beyond {self.count} scores")
+
+    def _collapse(self) -> None:
+        if self.values is None:
+            return
+        vals, self.values = self.values, None
+        for v in vals:
+            self._bin(v)
+
+    @staticmethod
+    def bin_value(idx: int) -> float:
+        """Representative value of sketch bin idx (within SKETCH_ALPHA of every value in it)."""
+        gamma = math.exp(_SKETCH_LOG_GAMMA)
+        return 2.0 * gamma ** idx / (gamma + 1.0)
+
+    def _kth(self, sorted_bins: List[Tuple[int, int]], k: int) -> float:
+        """Representative value of the k-th smallest score (sketch mode)."""
+        if k < self.zeros:
+            return 0.0
+        seen = self.zeros
+        for idx, n in sorted_bins:
+            seen += n
+            if k < seen:
+                return min(max(self.bin_value(idx), self.vmin), self.vmax)
+        return self.vmax
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            raise ValueError("quantile(): empty accumulator")
+        if self.values is not None:
+            return quantile(sorted(self.values), q)
+        if q <= 0:
+            return self.vmin
+        if q >= 1:
+            return self.vmax
+        sorted_bins = sorted(self.bins.items())
+        pos = (self.count - 1) * q
+        lo = int(math.floor(pos))
+        hi = int(math.ceil(pos))
+        v_lo = self._kth(sorted_bins, lo)
+        if lo == hi:
+            return v_lo
+        w = pos - lo
+        return (1 - w) * v_lo + w * self._kth(sorted_bins, hi)
+
+    def summary(self) -> Dict[str, float]:
+        """Same keys as summarize_trials(), plus max."""
+        if self.count == 0:
+            raise ValueError("No trials to summarize")
+        return {
+            "min": self.vmin,
+            "med": self.quantile(0.5),
+            "p16": self.quantile(0.16),
+            "p84": self.quantile(0.84),
+            "p_emp": self.n_le / self.count,
+            "max": self.vmax,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "obs_val": self.obs_val,
+            "count": self.count,
+            "n_le": self.n_le,
+            "min": self.vmin if self.count else None,
+            "max": self.vmax if self.count else None,
+            "values": self.values,
+            "bins": None if self.values is not None else {str(k): n for k, n in self.bins.items()},
+            "zeros": self.zeros,
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "TrialAccumulator":
+        acc = cls(float(d["obs_val"]))
+        acc.count = int(d["count"])
+        acc.n_le = int(d["n_le"])
+        acc.vmin = math.inf if d["min"] is None else float(d["min"])
+        acc.vmax = -math.inf if d["max"] is None else float(d["max"])
+        acc.values = None if d["values"] is None else [float(v) for v in d["values"]]
+        acc.bins = {} if d["bins"] is None else {int(k): int(n) for k, n in d["bins"].items()}
+        acc.zeros = int(d["zeros"])
+        return acc
+
+
+@dataclass
+class EnsembleState:
+    """One null ensemble: its own RNG stream, trials done so far, and accumulator."""
+    name: str                 # "A" (log-uniform) or "B" (jittered)
+    sigma: Optional[float]    # jitter width for Null B, None for Null A
+    rng: random.Random
+    done: int
+    acc: TrialAccumulator
+
+
+def ensemble_rng(seed: int, name: str, sigma: Optional[float]) -> random.Random:
+    """
+    Independent ("keyed") stream per ensemble. Null A keeps random.Random(seed)
+    so its draws match the legacy single-stream runs; each Null B stream is
+    keyed by its sigma, so adding or reordering sigmas never perturbs the
+    other ensembles.
+    """
+    if name == "A":
+        return random.Random(seed)
+    return keyed_rng(seed, name, sigma)
+
+
+def new_ensembles(seed: int, sigmas: List[float], obs_val: float, streams: str = "keyed") -> List[EnsembleState]:
+    """
+    Fresh ensembles A, B(sigma_1), ... With streams="legacy" they share one
+    random.Random(seed) and must be run in that order (as main() does).
+    """
+    shared = random.Random(seed) if streams == "legacy" else None
+    states = [EnsembleState("A", None, shared or ensemble_rng(seed, "A", None), 0, TrialAccumulator(obs_val))]
+    for sigma in sigmas:
+        states.append(EnsembleState("B", sigma, shared or ensemble_rng(seed, "B", sigma), 0,
+                                    TrialAccumulator(obs_val)))
+    return states
+
+
+def trial_fit(q_list: List[int], state: EnsembleState) -> FitResult:
+    """Draw one null spectrum from the ensemble's stream and fit it."""
+    if state.name == "A":
+        masses = null_log_uniform(state.rng, OBS_MASSES_MEV, n_nonanchor=len(OBS_MASSES_MEV) - 1)
+    else:
+        assert state.sigma is not None
+        masses = null_jittered(state.rng, OBS_MASSES_MEV, sigma=state.sigma)
+    return anchored_fit_score(q_list, masses)
+
+
+def trial_score(q_list: List[int], state: EnsembleState) -> float:
+    return trial_fit(q_list, state).mean_eps
+
+
+def run_ensemble(
+    q_list: List[int],
+    state: EnsembleState,
+    n_target: int,
+    every: int = 0,
+    on_checkpoint: Optional[Callable[[], None]] = None,
+    on_trial: Optional[Callable[[FitResult], None]] = None,
+) -> None:
+    """
+    Advance an ensemble to n_target trials, checkpointing every `every` trials.
+    on_trial, if given, sees every trial's full fit (per-species eps and q_best).
+    """
+    while state.done < n_target:
+        if on_trial is None:
+            state.acc.add(trial_score(q_list, state))
+        else:
+            fit = trial_fit(q_list, state)
+            on_trial(fit)
+            state.acc.add(fit.mean_eps)
+        state.done += 1
+        if every and on_checkpoint is not None and state.done % every == 0:
+            on_checkpoint()
@@ -0,0 +1,110 @@
+# code/golden_unification/lattice.py
+# ============================================================
+# Golden Unification — the q/4 lattice: constants, scan box, q-set
+# ============================================================
+#
+# Single home for the definitions the code/ scripts used to copy-paste:
+#
+#   q(a, b, c) = 8a + 15b + 24c,    m / m_e = PHI^(q/4)
+#   x = log_phi(m / m_e),            eps = min_q | q/4 - x |
+#
+# with (a, b, c) in the pre-registered scan box and the electron as anchor.
+# This module sits on the CLI start-up path, so it imports only math and
+# collections (annotations stay strings; no typing / dataclasses).
+#
+# ============================================================
+
+from __future__ import annotations
+
+import math
+from collections import namedtuple
+
+
+PHI = (1.0 + 5.0 ** 0.5) / 2.0
+LOG_PHI = math.log(PHI)
+
+
+def q_from_abc(a: int, b: int, c: int) -> int:
+    return 8 * a + 15 * b + 24 * c
+
+
+def log_phi(x: float) -> float:
+    return math.log(x) / LOG_PHI
+
+
+# ----------------------------
+# Scan box / q-set
+# ----------------------------
+
+ScanBox = namedtuple("ScanBox", "a_min a_max b_min b_max c_min c_max")
+
+
+# Default scan box (anchored model). Do NOT change once pre-registered.
+SCAN_BOX = ScanBox(-80, 20, -40, 40, -40, 60)
+A_MIN, A_MAX = SCAN_BOX.a_min, SCAN_BOX.a_max
+B_MIN, B_MAX = SCAN_BOX.b_min, SCAN_BOX.b_max
+C_MIN, C_MAX = SCAN_BOX.c_min, SCAN_BOX.c_max
+
+
+def build_q_set(box: ScanBox = SCAN_BOX) -> list[int]:
+    """
+    Sorted distinct q reachable in the box. For fixed (a, b) the c-range is an
+    arithmetic progression of step 24, so it is added as one range per
+    distinct 8a + 15b (~15x faster than the triple loop, same set).
+    """
+    abs_ = {8 * a + 15 * b for a in range(box.a_min, box.a_max + 1) for b in range(box.b_min, box.b_max + 1)}
+    qs = set()
+    for ab in abs_:
+        qs.update(range(ab + 24 * box.c_min, ab + 24 * box.c_max + 1, 24))
+    return sorted(qs)
+
+
+def best_eps_for_mass_ratio(q_list: list[int], ratio: float) -> tuple[float, int]:
+    """
+    Compute epsilon_min(ratio) = min_q | q/4 - log_phi(ratio) |.
+    Returns (eps_min, q_best). Uses binary search around target q.
+    """
+    target = 4.0 * log_phi(ratio)
+
+    # Binary search for nearest q in q_list to target
+    lo, hi = 0, len(q_list) - 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if q_list[mid] < target:
+            lo = mid + 1
+        else:
+            hi = mid
+
+    # lo is the first index with q >= target (or last)
+    candidates = []
+    candidates.append(q_list[lo])
+    if lo > 0:
+        candidates.append(q_list[lo - 1])
+    if lo + 1 < len(q_list):
+        candidates.append(q_list[lo + 1])
+
+    best_q = candidates[0]
+    best_eps = abs(best_q / 4.0 - log_phi(ratio))
+    for q in candidates[1:]:
+        eps = abs(q / 4.0 - log_phi(ratio))
+        if eps < best_eps:
+            best_eps = eps
+            best_q = q
+    return best_eps, best_q
+
+
+# ----------------------------
+# Observed dataset
+# ----------------------------
+
+# Observed masses in MeV (consistent units; ratios are unitless).
+OBS_MASSES_MEV: dict[str, float] = {
+    "electron": 0.51099895,      # MeV
+    "muon": 105.6583755,         # MeV
+    "tau": 1776.86,              # MeV
+    "W": 80379.0,                # MeV (80.379 GeV)
+    "Z": 91187.6,                # MeV (91.1876 GeV)
+    "top": 172760.0,             # MeV (172.76 GeV)
+}
+
+ANCHOR = "electron"
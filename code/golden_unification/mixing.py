@@ -0,0 +1,267 @@
+# code/golden_unification/mixing.py
+# ============================================================
+# Golden Unification — mixing holonomy match and its Haar-random unitary null
+# Used by: verify_mixing.py (scans; --null_N adds a null paragraph to
+#          latex_block), mixing_surface.py, fit_server.py
+# ============================================================
+#
+# J_invariant and the two delta scans (scan_delta_match_sin / _deg) are the
+# ones verify_mixing.py reports: delta on a step_deg grid over [0, 360],
+# first minimum of the match score wins.
+#
+# verify_mixing.py compares sin(delta) with sin(theta_pred). Whether the
+# MEASURED phase matching the prediction means anything depends on how often
+# a random mixing matrix would match as well. Two nulls:
+#
+#   haar   V ~ Haar on U(3): Gram-Schmidt of three complex Gaussian vectors.
+#          Angles and phase are read off rephasing-invariantly,
+#            s13 = |V_ub|,  s12 = |V_us| / c13,  s23 = |V_cb| / c13,
+#            J   = Im(V_us V_cb V_ub* V_cs*)  = c12 c23 c13^2 s12 s23 s13 sin(delta),
+#            |V_td|^2 = s12^2 s23^2 + c12^2 c23^2 s13^2 - 2 s12 s23 c12 c23 s13 cos(delta),
+#          so delta = atan2(J, c13^2 (s12^2 s23^2 + c12^2 c23^2 s13^2 - |V_td|^2) / 2).
+#   angles the angles fixed at their measured values. The Haar measure factorizes
+#          with a flat density in delta, so conditioned on the angles delta is
+#          uniform on [0, 360); its p-value also has a closed form (reported
+#          next to the Monte Carlo one).
+#
+# Match scores (smaller = better), as in verify_mixing's two scan criteria:
+#   sin:  |sin(delta) - sin(theta_pred)|
+#   deg:  angular distance between delta and theta_pred, in [0, 180]
+# p_emp = Pr_null(score <= score_obs), with score_obs from the measured delta.
+#
+# Trials run in fixed-size blocks with their own RNG streams, optionally across
+# worker processes; results do not depend on the number of workers.
+#
+# ============================================================
+
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from .blocks import blocks, keyed_rng, map_blocks
+
+
+BLOCK_TRIALS = 4096
+
+Matrix = List[List[complex]]
+
+
+# ----------------------------
+# Jarlskog invariant and delta scans
+# ----------------------------
+
+def J_invariant(s12: float, s23: float, s13: float, delta_deg: float) -> float:
+    """J = c12 c23 c13^2 s12 s23 s13 sin(delta)"""
+    c12 = math.sqrt(max(0.0, 1.0 - s12*s12))
+    c23 = math.sqrt(max(0.0, 1.0 - s23*s23))
+    c13 = math.sqrt(max(0.0, 1.0 - s13*s13))
+    delta = math.radians(delta_deg)
+    return c12*c23*(c13**2)*s12*s23*s13*math.sin(delta)
+
+
+def scan_delta_match_sin(
+    target_sin: float, s12: float, s23: float, s13: float, step_deg: float = 0.1
+) -> Dict[str, float]:
+    """Find delta that minimizes |sin(delta)-target_sin| over [0,360]."""
+    best = None
+    d = 0.0
+    while d <= 360.0 + 1e-12:
+        score = abs(math.sin(math.radians(d)) - target_sin)
+        if best is None or score < best["score"]:
+            best = {"delta_deg": d, "score": score, "J": J_invariant(s12, s23, s13, d)}
+        d += step_deg
+    return best
+
+
+def scan_delta_match_deg(
+    target_deg: float, s12: float, s23: float, s13: float, step_deg: float = 0.1
+) -> Dict[str, float]:
+    """Find delta that minimizes |delta-target_deg| over [0,360]."""
+    best = None
+    d = 0.0
+    while d <= 360.0 + 1e-12:
+        score = abs(d - target_deg)
+        if best is None or score < best["score"]:
+            best = {"delta_deg": d, "score": score, "J": J_invariant(s12, s23, s13, d)}
+        d += step_deg
+    return best
+
+
+# ----------------------------
+# Haar U(3) and parameter extraction
+# ----------------------------
+
+def haar_u3(rng: random.Random) -> Matrix:
+    """Haar-distributed 3x3 unitary (rows from Gram-Schmidt of complex Gaussians)."""
+    g = rng.gauss
+    rows: Matrix = []
+    for _ in range(3):
+        v = [complex(g(0.0, 1.0), g(0.0, 1.0)) for _ in range(3)]
+        for u in rows:
+            dot = sum(ui.conjugate() * vi for ui, vi in zip(u, v))
+            v = [vi - dot * ui for ui, vi in zip(u, v)]
+        norm = math.sqrt(sum(abs(vi) ** 2 for vi in v))
+        rows.append([vi / norm for vi in v])
+    return rows
+
+
+@dataclass
+class MixingParams:
+    s12: float
+    s23: float
+    s13: float
+    delta_deg: float          # in [0, 360)
+    J: float
+
+
+def extract_params(V: Matrix) -> MixingParams:
+    """Standard-parametrization angles, phase and Jarlskog invariant of a unitary V."""
+    s13 = min(1.0, abs(V[0][2]))
+    c13sq = max(0.0, 1.0 - s13 * s13)
+    c13 = math.sqrt(c13sq)
+    s12 = min(1.0, abs(V[0][1]) / c13) if c13 > 0.0 else 0.0
+    s23 = min(1.0, abs(V[1][2]) / c13) if c13 > 0.0 else 0.0
+    c12 = math.sqrt(max(0.0, 1.0 - s12 * s12))
+    c23 = math.sqrt(max(0.0, 1.0 - s23 * s23))
+    J = (V[0][1] * V[1][2] * V[0][2].conjugate() * V[1][1].conjugate()).imag
+    cos_part = (s12 * s12 * s23 * s23 + c12 * c12 * c23 * c23 * s13 * s13 - abs(V[2][0]) ** 2) * c13sq / 2.0
+    delta = math.degrees(math.atan2(J, cos_part)) % 360.0
+    return MixingParams(s12, s23, s13, delta, J)
+
+
+def standard_matrix(s12: float, s23: float, s13: float, delta_deg: float) -> Matrix:
+    """PDG standard parametrization (used to check extract_params)."""
+    c12, c23, c13 = (math.sqrt(1.0 - s * s) for s in (s12, s23, s13))
+    e = complex(math.cos(math.radians(delta_deg)), math.sin(math.radians(delta_deg)))
+    return [
+        [c12 * c13, s12 * c13, s13 / e],
+        [-s12 * c23 - c12 * s23 * s13 * e, c12 * c23 - s12 * s23 * s13 * e, s23 * c13],
+        [s12 * s23 - c12 * c23 * s13 * e, -c12 * s23 - s12 * c23 * s13 * e, c23 * c13],
+    ]
+
+
+# ----------------------------
+# Match scores and p-values
+# ----------------------------
+
+def score_sin(delta_deg: float, theta_pred_deg: float) -> float:
+    return abs(math.sin(math.radians(delta_deg)) - math.sin(math.radians(theta_pred_deg)))
+
+
+def score_deg(delta_deg: float, theta_pred_deg: float) -> float:
+    d = abs(delta_deg - theta_pred_deg) % 360.0
+    return min(d, 360.0 - d)
+
+
+def p_uniform_sin(theta_pred_deg: float, obs: float) -> float:
+    """Exact Pr(|sin(delta) - sin(theta)| <= obs) for delta uniform on [0, 360)."""
+    def cdf(y: float) -> float:                       # Pr(sin(delta) <= y)
+        return 0.5 + math.asin(max(-1.0, min(1.0, y))) / math.pi
+
+    s = math.sin(math.radians(theta_pred_deg))
+    return cdf(s + obs) - cdf(s - obs)
+
+
+def p_uniform_deg(obs: float) -> float:
+    return min(1.0, obs / 180.0)
+
+
+@dataclass
+class NullCounts:
+    n: int = 0
+    le_sin: int = 0
+    le_deg: int = 0
+    J_abs_sum: float = 0.0
+
+    def merge(self, other: "NullCounts") -> None:
+        self.n += other.n
+        self.le_sin += other.le_sin
+        self.le_deg += other.le_deg
+        self.J_abs_sum += other.J_abs_sum
+
+
+def block_rng(seed: int, variant: str, block: int) -> random.Random:
+    return keyed_rng(seed, "mixing", variant, block)
+
+
+def null_block(
+    variant: str,
+    theta_pred_deg: float,
+    obs_sin: float,
+    obs_deg: float,
+    angles: Tuple[float, float, float],
+    seed: int,
+    block: int,
+    n: int,
+) -> NullCounts:
+    rng = block_rng(seed, variant, block)
+    out = NullCounts()
+    s12, s23, s13 = angles
+    K = (math.sqrt(1 - s12 * s12) * math.sqrt(1 - s23 * s23) * (1 - s13 * s13) * s12 * s23 * s13)
+    for _ in range(n):
+        if variant == "haar":
+            p = extract_params(haar_u3(rng))
+            delta, J = p.delta_deg, p.J
+        else:
+            delta = 360.0 * rng.random()
+            J = K * math.sin(math.radians(delta))
+        out.n += 1
+        out.le_sin += score_sin(delta, theta_pred_deg) <= obs_sin
+        out.le_deg += score_deg(delta, theta_pred_deg) <= obs_deg
+        out.J_abs_sum += abs(J)
+    return out
+
+
+def _block_task(task: Tuple[str, float, float, float, Tuple[float, float, float], int, int, int]) -> NullCounts:
+    return null_block(*task)
+
+
+def run_null(
+    variant: str,
+    theta_pred_deg: float,
+    delta_obs_deg: float,
+    angles: Tuple[float, float, float],
+    n_trials: int,
+    seed: int,
+    workers: int = 1,
+) -> Dict[str, float]:
+    """Empirical p-values of the observed match under the "haar" or "angles" null."""
+    obs_sin = score_sin(delta_obs_deg, theta_pred_deg)
+    obs_deg = score_deg(delta_obs_deg, theta_pred_deg)
+    tasks = [(variant, theta_pred_deg, obs_sin, obs_deg, angles, seed, block, n)
+             for block, n in blocks(n_trials, BLOCK_TRIALS)]
+    tot = NullCounts()
+    for part in map_blocks(_block_task, tasks, workers):
+        tot.merge(part)
+    res = {
+        "N": tot.n,
+        "score_sin": obs_sin,
+        "score_deg": obs_deg,
+        "p_sin": tot.le_sin / tot.n,
+        "p_deg": tot.le_deg / tot.n,
+        "mean_abs_J": tot.J_abs_sum / tot.n,
+    }
+    if variant == "angles":
+        res["p_sin_exact"] = p_uniform_sin(theta_pred_deg, obs_sin)
+        res["p_deg_exact"] = p_uniform_deg(obs_deg)
+    return res
+
+
+def null_pack(
+    theta_pred_deg: float,
+    delta_obs_deg: float,
+    angles: Tuple[float, float, float],
+    n_trials: int,
+    seed: int,
+    workers: int,
+) -> Dict[str, object]:
+    """Both nulls for one sector, in the shape latex_block expects."""
+    return {
+        "theta_pred_deg": theta_pred_deg,
+        "delta_obs_deg": delta_obs_deg,
+        "haar": run_null("haar", theta_pred_deg, delta_obs_deg, angles, n_trials, seed, workers),
+        "angles": run_null("angles", theta_pred_deg, delta_obs_deg, angles, n_trials, seed, workers),
+    }
@@ -0,0 +1,131 @@
+# code/golden_unification/pdg.py
+# ============================================================
+# Golden Unification — PDG mass/width table readers
+# ============================================================
+#
+# Two inputs live in data/pdg/:
+#   mass_width_latest.json  full RPP MC table; each "raw" field holds one
+#                           line of mass_width_YYYY.txt (leading blanks stripped)
+#   sm_masses_latest.csv    SM subset keyed by species name (electron, muon, ...);
+#                           load_checked_sm_masses drops rows whose MC ID is not
+#                           the particle the key names (the quark rows, currently)
+#
+# The structured fields of the JSON dump are not reliable (mass_GeV holds the
+# MC ID), so the full table is re-parsed from "raw" using the RPP format
+#   FORMAT (BN, 4I8, 2(1X,E18.0, 1X,E8.0, 1X,E8.0), 1X,A21)
+#
+# ============================================================
+
+from __future__ import annotations
+
+import csv
+import json
+import math
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PDG_DIR = os.path.normpath(os.path.join(HERE, "..", "..", "data", "pdg"))
+MASS_WIDTH_JSON = os.path.join(PDG_DIR, "mass_width_latest.json")
+SM_MASSES_CSV = os.path.join(PDG_DIR, "sm_masses_latest.csv")
+
+
+@dataclass(frozen=True)
+class PdgEntry:
+    mcids: Tuple[int, ...]
+    name: str
+    charges: str
+    mass_gev: float
+    err_plus_gev: float
+    err_minus_gev: float
+    width_gev: Optional[float]
+
+    @property
+    def label(self) -> str:
+        return f"{self.name}({self.mcids[0]})"
+
+
+def _num(field: str) -> Optional[float]:
+    field = field.strip()
+    return float(field) if field else None
+
+
+def parse_mass_width_line(raw: str) -> Optional[PdgEntry]:
+    """
+    Parse one data line of mass_width_YYYY.txt. Lines whose leading blanks
+    were stripped are re-aligned on the first (right-justified) I8 field.
+    Returns None for documentation lines and entries without a mass.
+    """
+    if not raw.strip() or raw.lstrip().startswith("*"):
+        return None
+    if raw[:1] != " ":
+        first = raw.split(None, 1)[0]
+        raw = " " * max(0, 8 - len(first)) + raw
+    raw = raw.ljust(128)
+    mcids = tuple(int(raw[k:k + 8]) for k in range(0, 32, 8) if raw[k:k + 8].strip())
+    mass = _num(raw[33:51])
+    if not mcids or mass is None:
+        return None
+    # A21: name left-justified, charge states right-justified (names have no blanks)
+    tail = raw[107:128].split(None, 1)
+    return PdgEntry(
+        mcids=mcids,
+        name=tail[0] if tail else "",
+        charges=tail[1].strip() if len(tail) > 1 else "",
+        mass_gev=mass,
+        err_plus_gev=_num(raw[52:60]) or 0.0,
+        err_minus_gev=_num(raw[61:69]) or 0.0,
+        width_gev=_num(raw[70:88]),
+    )
+
+
+def load_mass_width_lines(lines: List[str]) -> List[PdgEntry]:
+    return [e for e in (parse_mass_width_line(ln) for ln in lines) if e is not None]
+
+
+def load_mass_width_json(path: str = MASS_WIDTH_JSON) -> List[PdgEntry]:
+    """All entries of a mass_width_*.json dump that carry a mass."""
+    with open(path, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+    return load_mass_width_lines([p["raw"] for p in payload["particles"]])
+
+
+def load_mass_width_txt(path: str) -> List[PdgEntry]:
+    """All entries of an original mass_width_YYYY.txt file that carry a mass."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return load_mass_width_lines([ln.rstrip("\n") for ln in f])
+
+
+def massive(entries: List[PdgEntry]) -> List[PdgEntry]:
+    """Entries with a strictly positive mass (usable in log space)."""
+    return [e for e in entries if e.mass_gev > 0.0 and math.isfinite(e.mass_gev)]
+
+
+def load_sm_masses(path: str = SM_MASSES_CSV) -> Dict[str, Dict[str, str]]:
+    """Rows of sm_masses_latest.csv keyed by species key, in file order."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return {row["key"]: row for row in csv.DictReader(f)}
+
+
+# MC ID that each sm_masses_latest.csv key names. The upstream extractor
+# matched the quark keys to hadrons (b_quark -> b(1)(1235), u_quark ->
+# Upsilon(2)(1D), ...), so a row is only trusted if its mcid_1 agrees.
+SM_KEY_MCID: Dict[str, int] = {
+    "d_quark": 1, "u_quark": 2, "s_quark": 3, "c_quark": 4, "b_quark": 5, "t_quark": 6,
+    "electron": 11, "muon": 13, "tau": 15,
+    "Z_boson": 23, "W_boson": 24, "higgs": 25,
+}
+
+
+def sm_row_matches(key: str, mcid: str) -> bool:
+    """True if an SM table row's MC ID is the particle its key names."""
+    return SM_KEY_MCID.get(key) == (int(mcid) if mcid.strip() else None)
+
+
+def load_checked_sm_masses(path: str = SM_MASSES_CSV) -> Tuple[Dict[str, Dict[str, str]], List[str]]:
+    """(rows of load_sm_masses whose MC ID matches their key, keys refused)."""
+    rows = load_sm_masses(path)
+    ok = {k: r for k, r in rows.items() if sm_row_matches(k, r["mcid_1"])}
+    return ok, [k for k in rows if k not in ok]
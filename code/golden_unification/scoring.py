@@ -0,0 +1,164 @@
+# code/golden_unification/scoring.py
+# ============================================================
+# Golden Unification — anchored lattice fit of a mass spectrum
+# ============================================================
+#
+# eps(m) = min_q | q/4 - log_phi(m / m_e) | over the feasible q-set, found by
+# binary search (lattice.best_eps_for_mass_ratio); the anchored score is the
+# mean eps over all species (the anchor contributes 0). This is the reference
+# float64 path every null ensemble is scored on (fixed_point_scoring.py
+# certifies against it).
+#
+# NearestQ is the O(1) variant (prev/next tables over the integer span of the
+# q-set) behind the pairwise, free-scale, look-elsewhere and resampling
+# scorers; pairwise_mean_eps is the anchor-free all-pairs statistic.
+#
+# ============================================================
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+from .lattice import ANCHOR, best_eps_for_mass_ratio
+
+
+# Pairs evaluated per chunk when streaming the pair matrix of one spectrum.
+CHUNK_PAIRS = 1 << 16
+
+
+@dataclass
+class FitResult:
+    mean_eps: float
+    per_particle_eps: Dict[str, float]
+    per_particle_qbest: Dict[str, int]
+
+
+def anchored_fit_score(q_list: List[int], masses_mev: Dict[str, float]) -> FitResult:
+    """
+    Anchored fit: electron is the anchor with ratio=1 => epsilon=0.
+    For each other particle, compute eps_min using q-set.
+    """
+    if ANCHOR not in masses_mev:
+        raise ValueError(f"Anchor '{ANCHOR}' missing from masses")
+
+    me = masses_mev[ANCHOR]
+    per_eps: Dict[str, float] = {}
+    per_q: Dict[str, int] = {}
+
+    # Anchor (exact by convention)
+    per_eps[ANCHOR] = 0.0
+    per_q[ANCHOR] = 0  # by definition q_e=0 after anchoring
+
+    for name, m in masses_mev.items():
+        if name == ANCHOR:
+            continue
+        ratio = m / me
+        eps, qbest = best_eps_for_mass_ratio(q_list, ratio)
+        per_eps[name] = eps
+        per_q[name] = qbest
+
+    # mean epsilon over all species including anchor (anchor adds 0)
+    mean_eps = sum(per_eps.values()) / len(per_eps)
+    return FitResult(mean_eps=mean_eps, per_particle_eps=per_eps, per_particle_qbest=per_q)
+
+
+# ----------------------------
+# Nearest reachable q in O(1)
+# ----------------------------
+
+class NearestQ:
+    """
+    Lookup tables over the integer span [q_min, q_max] of a sorted q-set:
+    prev_le[k] = largest q <= q_min + k, next_ge[k] = smallest q >= q_min + k.
+    Targets outside the span clamp to the end points. eps = |q - y| / divisor
+    (divisor 4 for the published q/4 lattice).
+    """
+
+    def __init__(self, q_list: Sequence[int], divisor: int = 4) -> None:
+        if not q_list:
+            raise ValueError("NearestQ(): empty q-set")
+        self.divisor = divisor
+        self.q_min = q_list[0]
+        self.q_max = q_list[-1]
+        span = self.q_max - self.q_min + 1
+        present = bytearray(span)
+        for qq in q_list:
+            present[qq - self.q_min] = 1
+        self.prev_le = array("l", [0]) * span
+        self.next_ge = array("l", [0]) * span
+        last = self.q_min
+        for k in range(span):
+            if present[k]:
+                last = self.q_min + k
+            self.prev_le[k] = last
+        nxt = self.q_max
+        for k in range(span - 1, -1, -1):
+            if present[k]:
+                nxt = self.q_min + k
+            self.next_ge[k] = nxt
+
+    def nearest(self, y: float) -> Tuple[float, int]:
+        """(eps, q_best) for a target y in q units (y = divisor*log_phi(ratio))."""
+        d = float(self.divisor)
+        if y <= self.q_min:
+            return (self.q_min - y) / d, self.q_min
+        if y >= self.q_max:
+            return (y - self.q_max) / d, self.q_max
+        k = int(y - self.q_min)
+        lo = self.prev_le[k]
+        hi = self.next_ge[k + 1] if y > lo else lo
+        if y - lo <= hi - y:
+            return (y - lo) / d, lo
+        return (hi - y) / d, hi
+
+    def eps_sum(self, ys: Sequence[float]) -> float:
+        """Sum of nearest-q eps over a batch of targets (the inner loop of every scorer)."""
+        q_min, q_max = self.q_min, self.q_max
+        prev_le, next_ge = self.prev_le, self.next_ge
+        total = 0.0
+        for y in ys:
+            if y <= q_min:
+                total += q_min - y
+            elif y >= q_max:
+                total += y - q_max
+            else:
+                k = int(y - q_min)          # y - q_min > 0, so int() is floor()
+                lo = prev_le[k]
+                d_lo = y - lo
+                if d_lo == 0.0:
+                    continue
+                d_hi = next_ge[k + 1] - y
+                total += d_lo if d_lo <= d_hi else d_hi
+        return total / self.divisor
+
+
+# ----------------------------
+# Pairwise statistic
+# ----------------------------
+
+def pair_count(p: int) -> int:
+    return p * (p - 1) // 2
+
+
+def pairwise_mean_eps(nq: NearestQ, logs_phi: Sequence[float], chunk: int = CHUNK_PAIRS) -> float:
+    """
+    Mean nearest-q eps over all pairs of a spectrum given as log_phi masses.
+    Streams rows of the (sorted) log-difference matrix in chunks of ~chunk pairs.
+    """
+    x = sorted(logs_phi)
+    p = len(x)
+    if p < 2:
+        raise ValueError("pairwise_mean_eps(): need at least two masses")
+    total = 0.0
+    buf: List[float] = []
+    for i in range(p - 1):
+        xi4 = 4.0 * x[i]
+        buf.extend([4.0 * xj - xi4 for xj in x[i + 1:]])
+        if len(buf) >= chunk:
+            total += nq.eps_sum(buf)
+            buf = []
+    if buf:
+        total += nq.eps_sum(buf)
+    return total / pair_count(p)
@@ -0,0 +1,107 @@
+# code/gu.py
+# ============================================================
+# Golden Unification — single command line over the core routines
+# ============================================================
+#
+# Runs from the repo root without installing anything (code/ is then on
+# sys.path, so both the golden_unification package and the scripts import).
+#
+#   fit           anchored q/4 fit of the observed set or of given masses (in-process)
+#   null          null ensembles and p-values          (null_tests_fast_v2.py)
+#   mixing        CKM/PMNS holonomy match (+ nulls)     (verify_mixing.py)
+#   multiplicity  multiplicity-vs-tolerance curves      (multiplicity_curves.py)
+#   bayes         lattice vs log-uniform Bayes factor   (bayes_factor.py)
+#   archive       multi-edition PDG archive / rescoring (pdg_archive.py)
+#
+# Everything after a delegated subcommand is passed to that script's own
+# argument parser unchanged (so "gu.py null --help" shows null_tests_fast_v2's
+# flags), and its module is imported only when that subcommand runs.
+#
+# Usage examples (run from repo root):
+#   python .\code\gu.py fit
+#   python .\code\gu.py fit 0.1056583755 1.77686 --json
+#   python .\code\gu.py null --N 5000 --seed 1
+#   python .\code\gu.py mixing --null_N 100000 --null_workers 4
+#   python .\code\gu.py multiplicity --tau 0.05
+#   python .\code\gu.py bayes --table pdg
+#   python .\code\gu.py archive rescore --moved-only
+#
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import sys
+
+
+# subcommand -> (module with main(argv), help)
+DELEGATED: dict[str, tuple[str, str]] = {
+    "null": ("null_tests_fast_v2", "null ensembles A/B and empirical p-values"),
+    "mixing": ("verify_mixing", "CKM/PMNS holonomy match and its Haar null"),
+    "multiplicity": ("multiplicity_curves", "multiplicity-vs-tolerance curves"),
+    "bayes": ("bayes_factor", "Bayes factor of the lattice model vs the log-uniform null"),
+    "archive": ("pdg_archive", "multi-edition PDG archive and per-edition rescoring"),
+}
+
+
+def fit_main(argv: list[str]) -> None:
+    from golden_unification.lattice import ANCHOR, OBS_MASSES_MEV, best_eps_for_mass_ratio, build_q_set, log_phi
+
+    ap = argparse.ArgumentParser(prog="gu.py fit", description="Anchored q/4 lattice fit (electron at q = 0).")
+    ap.add_argument("masses_gev", type=float, nargs="*",
+                    help="masses in GeV (default: the observed set of null_tests_fast_v2)")
+    ap.add_argument("--anchor-gev", type=float, default=0.00051099895, help="anchor mass (m_e) for masses_gev")
+    ap.add_argument("--json", action="store_true", help="print one JSON object instead of a table")
+    args = ap.parse_args(argv)
+
+    q_list = build_q_set()
+    if args.masses_gev:
+        labels = [f"{m:.10g}" for m in args.masses_gev]
+        masses, anchor = args.masses_gev, args.anchor_gev
+    else:
+        # observed set; the anchor itself sits at q = 0, so the mean is scoring.anchored_fit_score's
+        labels = list(OBS_MASSES_MEV)
+        masses, anchor = list(OBS_MASSES_MEV.values()), OBS_MASSES_MEV[ANCHOR]
+    rows = []
+    for label, m in zip(labels, masses):
+        eps, qb = (0.0, 0) if m == anchor else best_eps_for_mass_ratio(q_list, m / anchor)
+        rows.append({"name": label, "x": log_phi(m / anchor), "q": qb, "eps": eps})
+    mean_eps = sum(r["eps"] for r in rows) / len(rows)
+
+    if args.json:
+        print(json.dumps({"fits": rows, "mean_eps": mean_eps}))
+        return
+    for r in rows:
+        print(f"{r['name']:>14s}  q={r['q']:6d}  eps={r['eps']:.6e}")
+    print(f"{'mean':>14s}  eps={mean_eps:.6e}  (q-set: {len(q_list)} values)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="gu.py", description="Golden Unification core command line.")
+    sub = ap.add_subparsers(dest="cmd", metavar="COMMAND")
+    sub.add_parser("fit", help="anchored lattice fit (in-process)", add_help=False)
+    for name, (_, help_) in DELEGATED.items():
+        sub.add_parser(name, help=help_, add_help=False)
+    return ap
+
+
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    ap = build_parser()
+    if not argv or argv[0] not in DELEGATED and argv[0] != "fit":
+        ap.parse_args(argv)                      # --help, or an error for unknown commands
+        ap.print_help()
+        return
+    cmd, rest = argv[0], argv[1:]
+    if cmd == "fit":
+        fit_main(rest)
+        return
+    module, _ = DELEGATED[cmd]
+    sys.argv[0] = f"gu.py {cmd}"                 # usage lines of the delegated parser
+    importlib.import_module(module).main(rest)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+# code/lattice_lookelsewhere.py
+# ============================================================
+# Golden Unification — look-elsewhere scan over alternative charge lattices
+# Writes (optional): ../shared/paperIX_lookelsewhere.tex
+# ============================================================
+#
+# The published charge map is q = 8a + 15b + 24c with epsilon measured on
+# q/4. This script asks how special (8, 15, 24; /4) is among all lattices
+#
+#   q = alpha*a + beta*b + gamma*c,   eps = min_q | q/d - log_phi(m/m_e) |
+#
+# with 1 <= alpha < beta < gamma <= --coef-max, divisor d in --divisors, and
+# (a, b, c) in the same pre-registered scan box.
+#
+# For every lattice L:
+#   - the reachable q-set is built as a bitmask sumset (three shifted-OR
+#     passes over Python ints) and turned into an O(1) NearestQ table;
+#   - the observed mean eps and its Null A p-value p_L are computed on ONE
+#     shared batch of null spectra (log-uniform, electron anchored);
+#   - each null trial's own local p-value under L is folded into a running
+#     minimum over lattices.
+#
+# The trials-factor-corrected global p-value of the published lattice is
+#   p_global = Pr_null( min_L p_L  <=  p_published ),
+# read off the running minima. Lattices are split across worker processes;
+# the result does not depend on --workers.
+#
+# Usage examples (run from repo root):
+#   python .\code\lattice_lookelsewhere.py --coef-max 12 --N 500
+#   python .\code\lattice_lookelsewhere.py --workers 8
+#   python .\code\lattice_lookelsewhere.py --divisors 4 --out-tex shared\paperIX_lookelsewhere.tex
+#
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import os
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+from golden_unification.blocks import format_sci, keyed_rng, map_blocks, tex_banner, write_tex_block
+from golden_unification.lattice import A_MAX, A_MIN, ANCHOR, B_MAX, B_MIN, C_MAX, C_MIN, OBS_MASSES_MEV, log_phi
+from golden_unification.scoring import NearestQ
+
+
+PUBLISHED = (8, 15, 24, 4)
+
+
+# ----------------------------
+# Lattices
+# ----------------------------
+
+def reachable_q(alpha: int, beta: int, gamma: int) -> List[int]:
+    """Sorted distinct alpha*a + beta*b + gamma*c over the scan box (bitmask sumset)."""
+    def progression(step: int, n: int) -> int:
+        m = 0
+        for k in range(n):
+            m |= 1 << (step * k)
+        return m
+
+    def sumset(mask: int, step: int, n: int) -> int:
+        out = 0
+        for k in range(n):
+            out |= mask << (step * k)
+        return out
+
+    mask = progression(alpha, A_MAX - A_MIN + 1)
+    mask = sumset(mask, beta, B_MAX - B_MIN + 1)
+    mask = sumset(mask, gamma, C_MAX - C_MIN + 1)
+    offset = alpha * A_MIN + beta * B_MIN + gamma * C_MIN
+    bits = bin(mask)[:1:-1]                       # little-endian bit string
+    return [offset + k for k, ch in enumerate(bits) if ch == "1"]
+
+
+def lattice_family(coef_max: int, divisors: Sequence[int]) -> List[Tuple[int, int, int, int]]:
+    fam = [(a, b, c, d)
+           for a in range(1, coef_max + 1)
+           for b in range(a + 1, coef_max + 1)
+           for c in range(b + 1, coef_max + 1)
+           for d in divisors]
+    if PUBLISHED not in fam:
+        fam.append(PUBLISHED)
+    return fam
+
+
+# ----------------------------
+# Shared null draws
+# ----------------------------
+
+@dataclass
+class NullBatch:
+    n_trials: int
+    n_free: int                 # non-anchor species per trial
+    x: array                    # flat (n_trials * n_free) log_phi(m/m_e), row-major
+
+
+def draw_null_batch(seed: int, n_trials: int) -> NullBatch:
+    """Null A of null_tests_fast_v2: non-anchor masses i.i.d. log-uniform over the observed range."""
+    me = OBS_MASSES_MEV[ANCHOR]
+    xs = [log_phi(m / me) for k, m in OBS_MASSES_MEV.items() if k != ANCHOR]
+    lo, hi = min(xs), max(xs)
+    rng = keyed_rng(seed, "lookelsewhere")
+    x = array("d", (lo + (hi - lo) * rng.random() for _ in range(n_trials * len(xs))))
+    return NullBatch(n_trials, len(xs), x)
+
+
+def observed_x() -> List[float]:
+    me = OBS_MASSES_MEV[ANCHOR]
+    return [log_phi(m / me) for k, m in OBS_MASSES_MEV.items() if k != ANCHOR]
+
+
+# ----------------------------
+# Per-lattice evaluation
+# ----------------------------
+
+@dataclass
+class LatticeScore:
+    lattice: Tuple[int, int, int, int]
+    obs_mean: float
+    p_local: float
+
+
+def score_lattice(
+    lat: Tuple[int, int, int, int],
+    obs: Sequence[float],
+    batch: NullBatch,
+    run_min: array,
+) -> LatticeScore:
+    """Observed mean eps, Null A p-value, and fold per-trial local p into run_min."""
+    alpha, beta, gamma, d = lat
+    nq = NearestQ(reachable_q(alpha, beta, gamma), divisor=d)
+    n_species = len(obs) + 1                           # anchor contributes eps = 0
+    obs_mean = nq.eps_sum([d * x for x in obs]) / n_species
+
+    k = batch.n_free
+    xs = batch.x
+    vals = [nq.eps_sum([d * v for v in xs[j * k:(j + 1) * k]]) / n_species
+            for j in range(batch.n_trials)]
+    n = batch.n_trials
+    p_local = sum(1 for v in vals if v <= obs_mean) / n
+
+    # local p of each null trial = fraction of null trials scoring <= it
+    order = sorted(range(n), key=vals.__getitem__)
+    rank = 0
+    while rank < n:
+        hi = rank
+        while hi + 1 < n and vals[order[hi + 1]] == vals[order[rank]]:
+            hi += 1
+        p = (hi + 1) / n
+        for t in range(rank, hi + 1):
+            j = order[t]
+            if p < run_min[j]:
+                run_min[j] = p
+        rank = hi + 1
+    return LatticeScore(lat, obs_mean, p_local)
+
+
+_WORKER: Dict[str, object] = {}
+
+
+def _worker_init(batch: NullBatch, obs: List[float]) -> None:
+    _WORKER["batch"] = batch
+    _WORKER["obs"] = obs
+
+
+def _worker_chunk(lattices: List[Tuple[int, int, int, int]]) -> Tuple[List[LatticeScore], array]:
+    batch = _WORKER["batch"]
+    obs = _WORKER["obs"]
+    assert isinstance(batch, NullBatch) and isinstance(obs, list)
+    run_min = array("d", [1.0]) * batch.n_trials
+    scores = [score_lattice(lat, obs, batch, run_min) for lat in lattices]
+    return scores, run_min
+
+
+def scan(
+    lattices: List[Tuple[int, int, int, int]],
+    batch: NullBatch,
+    workers: int,
+    chunk: int = 64,
+) -> Tuple[List[LatticeScore], array]:
+    obs = observed_x()
+    chunks = [lattices[i:i + chunk] for i in range(0, len(lattices), chunk)]
+    parts = map_blocks(_worker_chunk, chunks, workers, _worker_init, (batch, obs))
+    scores: List[LatticeScore] = []
+    run_min = array("d", [1.0]) * batch.n_trials
+    for sc, rm in parts:
+        scores.extend(sc)
+        for j in range(batch.n_trials):
+            if rm[j] < run_min[j]:
+                run_min[j] = rm[j]
+    return scores, run_min
+
+
+def global_p(run_min: Sequence[float], p_obs: float) -> float:
+    return sum(1 for v in run_min if v <= p_obs) / len(run_min)
+
+
+def write_tex(
+    out_path: str,
+    n_lattices: int,
+    coef_max: int,
+    divisors: Sequence[int],
+    pub: LatticeScore,
+    rank: int,
+    p_glob: float,
+    best: List[LatticeScore],
+    N: int,
+    seed: int,
+) -> None:
+    lines = tex_banner("Look-elsewhere scan over charge lattices", "lattice_lookelsewhere.py")
+    lines.append("\\paragraph{Look-elsewhere correction.}")
+    lines.append(
+        f"Scanning {n_lattices} lattices $q=\\alpha a+\\beta b+\\gamma c$ with "
+        f"$1\\le\\alpha<\\beta<\\gamma\\le {coef_max}$ and divisors "
+        f"$d\\in\\{{{','.join(str(d) for d in divisors)}\\}}$ on one shared Null A batch, "
+        f"the published lattice $(8,15,24;\\,4)$ has $p_\\mathrm{{loc}}={pub.p_local:.6g}$ "
+        f"(rank {rank} of {n_lattices}) and trials-factor-corrected "
+        f"$p_\\mathrm{{glob}}=\\Pr(\\min_L p_L\\le p_\\mathrm{{loc}})={p_glob:.6g}$."
+    )
+    lines.append("\\begin{center}")
+    lines.append("\\begin{tabular}{c c c}")
+    lines.append("\\hline")
+    lines.append("$(\\alpha,\\beta,\\gamma;\\,d)$ & $\\overline{\\epsilon}_\\mathrm{obs}$ & $p_\\mathrm{loc}$ \\\\")
+    lines.append("\\hline")
+    for s in best:
+        a, b, c, d = s.lattice
+        lines.append(f"$({a},{b},{c};\\,{d})$ & ${format_sci(s.obs_mean)}$ & ${s.p_local:.6g}$ \\\\")
+    lines.append("\\hline")
+    lines.append("\\end{tabular}")
+    lines.append("\\end{center}")
+    lines.append(f"% N={N} shared null trials, seed={seed}.")
+    write_tex_block(out_path, lines)
+
+
+# ----------------------------
+# Main
+# ----------------------------
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Look-elsewhere scan over coefficient triples and divisors.")
+    ap.add_argument("--coef-max", type=int, default=24, help="largest coefficient in the family")
+    ap.add_argument("--divisors", type=int, nargs="*", default=[1, 2, 3, 4, 5, 6, 7, 8],
+                    help="divisors d in eps = |q/d - log_phi(ratio)|")
+    ap.add_argument("--N", type=int, default=2000, help="shared null trials")
+    ap.add_argument("--seed", type=int, default=1, help="RNG seed")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    ap.add_argument("--top", type=int, default=10, help="report this many best lattices")
+    ap.add_argument("--out-tex", type=str, default=None, help="optional LaTeX output path")
+    args = ap.parse_args()
+
+    lattices = lattice_family(args.coef_max, args.divisors)
+    print(f"Scanning {len(lattices)} lattices with N={args.N} shared null trials "
+          f"({args.workers} worker(s))...")
+    batch = draw_null_batch(args.seed, args.N)
+    scores, run_min = scan(lattices, batch, args.workers)
+
+    by_p = sorted(scores, key=lambda s: (s.p_local, s.obs_mean))
+    pub = next(s for s in scores if s.lattice == PUBLISHED)
+    rank = 1 + sum(1 for s in scores if s.p_local < pub.p_local)
+    p_glob = global_p(run_min, pub.p_local)
+    p_best = by_p[0].p_local
+
+    print(f"published {PUBLISHED}: mean_eps_obs={pub.obs_mean:.6e} p_local={pub.p_local:.6g} "
+          f"rank={rank}/{len(scores)}")
+    print(f"global p (min_L p_L <= p_published) = {p_glob:.6g}")
+    print(f"global p of the best lattice (p_local={p_best:.6g}) = {global_p(run_min, p_best):.6g}")
+    print(f"top {args.top} lattices by local p:")
+    for s in by_p[: args.top]:
+        print(f"  {s.lattice}  mean_eps={s.obs_mean:.6e}  p_local={s.p_local:.6g}")
+
+    if args.out_tex:
+        write_tex(args.out_tex, len(scores), args.coef_max, args.divisors, pub, rank, p_glob,
+                  by_p[: args.top], N=args.N, seed=args.seed)
+        print(f"Wrote LaTeX block to: {args.out_tex}")
+
+
+if __name__ == "__main__":
+    main()
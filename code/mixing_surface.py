@@ -0,0 +1,243 @@
+# code/mixing_surface.py
+# ============================================================
+# Golden Unification — response surface of the mixing holonomy match
+# Writes: <out-prefix>.theta.npy, <out-prefix>.J.npy ; optional LaTeX summary
+# ============================================================
+#
+# verify_mixing.py evaluates one theta_pred at one set of angles per call by
+# scanning delta on a grid. Two facts make the whole surface cheap:
+#
+#   1) delta* depends only on theta_pred (and the scan step): |sin d - sin t|
+#      is unimodal between consecutive roots of sin d = sin t, so the grid
+#      minimum sits next to a root, d = t or d = 180 - t (mod 360). Checking
+#      the grid points around each root, with the scan's own accumulated grid
+#      and tie-breaking, reproduces scan_delta_match_sin / _deg exactly.
+#   2) J = c12 c23 c13^2 s12 s23 s13 sin(delta) is separable:
+#        J(t, s12, s23, s13) = sin(delta*(t)) * f(s12) * f(s23) * g(s13),
+#        f(s) = s sqrt(1 - s^2),   g(s) = s (1 - s^2).
+#
+# So the (theta_pred x s12 x s23 x s13) surface of J is an outer product,
+# streamed one theta_pred row at a time (bounded memory) into a memory-
+# mappable .npy (see npy_columns.py). Per-theta results go to a small table:
+#
+#   <prefix>.theta.npy   float64 (n_theta, 5): theta, delta*_sin, score_sin, delta*_deg, score_deg
+#   <prefix>.J.npy       float64 (n_theta, n12, n23, n13), J at delta*_sin
+#
+# Usage examples (run from repo root):
+#   python .\code\mixing_surface.py
+#   python .\code\mixing_surface.py --theta 0 180 721 --s12 0.20 0.25 101 --s23 0.03 0.05 101 --s13 0.003 0.005 101
+#   python .\code\mixing_surface.py --out-tex shared\paperV_mixing_surface.tex
+#
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import math
+import os
+from array import array
+from typing import Callable, List, Sequence, Tuple
+
+from golden_unification.blocks import tex_banner, write_tex_block
+from golden_unification.mixing import scan_delta_match_deg, scan_delta_match_sin
+from npy_columns import NpyAppender
+
+
+# ----------------------------
+# delta* per theta_pred
+# ----------------------------
+
+def delta_grid(step_deg: float) -> List[float]:
+    """The delta values visited by verify_mixing's scans (accumulated, as they are)."""
+    out = []
+    d = 0.0
+    while d <= 360.0 + 1e-12:
+        out.append(d)
+        d += step_deg
+    return out
+
+
+def _best_near(
+    grid: Sequence[float],
+    step_deg: float,
+    roots: Sequence[float],
+    score: Callable[[float], float],
+) -> Tuple[float, float]:
+    """Scan-equivalent argmin of score over grid, looking only next to the roots."""
+    n = len(grid)
+    cands = set()
+    for r in roots:
+        k = int(math.floor(r / step_deg))
+        for j in (k - 1, k, k + 1, k + 2):
+            cands.add(min(max(j, 0), n - 1))
+    best_k = min(cands, key=lambda j: (score(grid[j]), j))    # earliest on ties, as the scan
+    return grid[best_k], score(grid[best_k])
+
+
+def delta_star_sin(grid: Sequence[float], step_deg: float, theta_deg: float) -> Tuple[float, float]:
+    target = math.sin(math.radians(theta_deg))
+    t = theta_deg % 360.0
+    u = (180.0 - t) % 360.0
+    roots = [t, u, t + 360.0, u + 360.0]               # the grid may end just past 360
+    return _best_near(grid, step_deg, roots, lambda d: abs(math.sin(math.radians(d)) - target))
+
+
+def delta_star_deg(grid: Sequence[float], step_deg: float, theta_deg: float) -> Tuple[float, float]:
+    return _best_near(grid, step_deg, [theta_deg], lambda d: abs(d - theta_deg))
+
+
+# ----------------------------
+# Separable J
+# ----------------------------
+
+def f_angle(s: float) -> float:
+    return s * math.sqrt(max(0.0, 1.0 - s * s))
+
+
+def g_angle(s: float) -> float:
+    c = math.sqrt(max(0.0, 1.0 - s * s))
+    return s * c ** 2
+
+
+ThetaRow = Tuple[float, float, float, float, float]
+
+
+def axis(lo: float, hi: float, n: int) -> List[float]:
+    if n == 1:
+        return [lo]
+    return [lo + (hi - lo) * k / (n - 1) for k in range(n)]
+
+
+def write_surface(
+    prefix: str,
+    thetas: Sequence[float],
+    s12: Sequence[float],
+    s23: Sequence[float],
+    s13: Sequence[float],
+    step_deg: float,
+) -> List[ThetaRow]:
+    """Stream the J surface row by row; returns the per-theta table."""
+    os.makedirs(os.path.dirname(os.path.abspath(prefix)), exist_ok=True)
+    grid = delta_grid(step_deg)
+    f12 = [f_angle(s) for s in s12]
+    f23 = [f_angle(s) for s in s23]
+    g13 = array("d", (g_angle(s) for s in s13))
+
+    table: List[ThetaRow] = []
+    out = NpyAppender(prefix + ".J.npy", "<f8", (len(s12), len(s23), len(s13)))
+    for t in thetas:
+        d_sin, sc_sin = delta_star_sin(grid, step_deg, t)
+        d_deg, sc_deg = delta_star_deg(grid, step_deg, t)
+        table.append((t, d_sin, sc_sin, d_deg, sc_deg))
+        sd = math.sin(math.radians(d_sin))
+        row = array("d")
+        for a in f12:
+            for b in f23:
+                row.extend(map((sd * a * b).__mul__, g13))
+        out.append(row, 1)
+    out.close()
+
+    tab = NpyAppender(prefix + ".theta.npy", "<f8", (5,))
+    tab.append(array("d", [v for r in table for v in r]), len(table))
+    tab.close()
+    return table
+
+
+def spot_check(
+    table: Sequence[ThetaRow],
+    s12: Sequence[float],
+    s23: Sequence[float],
+    s13: Sequence[float],
+    step_deg: float,
+    n: int = 5,
+) -> float:
+    """Max relative deviation of the surface from verify_mixing's own scans at a few points."""
+    worst = 0.0
+    for i in range(0, len(table), max(1, len(table) // n)):
+        t, d_sin, sc_sin, d_deg, sc_deg = table[i]
+        a, b, c = s12[len(s12) // 2], s23[len(s23) // 2], s13[len(s13) // 2]
+        ref = scan_delta_match_sin(math.sin(math.radians(t)), a, b, c, step_deg)
+        ref_deg = scan_delta_match_deg(t, a, b, c, step_deg)
+        if (ref["delta_deg"], ref["score"], ref_deg["delta_deg"], ref_deg["score"]) != (d_sin, sc_sin, d_deg, sc_deg):
+            raise AssertionError(f"delta* mismatch at theta={t}")
+        j = math.sin(math.radians(d_sin)) * f_angle(a) * f_angle(b) * g_angle(c)
+        if ref["J"] != 0.0:
+            worst = max(worst, abs(j / ref["J"] - 1.0))
+    return worst
+
+
+def write_tex(
+    out_path: str,
+    prefix: str,
+    table: Sequence[ThetaRow],
+    s12: Sequence[float],
+    s23: Sequence[float],
+    s13: Sequence[float],
+    step_deg: float,
+    n_rows: int = 13,
+) -> None:
+    j_ext = (max(abs(math.sin(math.radians(r[1]))) for r in table)
+             * max(map(f_angle, s12)) * max(map(f_angle, s23)) * max(map(g_angle, s13)))
+    lines = tex_banner("Mixing holonomy response surface", "mixing_surface.py")
+    lines.append("\\paragraph{Response surface.}")
+    lines.append(
+        f"Over $\\theta_{{\\mathrm{{pred}}}}\\in[{table[0][0]:.3g}^\\circ,{table[-1][0]:.3g}^\\circ]$ "
+        f"({len(table)} values), $s_{{12}}\\in[{s12[0]:.4g},{s12[-1]:.4g}]$, "
+        f"$s_{{23}}\\in[{s23[0]:.4g},{s23[-1]:.4g}]$, $s_{{13}}\\in[{s13[0]:.4g},{s13[-1]:.4g}]$ "
+        f"({len(table) * len(s12) * len(s23) * len(s13)} points), the matched phase depends on "
+        "$\\theta_{\\mathrm{pred}}$ only and "
+        "$J=\\sin\\delta^\\star\\,f(s_{12})f(s_{23})g(s_{13})$ with "
+        f"$|J|\\le {j_ext:.4e}$ on the grid."
+    )
+    lines.append("\\begin{center}")
+    lines.append("\\begin{tabular}{c c c c}")
+    lines.append("\\hline")
+    lines.append("$\\theta_{\\mathrm{pred}}$ & $\\delta^\\star$ & "
+                 "$|\\sin\\delta^\\star-\\sin\\theta_{\\mathrm{pred}}|$ & $\\sin\\delta^\\star$ \\\\")
+    lines.append("\\hline")
+    stride = max(1, (len(table) - 1) // (n_rows - 1)) if n_rows > 1 else len(table)
+    for t, d_sin, sc_sin, _, _ in table[::stride]:
+        lines.append(f"${t:.2f}^\\circ$ & ${d_sin:.2f}^\\circ$ & ${sc_sin:.3e}$ & "
+                     f"${math.sin(math.radians(d_sin)):.6f}$ \\\\")
+    lines.append("\\hline")
+    lines.append("\\end{tabular}")
+    lines.append("\\end{center}")
+    lines.append(f"% Scan step {step_deg:g} deg; full grid in {os.path.basename(prefix)}.J.npy / .theta.npy.")
+    write_tex_block(out_path, lines)
+
+
+# ----------------------------
+# Main
+# ----------------------------
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Response surface of delta*, J and match score over theta_pred and angles.")
+    ap.add_argument("--theta", type=float, nargs=3, default=[0.0, 180.0, 181], metavar=("LO", "HI", "N"),
+                    help="theta_pred grid in degrees")
+    ap.add_argument("--s12", type=float, nargs=3, default=[0.20, 0.25, 51], metavar=("LO", "HI", "N"))
+    ap.add_argument("--s23", type=float, nargs=3, default=[0.03, 0.05, 51], metavar=("LO", "HI", "N"))
+    ap.add_argument("--s13", type=float, nargs=3, default=[0.003, 0.005, 51], metavar=("LO", "HI", "N"))
+    ap.add_argument("--step-deg", type=float, default=0.1, help="delta scan step (as verify_mixing --step_deg)")
+    ap.add_argument("--out-prefix", type=str, default="mixing_surface", help="binary grid path prefix")
+    ap.add_argument("--out-tex", type=str, default=None, help="optional LaTeX summary path")
+    args = ap.parse_args()
+
+    thetas = axis(args.theta[0], args.theta[1], int(args.theta[2]))
+    s12 = axis(args.s12[0], args.s12[1], int(args.s12[2]))
+    s23 = axis(args.s23[0], args.s23[1], int(args.s23[2]))
+    s13 = axis(args.s13[0], args.s13[1], int(args.s13[2]))
+    n_pts = len(thetas) * len(s12) * len(s23) * len(s13)
+
+    print(f"Surface: {len(thetas)} x {len(s12)} x {len(s23)} x {len(s13)} = {n_pts} points")
+    table = write_surface(args.out_prefix, thetas, s12, s23, s13, args.step_deg)
+    rel = spot_check(table, s12, s23, s13, args.step_deg)
+    print(f"spot check vs verify_mixing scans: delta* exact, max |J/J_ref - 1| = {rel:.1e}")
+    print(f"Wrote {args.out_prefix}.J.npy and {args.out_prefix}.theta.npy")
+
+    if args.out_tex:
+        write_tex(args.out_tex, args.out_prefix, table, s12, s23, s13, args.step_deg)
+        print(f"Wrote LaTeX block to: {args.out_tex}")
+
+
+if __name__ == "__main__":
+    main()
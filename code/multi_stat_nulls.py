@@ -0,0 +1,399 @@
+# code/multi_stat_nulls.py
+# ============================================================
+# Golden Unification — fused multi-statistic null evaluator
+# Writes: optional LaTeX table (--out-tex)
+# ============================================================
+#
+# null_tests_fast_v2.py scores each null trial by the mean eps only. Here every
+# trial's per-species eps vector (anchor included, species order of
+# OBS_MASSES_MEV) is sorted once and reduced to several statistics at once:
+#
+#   mean        mean eps                 (bit-identical to v2's mean_eps)
+#   max         worst species
+#   median      median species
+#   rms         sqrt(mean eps^2)
+#   count:TAU   species with eps < TAU   (larger = better; accumulated as the
+#                                         number of misses P - count)
+#
+# Each statistic has its own TrialAccumulator (streaming p_emp and quantiles),
+# all fed from the same draws, so the extra statistics cost a sort and a few
+# sums per trial instead of a full rerun each.
+#
+# Joint test (min-p). With p_s(t) = #{null values of s <= s(t)} / N and
+# K = min_s #{null values of s <= s_obs}, a trial is at least as extreme as the
+# observation in some statistic iff count_le_s(s(t)) <= K for some s, i.e. iff
+# s(t) < x_s, the (K+1)-th smallest null value of s. So
+#
+#   p_joint = #{t : s(t) < x_s for some s} / N
+#
+# exactly (ties included). While the accumulators still hold every value, x_s
+# and the per-trial test come straight from the stored columns. Once they
+# have collapsed into sketches, the sketch pins x_s to one bin and a replay
+# pass over the same draws (same RNG streams, or the same raw .npy file)
+# resolves it exactly; only trials landing in that bin are held in memory.
+#
+# Trials come either from fresh draws on null_tests_fast_v2's keyed ensemble
+# streams (so "mean" reproduces the p_emp of null_tests_fast_v2.py --streams
+# keyed exactly; Null B of its default legacy single stream draws differently)
+# or from a --raw-dir written by null_tests_fast_v2.py --raw-dir, which holds
+# whichever draws that run made (no refitting at all).
+#
+# Usage examples (run from repo root):
+#   python .\code\multi_stat_nulls.py
+#   python .\code\multi_stat_nulls.py --N 20000 --stats mean max median rms count:0.05 count:0.08
+#   python .\code\multi_stat_nulls.py --raw-dir null_v2_raw
+#   python .\code\multi_stat_nulls.py --N 200000 --out-tex ..\shared\paperIX_null_multistat.tex
+#
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import math
+import os
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from golden_unification.blocks import format_sci, tex_banner, write_tex_block
+from golden_unification.ensembles import EnsembleState, TrialAccumulator, ensemble_rng, trial_fit
+from golden_unification.lattice import OBS_MASSES_MEV
+from golden_unification.lattice import build_q_set as build_feasible_q_set
+from golden_unification.scoring import anchored_fit_score
+from null_tests_fast_v2 import sigma_tag
+
+
+# ----------------------------
+# Statistics
+# ----------------------------
+
+@dataclass(frozen=True)
+class Statistic:
+    """A per-trial statistic, oriented so that smaller = closer to the lattice."""
+    name: str
+    label: str                                             # LaTeX
+    fn: Callable[[Sequence[float], Sequence[float]], float]  # (eps, sorted eps) -> oriented value
+    discrete: bool = False                                 # integer-valued
+    flip: Optional[int] = None                             # displayed value = flip - oriented value
+
+
+def parse_stat(spec: str, n_species: int) -> Statistic:
+    def mean(eps: Sequence[float], srt: Sequence[float]) -> float:
+        return sum(eps) / len(eps)
+
+    def worst(eps: Sequence[float], srt: Sequence[float]) -> float:
+        return srt[-1]
+
+    def median(eps: Sequence[float], srt: Sequence[float]) -> float:
+        n = len(srt)
+        return srt[n // 2] if n % 2 else 0.5 * (srt[n // 2 - 1] + srt[n // 2])
+
+    def rms(eps: Sequence[float], srt: Sequence[float]) -> float:
+        return math.sqrt(sum(e * e for e in eps) / len(eps))
+
+    simple = {
+        "mean": ("$\\overline{\\epsilon}$", mean),
+        "max": ("$\\max\\epsilon$", worst),
+        "median": ("$\\mathrm{med}\\,\\epsilon$", median),
+        "rms": ("$\\epsilon_{\\mathrm{rms}}$", rms),
+    }
+    if spec in simple:
+        label, fn = simple[spec]
+        return Statistic(spec, label, fn)
+    if spec.startswith("count:"):
+        tau = float(spec.split(":", 1)[1])
+
+        def misses(eps: Sequence[float], srt: Sequence[float]) -> float:
+            return len(srt) - bisect.bisect_left(srt, tau)
+
+        return Statistic(spec, f"$\\#\\{{\\epsilon<{tau:g}\\}}$", misses, discrete=True, flip=n_species)
+    raise ValueError(f"unknown statistic {spec!r} (mean, max, median, rms, count:TAU)")
+
+
+# ----------------------------
+# Fused evaluator
+# ----------------------------
+
+class FusedEvaluator:
+    """One TrialAccumulator per statistic, all fed from the same trials."""
+
+    def __init__(self, stats: Sequence[Statistic], obs_eps: Sequence[float]) -> None:
+        self.stats = list(stats)
+        srt = sorted(obs_eps)
+        self.obs = [s.fn(obs_eps, srt) for s in self.stats]
+        self.accs = [TrialAccumulator(o) for o in self.obs]
+
+    def values(self, eps: Sequence[float]) -> List[float]:
+        srt = sorted(eps)
+        return [s.fn(eps, srt) for s in self.stats]
+
+    def add(self, eps: Sequence[float]) -> None:
+        for acc, v in zip(self.accs, self.values(eps)):
+            acc.add(v)
+
+    @property
+    def count(self) -> int:
+        return self.accs[0].count
+
+    def display(self, s: Statistic, v: float) -> float:
+        return v if s.flip is None else s.flip - v
+
+    def summary(self, i: int) -> Dict[str, float]:
+        """Accumulator summary in displayed units (quantiles mirrored for flipped statistics)."""
+        s, st = self.stats[i], self.accs[i].summary()
+        out = {"obs": self.display(s, self.obs[i]), "p_emp": st["p_emp"]}
+        if s.flip is None:
+            out.update({k: st[k] for k in ("min", "med", "p16", "p84", "max")})
+        else:
+            out.update({"min": s.flip - st["max"], "max": s.flip - st["min"], "med": s.flip - st["med"],
+                        "p16": s.flip - st["p84"], "p84": s.flip - st["p16"]})
+        return out
+
+    def rank_obs(self) -> int:
+        """K = min over statistics of #{null values <= observed}."""
+        return min(acc.n_le for acc in self.accs)
+
+    def min_p_obs(self) -> float:
+        return self.rank_obs() / self.count
+
+    # -- joint p-value --
+
+    def joint_exact(self) -> Optional[float]:
+        """p_joint from the stored values, or None if any accumulator has collapsed."""
+        if not all(acc.exact for acc in self.accs):
+            return None
+        n, k = self.count, self.rank_obs()
+        if k >= n:
+            return 1.0
+        cols = [acc.values for acc in self.accs]
+        xs = [sorted(col)[k] for col in cols]                # (K+1)-th smallest per statistic
+        hits = sum(1 for row in zip(*cols) if any(v < x for v, x in zip(row, xs)))
+        return hits / n
+
+    def joint_replay(self, trials: Iterable[Sequence[float]]) -> float:
+        """p_joint from a second pass over the same trials (any accumulator mode)."""
+        n, k = self.count, self.rank_obs()
+        if k >= n:
+            return 1.0
+        m = len(self.stats)
+        xs: List[Optional[float]] = [None] * m               # exact thresholds known up front
+        bins: List[Optional[int]] = [None] * m
+        below = [0] * m
+        for i, (s, acc) in enumerate(zip(self.stats, self.accs)):
+            if acc.exact:
+                xs[i] = sorted(acc.values)[k]                # type: ignore[arg-type]
+                continue
+            b, below[i] = acc.locate(k)
+            if b is None:
+                xs[i] = 0.0                                  # zero bucket holds exact zeros
+            elif s.discrete:
+                xs[i] = float(round(TrialAccumulator.bin_value(b)))  # one integer per bin
+            bins[i] = b
+        in_bin: List[List[float]] = [[] for _ in range(m)]
+        pending: List[List[Tuple[int, float]]] = []
+        hits = seen = 0
+        for eps in trials:
+            seen += 1
+            hit = False
+            maybe: List[Tuple[int, float]] = []
+            for i, v in enumerate(self.values(eps)):
+                x = xs[i]
+                if x is not None:
+                    hit = hit or v < x
+                    continue
+                b = TrialAccumulator.bin_index(v)
+                if b is None or b < bins[i]:                 # type: ignore[operator]
+                    hit = True
+                elif b == bins[i]:
+                    in_bin[i].append(v)
+                    maybe.append((i, v))
+            if hit:
+                hits += 1
+            elif maybe:
+                pending.append(maybe)
+        if seen != n:
+            raise ValueError(f"replay saw {seen} trials, accumulators hold {n}")
+        for i in range(m):
+            if xs[i] is None:
+                xs[i] = sorted(in_bin[i])[k - below[i]]
+        hits += sum(1 for maybe in pending if any(v < xs[i] for i, v in maybe))  # type: ignore[operator]
+        return hits / n
+
+    def joint(self, replay: Optional[Callable[[], Iterable[Sequence[float]]]] = None) -> Tuple[float, str]:
+        """(p_joint, how it was obtained): stored values when exact, else a replay pass."""
+        p = self.joint_exact()
+        if p is not None:
+            return p, "stored"
+        if replay is None:
+            raise ValueError("accumulators are in sketch mode; p_joint needs a replay source")
+        return self.joint_replay(replay()), "replay"
+
+
+# ----------------------------
+# Trial sources
+# ----------------------------
+
+SPECIES = list(OBS_MASSES_MEV.keys())
+
+
+def drawn_trials(q_list: List[int], state: EnsembleState, n: int) -> Iterator[List[float]]:
+    """Per-species eps of n fresh trials from state's stream (null_tests_fast_v2 draws)."""
+    for _ in range(n):
+        fit = trial_fit(q_list, state)
+        yield [fit.per_particle_eps[k] for k in SPECIES]
+
+
+def raw_trials(path: str) -> Iterator[Sequence[float]]:
+    """Rows of a <tag>.eps.npy column written by null_tests_fast_v2.py --raw-dir."""
+    from npy_columns import open_npy
+    with open_npy(path) as view:
+        if len(view.shape) != 2 or view.shape[1] != len(SPECIES):
+            raise ValueError(f"{path}: expected shape (N, {len(SPECIES)}), got {view.shape}")
+        yield from view.iter_rows()
+
+
+def evaluate_drawn(
+    q_list: List[int],
+    stats: Sequence[Statistic],
+    obs_eps: Sequence[float],
+    seed: int,
+    sigma: Optional[float],
+    n: int,
+    force_replay: bool = False,
+) -> Tuple[FusedEvaluator, float, str]:
+    """Fused run of one v2 ensemble (Null A for sigma None) plus its joint p-value."""
+    name = "A" if sigma is None else "B"
+
+    def fresh() -> EnsembleState:
+        return EnsembleState(name, sigma, ensemble_rng(seed, name, sigma), 0, TrialAccumulator(0.0))
+
+    ev = FusedEvaluator(stats, obs_eps)
+    for eps in drawn_trials(q_list, fresh(), n):
+        ev.add(eps)
+    if force_replay:
+        return (ev, ev.joint_replay(drawn_trials(q_list, fresh(), n)), "replay")
+    return (ev, *ev.joint(lambda: drawn_trials(q_list, fresh(), n)))
+
+
+def evaluate_raw(
+    path: str,
+    stats: Sequence[Statistic],
+    obs_eps: Sequence[float],
+    force_replay: bool = False,
+) -> Tuple[FusedEvaluator, float, str]:
+    ev = FusedEvaluator(stats, obs_eps)
+    for eps in raw_trials(path):
+        ev.add(eps)
+    if force_replay:
+        return ev, ev.joint_replay(raw_trials(path)), "replay"
+    return (ev, *ev.joint(lambda: raw_trials(path)))
+
+
+# ----------------------------
+# Reporting
+# ----------------------------
+
+EnsembleResult = Tuple[str, FusedEvaluator, float, str]
+
+
+def print_result(label: str, ev: FusedEvaluator, p_joint: float, how: str) -> None:
+    print(f"=== {label}: N={ev.count} ===")
+    for i, s in enumerate(ev.stats):
+        st = ev.summary(i)
+        f = ".0f" if s.discrete else ".6e"
+        print(f"  {s.name:>12s}  obs={st['obs']:{f}}  med={st['med']:{f}} "
+              f"[{st['p16']:{f}}, {st['p84']:{f}}]  p_emp={st['p_emp']:.6g}")
+    print(f"  {'joint':>12s}  min p_obs={ev.min_p_obs():.6g}  p_joint={p_joint:.6g}  ({how})")
+    print("")
+
+
+def _num(s: Statistic, v: float) -> str:
+    return f"{v:.0f}" if s.discrete else format_sci(v)
+
+
+def write_tex(out_path: str, results: List[EnsembleResult], seed: int) -> None:
+    lines = tex_banner("Multi-statistic null tests", "multi_stat_nulls.py")
+    lines.append("\\paragraph{Alternative statistics.}")
+    lines.append(
+        "Each null trial is scored by several statistics of its per-species $\\epsilon$ at once; "
+        "$p_{\\mathrm{emp}}$ counts trials at least as close to the lattice as observed, and the "
+        "joint $p$ applies the min-$p$ rule to the same draws, so it is corrected for "
+        f"having looked at every statistic (seed={seed})."
+    )
+    for label, ev, p_joint, _ in results:
+        lines.append("\\begin{center}")
+        lines.append("\\begin{tabular}{l c c c c}")
+        lines.append("\\hline")
+        lines.append(f"\\multicolumn{{5}}{{c}}{{{label}, $N={ev.count}$}} \\\\")
+        lines.append("Statistic & Observed & median & $[16\\%,84\\%]$ & $p_\\mathrm{emp}$ \\\\")
+        lines.append("\\hline")
+        for i, s in enumerate(ev.stats):
+            st = ev.summary(i)
+            lines.append(
+                f"{s.label} & ${_num(s, st['obs'])}$ & ${_num(s, st['med'])}$ & "
+                f"$[{_num(s, st['p16'])},\\,{_num(s, st['p84'])}]$ & ${st['p_emp']:.6g}$ \\\\"
+            )
+        lines.append("\\hline")
+        lines.append(f"joint (min-$p$) & & & & ${p_joint:.6g}$ \\\\")
+        lines.append("\\hline")
+        lines.append("\\end{tabular}")
+        lines.append("\\end{center}")
+    lines.append("")
+    lines.append("% End of auto-generated block.")
+    write_tex_block(out_path, lines)
+
+
+# ----------------------------
+# Main
+# ----------------------------
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Fused multi-statistic null tests with a joint min-p value.")
+    ap.add_argument("--stats", type=str, nargs="+", default=["mean", "max", "median", "rms", "count:0.05"],
+                    help="statistics: mean, max, median, rms, count:TAU")
+    ap.add_argument("--N", type=int, default=2000, help="trials per ensemble (fresh draws)")
+    ap.add_argument("--seed", type=int, default=1, help="RNG seed (null_tests_fast_v2 keyed streams)")
+    ap.add_argument("--sigma", type=float, nargs="*", default=[0.15, 0.30, 0.50],
+                    help="sigma values for the jittered Null B")
+    ap.add_argument("--raw-dir", type=str, default=None,
+                    help="evaluate the eps columns of a null_tests_fast_v2.py --raw-dir instead of drawing")
+    ap.add_argument("--replay", action="store_true",
+                    help="compute p_joint by the replay pass even when stored values suffice (check)")
+    ap.add_argument("--out-tex", type=str, default=None, help="optional LaTeX output path")
+    args = ap.parse_args(argv)
+
+    q_list = build_feasible_q_set()
+    obs = anchored_fit_score(q_list, OBS_MASSES_MEV)
+    obs_eps = [obs.per_particle_eps[k] for k in SPECIES]
+    stats = [parse_stat(s, len(SPECIES)) for s in args.stats]
+
+    results: List[EnsembleResult] = []
+    if args.raw_dir:
+        import json
+        with open(os.path.join(args.raw_dir, "columns.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["species"] != SPECIES:
+            raise SystemExit(f"{args.raw_dir}: species {meta['species']} differ from {SPECIES}")
+        seed = meta["config"]["seed"]
+        for sigma in [None] + list(meta["config"]["sigma"]):
+            path = os.path.join(args.raw_dir, sigma_tag(sigma) + ".eps.npy")
+            if not os.path.exists(path):
+                continue
+            label = "Null A" if sigma is None else f"Null B ($\\sigma={sigma:.3f}$)"
+            results.append((label, *evaluate_raw(path, stats, obs_eps, args.replay)))
+    else:
+        seed = args.seed
+        for sigma in [None] + list(args.sigma):
+            label = "Null A" if sigma is None else f"Null B ($\\sigma={sigma:.3f}$)"
+            results.append((label, *evaluate_drawn(q_list, stats, obs_eps, seed, sigma, args.N, args.replay)))
+
+    for label, ev, p_joint, how in results:
+        print_result(label.replace("$", "").replace("\\sigma", "sigma"), ev, p_joint, how)
+
+    if args.out_tex:
+        write_tex(args.out_tex, results, seed)
+        print(f"Wrote LaTeX block to: {args.out_tex}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+# code/multiplicity_curves.py
+# ============================================================
+# Golden Unification — multiplicity vs tolerance from a prefix-count q index
+# Writes: CSV (stdout or --out-csv); optional v2-style multiplicity table
+# ============================================================
+#
+# compute_mass_errors_v2.py reports multiplicity at one hard-coded TAU_FRAC
+# by rescanning all (a,b,c) in the box for every particle. But |epsilon| <= tau
+# only constrains q:
+#
+#   (1 - tau) m_exp <= m_e * PHI^((q - q_e)/4) <= (1 + tau) m_exp
+#   <=>  q in [ q_e + 4 log_phi((1-tau) r),  q_e + 4 log_phi((1+tau) r) ],  r = m_exp/m_e
+#
+# so with cumulative counts over the q axis
+#   cum_triples[x] = #{(a,b,c) in box : q <= x}
+#   cum_classes[x] = #{distinct reachable q <= x}
+# the multiplicity at any tau and any mass is two lookups. The index is built
+# once (a shift-add convolution of the three progressions); full curves for
+# every particle, and the same curves under null ensembles, follow in
+# milliseconds.
+#
+# Usage examples (run from repo root):
+#   python .\code\multiplicity_curves.py --tau 0.05
+#   python .\code\multiplicity_curves.py --n-tau 60 --out-csv multiplicity_curves.csv
+#   python .\code\multiplicity_curves.py --null A --N 5000
+#   python .\code\multiplicity_curves.py --null B --sigma 0.15 --N 5000
+#
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import csv
+import math
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, TextIO, Tuple
+
+from compute_mass_errors_v2 import (
+    A_MAX, A_MIN, ANCHOR_ABC, B_MAX, B_MIN, C_MAX, C_MIN, PARTICLES, PHI, TAU_FRAC, frac_err, q,
+)
+from golden_unification.blocks import keyed_rng
+from golden_unification.lattice import LOG_PHI
+
+
+# ----------------------------
+# Prefix-count index over q
+# ----------------------------
+
+class QCountIndex:
+    """
+    Cumulative triple and q-class counts over the integer span of the scan box.
+    cum_triples[k] / cum_classes[k] count q <= q_min + k - 1 (index 0 = nothing).
+    """
+
+    def __init__(self, a_rng: Tuple[int, int], b_rng: Tuple[int, int], c_rng: Tuple[int, int]) -> None:
+        a0, a1 = a_rng
+        b0, b1 = b_rng
+        c0, c1 = c_rng
+        self.q_min = q(a0, b0, c0)
+        span = q(a1, b1, c1) - self.q_min + 1
+
+        # counts per q: convolve the three arithmetic progressions by shift-add
+        ab = array("q", [0]) * (8 * (a1 - a0) + 15 * (b1 - b0) + 1)
+        for i in range(a1 - a0 + 1):
+            for j in range(b1 - b0 + 1):
+                ab[8 * i + 15 * j] += 1
+        counts = array("q", [0]) * span
+        nz = [(k, n) for k, n in enumerate(ab) if n]
+        for l in range(c1 - c0 + 1):
+            off = 24 * l
+            for k, n in nz:
+                counts[off + k] += n
+
+        self.cum_triples = array("q", [0]) * (span + 1)
+        self.cum_classes = array("q", [0]) * (span + 1)
+        t = c = 0
+        for k in range(span):
+            n = counts[k]
+            t += n
+            c += 1 if n else 0
+            self.cum_triples[k + 1] = t
+            self.cum_classes[k + 1] = c
+        self.q_list = [self.q_min + k for k in range(span) if counts[k]]
+        self.n_triples = t
+
+    def _cum_le(self, cum: array, x: float) -> int:
+        k = math.floor(x) - self.q_min + 1
+        if k <= 0:
+            return 0
+        if k >= len(cum):
+            return cum[-1]
+        return cum[k]
+
+    def count_between(self, lo: float, hi: float) -> Tuple[int, int]:
+        """(triples, classes) with lo <= q <= hi."""
+        if hi < lo:
+            return 0, 0
+        lo_c = math.ceil(lo) - 1
+        return (self._cum_le(self.cum_triples, hi) - self._cum_le(self.cum_triples, lo_c),
+                self._cum_le(self.cum_classes, hi) - self._cum_le(self.cum_classes, lo_c))
+
+
+def default_index() -> QCountIndex:
+    return QCountIndex((A_MIN, A_MAX), (B_MIN, B_MAX), (C_MIN, C_MAX))
+
+
+# ----------------------------
+# Tolerance queries
+# ----------------------------
+
+def q_window(log_ratio: float, q_e: int, tau: float) -> Tuple[float, float]:
+    """q interval with |frac_err| <= tau for a mass with ln(m/m_e) = log_ratio."""
+    lo = q_e + 4.0 * (log_ratio + math.log1p(-tau)) / LOG_PHI if tau < 1.0 else -math.inf
+    hi = q_e + 4.0 * (log_ratio + math.log1p(tau)) / LOG_PHI
+    return lo, hi
+
+
+def multiplicity(idx: QCountIndex, log_ratio: float, q_e: int, tau: float) -> Tuple[int, int]:
+    return idx.count_between(*q_window(log_ratio, q_e, tau))
+
+
+def tau_grid(tau_min: float, tau_max: float, n: int) -> List[float]:
+    if n == 1:
+        return [tau_max]
+    r = math.log(tau_max / tau_min)
+    return [tau_min * math.exp(r * k / (n - 1)) for k in range(n)]
+
+
+@dataclass
+class CurveRow:
+    label: str
+    tau: float
+    triples: float
+    classes: float
+    frac_any: Optional[float] = None      # null only: fraction of draws with >= 1 class
+
+
+def particle_curves(idx: QCountIndex, taus: Sequence[float], q_e: int) -> List[CurveRow]:
+    m_e = next(p.m_exp_gev for p in PARTICLES if p.name == "electron")
+    rows: List[CurveRow] = []
+    for p in PARTICLES:
+        lr = math.log(p.m_exp_gev / m_e)
+        for tau in taus:
+            t, c = multiplicity(idx, lr, q_e, tau)
+            rows.append(CurveRow(p.name, tau, t, c))
+    return rows
+
+
+def null_curves(
+    idx: QCountIndex,
+    taus: Sequence[float],
+    q_e: int,
+    ensemble: str,
+    sigma: float,
+    n: int,
+    seed: int,
+) -> List[CurveRow]:
+    """
+    Mean multiplicity curves under a null:
+      "A": one pooled curve for masses log-uniform over the non-anchor range
+      "B": one curve per particle, each mass jittered in ln-space by N(0, sigma^2)
+    """
+    m_e = next(p.m_exp_gev for p in PARTICLES if p.name == "electron")
+    others = [p for p in PARTICLES if p.name != "electron"]
+    logs = [math.log(p.m_exp_gev / m_e) for p in others]
+    rng = keyed_rng(seed, "multiplicity", ensemble, sigma)
+    if ensemble == "A":
+        lo, hi = min(logs), max(logs)
+        groups = [("null_A", [lo + (hi - lo) * rng.random() for _ in range(n)])]
+    else:
+        groups = [(f"null_B:{p.name}", [lr + sigma * rng.gauss(0.0, 1.0) for _ in range(n)])
+                  for p, lr in zip(others, logs)]
+    rows: List[CurveRow] = []
+    for label, draws in groups:
+        for tau in taus:
+            st = sc = anyc = 0
+            for lr in draws:
+                t, c = multiplicity(idx, lr, q_e, tau)
+                st += t
+                sc += c
+                anyc += 1 if c else 0
+            rows.append(CurveRow(label, tau, st / n, sc / n, anyc / n))
+    return rows
+
+
+def write_csv(rows: List[CurveRow], out: TextIO) -> None:
+    w = csv.writer(out, lineterminator="\n")
+    w.writerow(["particle", "tau", "triples", "classes", "frac_any"])
+    for r in rows:
+        w.writerow([r.label, f"{r.tau:.6g}", f"{r.triples:.6g}", f"{r.classes:.6g}",
+                    "" if r.frac_any is None else f"{r.frac_any:.6g}"])
+
+
+def print_v2_table(idx: QCountIndex, q_e: int, tau: float) -> None:
+    """Same rows as the multiplicity block of compute_mass_errors_v2.main, at any tau."""
+    m_e = next(p.m_exp_gev for p in PARTICLES if p.name == "electron")
+    print("% --- AUTO MULTIPLICITY: counts within tolerance (dedup by q) ---")
+    print(f"% Bounds: a[{A_MIN},{A_MAX}], b[{B_MIN},{B_MAX}], c[{C_MIN},{C_MAX}] ; tolerance |epsilon| <= {tau}")
+    for p in PARTICLES:
+        lr = math.log(p.m_exp_gev / m_e)
+        _, n_classes = multiplicity(idx, lr, q_e, tau)
+        target = q_e + 4.0 * lr / LOG_PHI
+        k = bisect.bisect_left(idx.q_list, target)
+        cands = [idx.q_list[j] for j in (k - 1, k) if 0 <= j < len(idx.q_list)]
+        abs_e = min(abs(frac_err(m_e * PHI ** ((qq - q_e) / 4.0), p.m_exp_gev)) for qq in cands)
+        notes = "unique(q)" if n_classes == 1 else "multiple(q)"
+        print(f"{p.name} & {n_classes} & {abs_e:.3e} & {notes} \\\\")
+
+
+# ----------------------------
+# Main
+# ----------------------------
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Multiplicity-vs-tolerance curves from a prefix-count q index.")
+    ap.add_argument("--tau", type=float, default=None,
+                    help="print the v2 multiplicity table at this tolerance and exit")
+    ap.add_argument("--tau-min", type=float, default=1e-4)
+    ap.add_argument("--tau-max", type=float, default=0.5)
+    ap.add_argument("--n-tau", type=int, default=40, help="log-spaced tolerance points")
+    ap.add_argument("--null", choices=["A", "B"], default=None, help="emit null-ensemble curves")
+    ap.add_argument("--sigma", type=float, default=0.15, help="ln-space jitter for --null B")
+    ap.add_argument("--N", type=int, default=2000, help="null draws")
+    ap.add_argument("--seed", type=int, default=1, help="RNG seed")
+    ap.add_argument("--out-csv", type=str, default=None, help="CSV path (default: stdout)")
+    args = ap.parse_args(argv)
+
+    idx = default_index()
+    q_e = q(*ANCHOR_ABC)
+
+    if args.tau is not None:
+        print_v2_table(idx, q_e, args.tau)
+        return
+
+    taus = tau_grid(args.tau_min, args.tau_max, args.n_tau)
+    rows = particle_curves(idx, taus, q_e)
+    if args.null:
+        rows += null_curves(idx, taus, q_e, args.null, args.sigma, args.N, args.seed)
+
+    if args.out_csv:
+        with open(args.out_csv, "w", encoding="utf-8", newline="") as f:
+            write_csv(rows, f)
+        print(f"Wrote {len(rows)} rows to: {args.out_csv}  (default TAU_FRAC={TAU_FRAC})")
+    else:
+        write_csv(rows, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
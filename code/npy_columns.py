@@ -0,0 +1,231 @@
+# code/npy_columns.py
+# ============================================================
+# Golden Unification — columnar per-trial output as memory-mappable .npy files
+# ============================================================
+#
+# The null scripts reduce millions of trials to a few summary numbers. With
+# --raw-dir, null_tests_fast_v2.py also streams every trial to three columns
+# per ensemble:
+#
+#   <tag>.mean_eps.npy   float64 (N,)      trial score
+#   <tag>.eps.npy        float64 (N, P)    per-species eps (P = species, anchor included)
+#   <tag>.q_best.npy     int32   (N, P)    per-species best q
+#   columns.json         species order and run config
+#
+# The files are plain NumPy .npy (format 1.0, little-endian, C order), written
+# without NumPy: a fixed 128-byte header whose shape is rewritten in place as
+# rows are appended, so a file can be extended (resume / --extend-to) without
+# rewriting its data. Rows are buffered in array('d') / array('i') batches of
+# bounded size; memory use does not grow with N.
+#
+# Reading is zero-copy through mmap + memoryview.cast:
+#   >>> from npy_columns import open_npy
+#   >>> eps = open_npy("raw/nullA.eps.npy")
+#   >>> eps.shape, eps.data[123, 2]
+# and with NumPy available the same files load via np.load(path, mmap_mode="r").
+#
+# ============================================================
+
+from __future__ import annotations
+
+import ast
+import json
+import mmap
+import os
+import sys
+from array import array
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+NPY_HEADER_LEN = 128           # magic + len + dict, padded; multiple of 64 as the format asks
+_FORMATS = {"<f8": ("d", 8), "<i4": ("i", 4)}
+
+
+# ----------------------------
+# Header
+# ----------------------------
+
+def _header(descr: str, shape: Tuple[int, ...]) -> bytes:
+    d = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': {tuple(shape)!r}, }}"
+    pad = NPY_HEADER_LEN - len(NPY_MAGIC) - 2 - len(d) - 1
+    if pad < 0:
+        raise ValueError(f"npy header too long for shape {shape}")
+    body = (d + " " * pad + "\n").encode("latin1")
+    return NPY_MAGIC + len(body).to_bytes(2, "little") + body
+
+
+def read_header(f: Any) -> Tuple[str, Tuple[int, ...], int]:
+    """(descr, shape, data offset) of an .npy v1.0 file opened in binary mode."""
+    f.seek(0)
+    if f.read(len(NPY_MAGIC)) != NPY_MAGIC:
+        raise ValueError("not an .npy v1.0 file")
+    n = int.from_bytes(f.read(2), "little")
+    d = ast.literal_eval(f.read(n).decode("latin1"))
+    if d["fortran_order"]:
+        raise ValueError("fortran-ordered .npy files are not supported")
+    return d["descr"], tuple(d["shape"]), len(NPY_MAGIC) + 2 + n
+
+
+# ----------------------------
+# Writer
+# ----------------------------
+
+class NpyAppender:
+    """
+    Append-only .npy column with a fixed-size header. Opening an existing file
+    keeps its first rows_from rows (dropping anything written after the last
+    checkpoint) and appends after them.
+    """
+
+    def __init__(self, path: str, descr: str, row_shape: Tuple[int, ...], rows_from: int = 0) -> None:
+        if descr not in _FORMATS:
+            raise ValueError(f"unsupported dtype {descr}")
+        self.path = path
+        self.descr = descr
+        self.row_shape = row_shape
+        self.row_bytes = _FORMATS[descr][1]
+        for n in row_shape:
+            self.row_bytes *= n
+
+        if rows_from and os.path.exists(path):
+            self.f = open(path, "r+b")
+            descr0, shape0, offset = read_header(self.f)
+            if descr0 != descr or shape0[1:] != row_shape or offset != NPY_HEADER_LEN:
+                raise ValueError(f"{path}: existing column has a different layout")
+            if shape0[0] < rows_from:
+                raise ValueError(f"{path}: holds {shape0[0]} rows, need {rows_from}")
+        elif rows_from:
+            raise FileNotFoundError(f"{path}: missing raw column to resume from")
+        else:
+            self.f = open(path, "w+b")
+        self.rows = rows_from
+        self.f.truncate(NPY_HEADER_LEN + rows_from * self.row_bytes)
+        self.sync()
+        self.f.seek(0, os.SEEK_END)
+
+    def append(self, buf: array, n_rows: int) -> None:
+        self.f.write(buf.tobytes())
+        self.rows += n_rows
+
+    def sync(self) -> None:
+        """Rewrite the header for the current row count and flush to disk."""
+        end = self.f.tell()
+        self.f.seek(0)
+        self.f.write(_header(self.descr, (self.rows,) + self.row_shape))
+        self.f.seek(max(end, NPY_HEADER_LEN))
+        self.f.flush()
+
+    def close(self) -> None:
+        self.sync()
+        self.f.close()
+
+
+class RawTrialWriter:
+    """Buffers per-trial rows of one ensemble and flushes them every batch_rows trials."""
+
+    def __init__(self, out_dir: str, tag: str, n_species: int, batch_rows: int = 65536, rows_from: int = 0) -> None:
+        if sys.byteorder != "little" or array("i").itemsize != 4:
+            raise RuntimeError("raw output assumes a little-endian host with 32-bit C int")
+        os.makedirs(out_dir, exist_ok=True)
+        base = os.path.join(out_dir, tag)
+        self.batch_rows = batch_rows
+        self.mean = NpyAppender(base + ".mean_eps.npy", "<f8", (), rows_from)
+        self.eps = NpyAppender(base + ".eps.npy", "<f8", (n_species,), rows_from)
+        self.q = NpyAppender(base + ".q_best.npy", "<i4", (n_species,), rows_from)
+        self._reset()
+
+    def _reset(self) -> None:
+        self.n = 0
+        self.buf_mean = array("d")
+        self.buf_eps = array("d")
+        self.buf_q = array("i")
+
+    def add(self, mean_eps: float, eps: Sequence[float], q_best: Sequence[int]) -> None:
+        self.buf_mean.append(mean_eps)
+        self.buf_eps.extend(eps)
+        self.buf_q.extend(q_best)
+        self.n += 1
+        if self.n >= self.batch_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.n:
+            self.mean.append(self.buf_mean, self.n)
+            self.eps.append(self.buf_eps, self.n)
+            self.q.append(self.buf_q, self.n)
+            self._reset()
+        for col in (self.mean, self.eps, self.q):
+            col.sync()
+
+    def close(self) -> None:
+        self.flush()
+        for col in (self.mean, self.eps, self.q):
+            col.close()
+
+
+def write_columns_meta(out_dir: str, species: List[str], config: Dict[str, Any]) -> None:
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "columns.json"), "w", encoding="utf-8") as f:
+        json.dump({"species": species, "config": config}, f, indent=2)
+
+
+# ----------------------------
+# Zero-copy reader
+# ----------------------------
+
+class NpyView:
+    """Read-only memory map of an .npy file; .data is a memoryview with the file's shape."""
+
+    def __init__(self, path: str) -> None:
+        if sys.byteorder != "little":
+            raise RuntimeError("npy_columns reader assumes a little-endian host")
+        with open(path, "rb") as f:
+            self.descr, self.shape, offset = read_header(f)
+            if self.descr not in _FORMATS:
+                raise ValueError(f"{path}: unsupported dtype {self.descr}")
+            fmt, size = _FORMATS[self.descr]
+            n_items = 1
+            for n in self.shape:
+                n_items *= n
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._fmt = fmt
+        self._raw = memoryview(self._mm)[offset:offset + n_items * size]
+        self.data = self._raw.cast(fmt, self.shape) if n_items else self._raw.cast(fmt)
+
+    def iter_rows(self, block_rows: int = 65536) -> Iterator[List[Any]]:
+        """Rows of a 2-D column as lists (memoryview cannot slice N-D views), read in blocks."""
+        if len(self.shape) != 2:
+            raise ValueError(f"iter_rows() needs a 2-D column, got shape {self.shape}")
+        n, p = self.shape
+        flat = self._raw.cast(self._fmt)
+        try:
+            for start in range(0, n, block_rows):
+                block = flat[start * p:min(n, start + block_rows) * p].tolist()
+                for j in range(0, len(block), p):
+                    yield block[j:j + p]
+        finally:
+            flat.release()
+
+    def read_flat(self, start: int = 0, stop: Any = None) -> List[Any]:
+        """Items start:stop of the column in C order, as a list (any shape)."""
+        flat = self._raw.cast(self._fmt)
+        try:
+            return flat[start:stop].tolist()
+        finally:
+            flat.release()
+
+    def close(self) -> None:
+        self.data.release()
+        self._raw.release()
+        self._mm.close()
+
+    def __enter__(self) -> "NpyView":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def open_npy(path: str) -> NpyView:
+    return NpyView(path)
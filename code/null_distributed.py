@@ -0,0 +1,394 @@
+# code/null_distributed.py
+# ============================================================
+# Golden Unification — multi-node null ensembles over a shared-filesystem queue
+# Writes: ../shared/paperIX_null_pvalues_distributed.tex (reduce step)
+# ============================================================
+#
+# Runs the Null A / Null B ensembles of null_tests_fast_v2.py on as many
+# machines as can see one directory (NFS, SMB share, cluster scratch). No
+# server, no locks: the only synchronization primitive is an atomic rename.
+#
+#   QUEUE/config.json          run config (dataset, scan box, seed, sigmas, N, shard size)
+#   QUEUE/todo/<shard>.json    shard descriptors written by the coordinator
+#   QUEUE/claimed/<shard>@<worker>.json
+#                              claimed by renaming out of todo/ (exactly one winner)
+#   QUEUE/done/<shard>.json    the shard's TrialAccumulator (mergeable), written atomically
+#
+# A shard is (ensemble, sigma, seed-sequence index k, trial count) and draws
+# from its own stream keyed_rng(seed, ensemble, sigma, f"shard{k}"),
+# so a shard's result depends only on its descriptor: which node ran it, how
+# many nodes there were, or whether it was run twice (after a requeue) does
+# not matter. Note this differs from the single-stream Null A draws of a
+# plain null_tests_fast_v2.py run; the statistics agree, the trials do not.
+# That is why reduce writes its own file rather than the published
+# paperIX_null_pvalues.tex (pass --out-tex to choose another path).
+#
+# Steps (run from repo root):
+#   python .\code\null_distributed.py init   --queue Q --N 1000000000 --shard-trials 1000000
+#   python .\code\null_distributed.py work   --queue Q            # on every node, any number of times
+#   python .\code\null_distributed.py status --queue Q
+#   python .\code\null_distributed.py requeue --queue Q --stale 7200   # claims of dead workers
+#   python .\code\null_distributed.py reduce --queue Q
+#
+# One box, several worker processes standing in for nodes:
+#   python .\code\null_distributed.py local --queue Q --N 20000 --shard-trials 1000 --local-workers 4
+#
+# Extending a finished run: re-run init with a larger --N (the old N must be
+# a whole number of shards); only the new shards are queued.
+#
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import socket
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from golden_unification.blocks import format_summary, keyed_rng
+from golden_unification.ensembles import EnsembleState, TrialAccumulator, run_ensemble
+from golden_unification.lattice import OBS_MASSES_MEV
+from golden_unification.lattice import build_q_set as build_feasible_q_set
+from golden_unification.scoring import anchored_fit_score
+from null_tests_fast_v2 import run_config, write_tex
+
+
+QUEUE_VERSION = 1
+
+
+# ----------------------------
+# Queue layout
+# ----------------------------
+
+@dataclass
+class Shard:
+    ensemble: str             # "A" or "B"
+    sigma: Optional[float]
+    seed: int
+    index: int                # seed-sequence index within the ensemble
+    n: int                    # trials in this shard
+
+    @property
+    def shard_id(self) -> str:
+        tag = "A" if self.sigma is None else f"B{self.sigma!r}"
+        return f"{tag}-{self.index:08d}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"ensemble": self.ensemble, "sigma": self.sigma, "seed": self.seed,
+                "index": self.index, "n": self.n}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Shard":
+        return cls(d["ensemble"], d["sigma"], int(d["seed"]), int(d["index"]), int(d["n"]))
+
+
+def shard_rng(shard: Shard) -> random.Random:
+    return keyed_rng(shard.seed, shard.ensemble, shard.sigma, f"shard{shard.index}")
+
+
+def _dirs(queue: str) -> Tuple[str, str, str]:
+    return (os.path.join(queue, "todo"), os.path.join(queue, "claimed"), os.path.join(queue, "done"))
+
+
+def _write_json_atomic(path: str, payload: Dict[str, Any], tmp_tag: str) -> None:
+    tmp = f"{path}.{tmp_tag}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(tmp, path)
+
+
+def read_config(queue: str) -> Dict[str, Any]:
+    with open(os.path.join(queue, "config.json"), "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+    if cfg.get("version") != QUEUE_VERSION:
+        raise SystemExit(f"Unsupported queue version in {queue}: {cfg.get('version')}")
+    return cfg
+
+
+def check_dataset(cfg: Dict[str, Any]) -> None:
+    """Refuse to mix shards computed against a different dataset or scan box."""
+    if cfg["run"] != run_config(cfg["run"]["seed"], cfg["run"]["sigma"]):
+        raise SystemExit("Queue was written for a different dataset/scan box than this checkout")
+
+
+def plan_shards(seed: int, sigmas: List[float], n_from: int, n_to: int, shard_trials: int) -> List[Shard]:
+    """Shards covering trials [n_from, n_to) of every ensemble; n_from is a multiple of shard_trials."""
+    shards: List[Shard] = []
+    for ensemble, sigma in [("A", None)] + [("B", s) for s in sigmas]:
+        start = n_from
+        while start < n_to:
+            n = min(shard_trials, n_to - start)
+            shards.append(Shard(ensemble, sigma, seed, start // shard_trials, n))
+            start += n
+    return shards
+
+
+# ----------------------------
+# Coordinator
+# ----------------------------
+
+def init_queue(queue: str, seed: int, sigmas: List[float], n_target: int, shard_trials: int) -> int:
+    """Create (or extend) a queue; returns the number of shards added."""
+    todo, claimed, done = _dirs(queue)
+    for d in (todo, claimed, done):
+        os.makedirs(d, exist_ok=True)
+
+    run = run_config(seed, sigmas)
+    cfg_path = os.path.join(queue, "config.json")
+    n_from = 0
+    if os.path.exists(cfg_path):
+        old = read_config(queue)
+        if old["run"] != run or old["shard_trials"] != shard_trials:
+            raise SystemExit(f"{queue} holds a different run (seed/sigma/dataset/shard size)")
+        n_from = int(old["N"])
+        if n_target <= n_from:
+            return 0
+        if n_from % shard_trials:
+            raise SystemExit(f"Cannot extend: N={n_from} is not a whole number of {shard_trials}-trial shards")
+
+    shards = plan_shards(seed, sigmas, n_from, n_target, shard_trials)
+    for sh in shards:
+        _write_json_atomic(os.path.join(todo, sh.shard_id + ".json"), sh.to_dict(), "init")
+    # config last: workers only start once every descriptor is in place
+    _write_json_atomic(cfg_path, {"version": QUEUE_VERSION, "run": run, "N": n_target,
+                                  "shard_trials": shard_trials}, "init")
+    return len(shards)
+
+
+def queue_status(queue: str) -> Dict[str, int]:
+    def count(d: str) -> int:
+        return sum(1 for n in os.listdir(d) if n.endswith(".json"))
+
+    todo, claimed, done = _dirs(queue)
+    return {"todo": count(todo), "claimed": count(claimed), "done": count(done)}
+
+
+def requeue_stale(queue: str, stale_s: float) -> int:
+    """Return claims older than stale_s seconds (and not yet done) to todo/."""
+    todo, claimed, done = _dirs(queue)
+    now = time.time()
+    n = 0
+    for name in os.listdir(claimed):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(claimed, name)
+        shard_id = name[:-5].split("@", 1)[0]
+        try:
+            age = now - os.path.getmtime(path)
+            if os.path.exists(os.path.join(done, shard_id + ".json")):
+                os.remove(path)
+            elif age > stale_s:
+                os.rename(path, os.path.join(todo, shard_id + ".json"))
+                n += 1
+        except FileNotFoundError:
+            continue                                 # the worker finished meanwhile
+    return n
+
+
+def default_out_tex() -> str:
+    here = os.path.dirname(os.path.abspath(__file__))
+    return os.path.normpath(os.path.join(here, "..", "shared", "paperIX_null_pvalues_distributed.tex"))
+
+
+# ----------------------------
+# Worker
+# ----------------------------
+
+def worker_tag() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def claim_next(queue: str, tag: str) -> Optional[Tuple[str, Shard]]:
+    """Atomically move one descriptor from todo/ to claimed/; None when todo/ is empty."""
+    todo, claimed, _ = _dirs(queue)
+    for name in sorted(os.listdir(todo)):
+        if not name.endswith(".json"):
+            continue
+        dst = os.path.join(claimed, f"{name[:-5]}@{tag}.json")
+        try:
+            os.rename(os.path.join(todo, name), dst)
+        except (FileNotFoundError, PermissionError):
+            continue                                 # another worker won this one
+        try:
+            os.utime(dst)                            # claim time, for requeue --stale
+            with open(dst, "r", encoding="utf-8") as f:
+                return dst, Shard.from_dict(json.load(f))
+        except FileNotFoundError:
+            continue                                 # requeued / moved since the rename; try the next
+    return None
+
+
+def run_shard(q_list: List[int], shard: Shard, obs_val: float) -> TrialAccumulator:
+    state = EnsembleState(shard.ensemble, shard.sigma, shard_rng(shard), 0, TrialAccumulator(obs_val))
+    run_ensemble(q_list, state, shard.n)
+    return state.acc
+
+
+def work(queue: str, tag: str, max_shards: Optional[int] = None, verbose: bool = True) -> int:
+    """Claim and run shards until todo/ is empty; returns the number run."""
+    cfg = read_config(queue)
+    check_dataset(cfg)
+    _, _, done = _dirs(queue)
+    q_list = build_feasible_q_set()
+    obs_val = anchored_fit_score(q_list, OBS_MASSES_MEV).mean_eps
+
+    n_run = 0
+    while max_shards is None or n_run < max_shards:
+        got = claim_next(queue, tag)
+        if got is None:
+            break
+        claim_path, shard = got
+        t0 = time.perf_counter()
+        acc = run_shard(q_list, shard, obs_val)
+        payload = {"shard": shard.to_dict(), "worker": tag, "acc": acc.to_dict()}
+        _write_json_atomic(os.path.join(done, shard.shard_id + ".json"), payload, tag)
+        try:
+            os.remove(claim_path)
+        except FileNotFoundError:
+            pass                                     # requeued meanwhile; the result is identical
+        n_run += 1
+        if verbose:
+            print(f"[{tag}] {shard.shard_id}: {shard.n} trials in {time.perf_counter() - t0:.1f}s")
+    return n_run
+
+
+# ----------------------------
+# Reducer
+# ----------------------------
+
+def reduce_queue(queue: str) -> Tuple[Dict[str, Any], List[Tuple[Optional[float], TrialAccumulator]]]:
+    """Merge all done/ accumulators per ensemble; every planned shard must be present."""
+    cfg = read_config(queue)
+    check_dataset(cfg)
+    _, _, done = _dirs(queue)
+    seed = cfg["run"]["seed"]
+    sigmas = cfg["run"]["sigma"]
+    plan = plan_shards(seed, sigmas, 0, int(cfg["N"]), int(cfg["shard_trials"]))
+
+    missing = [sh.shard_id for sh in plan if not os.path.exists(os.path.join(done, sh.shard_id + ".json"))]
+    if missing:
+        raise SystemExit(f"{len(missing)} of {len(plan)} shards not done yet (e.g. {missing[0]})")
+
+    accs: Dict[Optional[float], TrialAccumulator] = {}
+    for sh in plan:
+        with open(os.path.join(done, sh.shard_id + ".json"), "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        if Shard.from_dict(payload["shard"]) != sh:
+            raise SystemExit(f"done/{sh.shard_id}.json does not match its descriptor")
+        acc = TrialAccumulator.from_dict(payload["acc"])
+        if sh.sigma in accs:
+            accs[sh.sigma].merge(acc)
+        else:
+            accs[sh.sigma] = acc
+    return cfg, [(None, accs[None])] + [(s, accs[s]) for s in sigmas]
+
+
+def write_reduced(queue: str, out_tex: str) -> None:
+    cfg, rows = reduce_queue(queue)
+    q_list = build_feasible_q_set()
+    obs = anchored_fit_score(q_list, OBS_MASSES_MEV)
+    statsA = rows[0][1].summary()
+    nullB_rows: List[Tuple[float, Dict[str, float]]] = []
+    print(f"Null A: N={rows[0][1].count} {format_summary(statsA)}")
+    for sigma, acc in rows[1:]:
+        assert sigma is not None
+        st = acc.summary()
+        nullB_rows.append((sigma, st))
+        print(f"Null B sigma={sigma:.3f}: N={acc.count} {format_summary(st)}")
+    write_tex(out_tex, obs, statsA, nullB_rows, N=int(cfg["N"]), seed=cfg["run"]["seed"],
+              sketched=any(not acc.exact for _, acc in rows))
+    print(f"Wrote LaTeX block to: {out_tex}")
+
+
+# ----------------------------
+# Local multi-process mode
+# ----------------------------
+
+def _local_worker(queue: str, k: int) -> None:
+    work(queue, f"{worker_tag()}-local{k}")
+
+
+def run_local(queue: str, n_workers: int) -> None:
+    import multiprocessing as mp
+    procs = [mp.Process(target=_local_worker, args=(queue, k)) for k in range(n_workers)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    bad = [p.exitcode for p in procs if p.exitcode]
+    if bad:
+        raise SystemExit(f"{len(bad)} local worker(s) failed")
+
+
+# ----------------------------
+# Main
+# ----------------------------
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Null tests v2 over a shared-filesystem shard queue.")
+    sub = ap.add_subparsers(dest="step", required=True)
+
+    def add_queue(p: argparse.ArgumentParser) -> None:
+        p.add_argument("--queue", type=str, required=True, help="queue directory (shared by all nodes)")
+
+    def add_plan(p: argparse.ArgumentParser) -> None:
+        p.add_argument("--N", type=int, default=2000, help="number of null trials per ensemble")
+        p.add_argument("--seed", type=int, default=1, help="RNG seed")
+        p.add_argument("--sigma", type=float, nargs="*", default=[0.15, 0.30, 0.50],
+                       help="sigma values for jittered null (log-space)")
+        p.add_argument("--shard-trials", type=int, default=1_000_000, help="trials per shard")
+
+    p_init = sub.add_parser("init", help="write config and shard descriptors")
+    add_queue(p_init)
+    add_plan(p_init)
+
+    p_work = sub.add_parser("work", help="claim and run shards until none are left")
+    add_queue(p_work)
+    p_work.add_argument("--max-shards", type=int, default=None, help="stop after this many shards")
+
+    p_status = sub.add_parser("status", help="count todo / claimed / done shards")
+    add_queue(p_status)
+
+    p_req = sub.add_parser("requeue", help="return stale claims to the queue")
+    add_queue(p_req)
+    p_req.add_argument("--stale", type=float, required=True, help="claim age in seconds")
+
+    p_red = sub.add_parser("reduce", help="merge accumulators and write the LaTeX block")
+    add_queue(p_red)
+    p_red.add_argument("--out-tex", type=str, default=default_out_tex(), help="output .tex path")
+
+    p_loc = sub.add_parser("local", help="init + local worker processes + reduce on one box")
+    add_queue(p_loc)
+    add_plan(p_loc)
+    p_loc.add_argument("--local-workers", type=int, default=os.cpu_count() or 1,
+                       help="worker processes standing in for nodes")
+    p_loc.add_argument("--out-tex", type=str, default=default_out_tex(), help="output .tex path")
+
+    args = ap.parse_args()
+
+    if args.step in ("init", "local"):
+        if args.shard_trials <= 0:
+            ap.error("--shard-trials must be positive")
+        n = init_queue(args.queue, args.seed, list(args.sigma), args.N, args.shard_trials)
+        print(f"Queued {n} shard(s) in {args.queue}")
+    if args.step == "work":
+        n = work(args.queue, worker_tag(), args.max_shards)
+        print(f"Ran {n} shard(s)")
+    elif args.step == "status":
+        st = queue_status(args.queue)
+        print(f"todo={st['todo']} claimed={st['claimed']} done={st['done']}")
+    elif args.step == "requeue":
+        print(f"Requeued {requeue_stale(args.queue, args.stale)} stale claim(s)")
+    elif args.step == "reduce":
+        write_reduced(args.queue, args.out_tex)
+    elif args.step == "local":
+        run_local(args.queue, args.local_workers)
+        write_reduced(args.queue, args.out_tex)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,8 @@ import random
 from dataclasses import dataclass
 from typing import List, Tuple, Dict
 
-PHI = (1.0 + 5.0 ** 0.5) / 2.0
-
-def log_phi(x: float) -> float:
-    return math.log(x) / math.log(PHI)
+from golden_unification.lattice import PHI, log_phi
+from golden_unification.lattice import q_from_abc as q
 
 @dataclass
 class Particle:
@@ -23,9 +21,6 @@ OBS = [
     Particle("top",    172.76),
 ]
 
-def q(a:int,b:int,c:int) -> int:
-    return 8*a + 15*b + 24*c
-
 def pred_mass_ratio(qv: int) -> float:
     return PHI ** (qv / 4.0)
 
@@ -19,234 +19,61 @@
 #   python .\code\null_tests_fast_v2.py --N 5000 --seed 1
 #   python .\code\null_tests_fast_v2.py --sigma 0.15 0.30 0.50 --N 2000
 #
+# Long runs (checkpointed, resumable, extendable):
+#   python .\code\null_tests_fast_v2.py --N 100000000 --checkpoint null_v2.ckpt.json
+#   python .\code\null_tests_fast_v2.py --checkpoint null_v2.ckpt.json --resume
+#   python .\code\null_tests_fast_v2.py --N 100000000 --streams keyed --checkpoint null_v2.ckpt.json
+#   python .\code\null_tests_fast_v2.py --checkpoint null_v2.ckpt.json --extend-to 200000000
+#
+# Fixed-point scoring (same p_emp, see fixed_point_scoring.py):
+#   python .\code\null_tests_fast_v2.py --N 10000000 --fixed-point
+#
+# Per-trial raw output (memory-mappable .npy columns, see npy_columns.py):
+#   python .\code\null_tests_fast_v2.py --N 1000000 --raw-dir null_v2_raw
+#   python .\code\null_tests_fast_v2.py --checkpoint null_v2.ckpt.json --resume --raw-dir null_v2_raw
+#
 # Notes:
 # - We keep the electron as the anchor (m_e fixed).
 # - We use your current observed set: e, mu, tau, W, Z, top (modifiable).
-# - If you later extend the species set, update OBS_MASSES_MEV accordingly,
-#   but do NOT change the scan box once pre-registered.
+# - If you later extend the species set, update OBS_MASSES_MEV (in
+#   golden_unification/lattice.py) accordingly, but do NOT change the scan
+#   box once pre-registered.
+# - RNG streams (--streams):
+#     legacy  one random.Random(seed) drawn in order A, B(sigma_1), ...; this
+#             reproduces the published shared/paperIX_null_pvalues.tex and is
+#             the default. Resumable, but not extendable.
+#     keyed   each ensemble (Null A, Null B at each sigma) draws from its own
+#             stream, so a run extended to more trials gives exactly the same
+#             numbers as one uninterrupted run of that length (--extend-to,
+#             null_distributed.py). Null A is the same in both modes.
+#   In either mode a resumed run matches the uninterrupted one.
 #
 # ============================================================
 
 from __future__ import annotations
 
 import argparse
-import math
+import json
 import os
 import random
-import statistics
-from dataclasses import dataclass
-from typing import Dict, List, Tuple
-
-
-# ----------------------------
-# Constants / observed dataset
-# ----------------------------
-
-PHI = (1.0 + 5.0 ** 0.5) / 2.0
-
-# Observed masses in MeV (consistent units; ratios are unitless).
-# If you prefer GeV for heavy states, convert them to MeV here.
-OBS_MASSES_MEV: Dict[str, float] = {
-    "electron": 0.51099895,      # MeV
-    "muon": 105.6583755,         # MeV
-    "tau": 1776.86,              # MeV
-    "W": 80379.0,                # MeV (80.379 GeV)
-    "Z": 91187.6,                # MeV (91.1876 GeV)
-    "top": 172760.0,             # MeV (172.76 GeV)
-}
-
-ANCHOR = "electron"
-
-# Default scan box (anchored model) — matches your anchored runs.
-A_MIN, A_MAX = -80, 20
-B_MIN, B_MAX = -40, 40
-C_MIN, C_MAX = -40, 60
-
-# q(a,b,c) definition (fixed)
-def q_from_abc(a: int, b: int, c: int) -> int:
-    return 8 * a + 15 * b + 24 * c
-
-
-# ----------------------------
-# Utility math
-# ----------------------------
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-def log_phi(x: float) -> float:
-    return math.log(x) / math.log(PHI)
-
-def quantile(sorted_vals: List[float], q: float) -> float:
-    """Linear interpolation quantile for 0<=q<=1 on a pre-sorted list."""
-    if not sorted_vals:
-        raise ValueError("quantile(): empty list")
-    if q <= 0:
-        return sorted_vals[0]
-    if q >= 1:
-        return sorted_vals[-1]
-    pos = (len(sorted_vals) - 1) * q
-    lo = int(math.floor(pos))
-    hi = int(math.ceil(pos))
-    if lo == hi:
-        return sorted_vals[lo]
-    w = pos - lo
-    return (1 - w) * sorted_vals[lo] + w * sorted_vals[hi]
-
-
-# ----------------------------
-# q-set precomputation
-# ----------------------------
-
-def build_feasible_q_set() -> List[int]:
-    """
-    Enumerate all q values reachable within the scan box.
-    We deduplicate q values (because epsilon depends only on q).
-    """
-    qs = set()
-    for a in range(A_MIN, A_MAX + 1):
-        for b in range(B_MIN, B_MAX + 1):
-            # Precompute partial to save multiplications
-            ab = 8 * a + 15 * b
-            for c in range(C_MIN, C_MAX + 1):
-                qs.add(ab + 24 * c)
-    q_list = sorted(qs)
-    return q_list
-
-
-def best_eps_for_mass_ratio(q_list: List[int], ratio: float) -> Tuple[float, int]:
-    """
-    Compute epsilon_min(ratio) = min_q | q/4 - log_phi(ratio) |.
-    Returns (eps_min, q_best). Uses binary search around target q.
-    """
-    target = 4.0 * log_phi(ratio)
-
-    # Binary search for nearest q in q_list to target
-    lo, hi = 0, len(q_list) - 1
-    while lo < hi:
-        mid = (lo + hi) // 2
-        if q_list[mid] < target:
-            lo = mid + 1
-        else:
-            hi = mid
-
-    # lo is the first index with q >= target (or last)
-    candidates = []
-    candidates.append(q_list[lo])
-    if lo > 0:
-        candidates.append(q_list[lo - 1])
-    if lo + 1 < len(q_list):
-        candidates.append(q_list[lo + 1])
-
-    best_q = candidates[0]
-    best_eps = abs(best_q / 4.0 - log_phi(ratio))
-    for q in candidates[1:]:
-        eps = abs(q / 4.0 - log_phi(ratio))
-        if eps < best_eps:
-            best_eps = eps
-            best_q = q
-    return best_eps, best_q
-
-
-@dataclass
-class FitResult:
-    mean_eps: float
-    per_particle_eps: Dict[str, float]
-    per_particle_qbest: Dict[str, int]
-
-
-def anchored_fit_score(q_list: List[int], masses_mev: Dict[str, float]) -> FitResult:
-    """
-    Anchored fit: electron is the anchor with ratio=1 => epsilon=0.
-    For each other particle, compute eps_min using q-set.
-    """
-    if ANCHOR not in masses_mev:
-        raise ValueError(f"Anchor '{ANCHOR}' missing from masses")
-
-    me = masses_mev[ANCHOR]
-    per_eps: Dict[str, float] = {}
-    per_q: Dict[str, int] = {}
-
-    # Anchor (exact by convention)
-    per_eps[ANCHOR] = 0.0
-    per_q[ANCHOR] = 0  # by definition q_e=0 after anchoring
-
-    for name, m in masses_mev.items():
-        if name == ANCHOR:
-            continue
-        ratio = m / me
-        eps, qbest = best_eps_for_mass_ratio(q_list, ratio)
-        per_eps[name] = eps
-        per_q[name] = qbest
-
-    # mean epsilon over all species including anchor (anchor adds 0)
-    mean_eps = sum(per_eps.values()) / len(per_eps)
-    return FitResult(mean_eps=mean_eps, per_particle_eps=per_eps, per_particle_qbest=per_q)
-
-
-# ----------------------------
-# Null ensembles
-# ----------------------------
-
-def null_log_uniform(
-    rng: random.Random,
-    base_masses: Dict[str, float],
-    n_nonanchor: int,
-) -> Dict[str, float]:
-    """
-    Null A: draw non-anchor masses i.i.d. log-uniform over observed range
-    of non-anchor masses. Keep anchor fixed.
-    """
-    me = base_masses[ANCHOR]
-    non_anchor = [m for k, m in base_masses.items() if k != ANCHOR]
-    mmin = min(non_anchor)
-    mmax = max(non_anchor)
-
-    ln_min = math.log(mmin)
-    ln_max = math.log(mmax)
-
-    out: Dict[str, float] = {ANCHOR: me}
-    # Preserve the same particle labels (except we resample their values)
-    labels = [k for k in base_masses.keys() if k != ANCHOR]
-    if len(labels) != n_nonanchor:
-        # In practice: n_nonanchor should equal len(labels)
-        labels = labels[:n_nonanchor]
-
-    for lbl in labels:
-        ln_m = ln_min + (ln_max - ln_min) * rng.random()
-        out[lbl] = math.exp(ln_m)
-    return out
-
-
-def null_jittered(
-    rng: random.Random,
-    base_masses: Dict[str, float],
-    sigma: float,
-) -> Dict[str, float]:
-    """
-    Null B: jitter observed non-anchor masses in ln-space by N(0, sigma^2).
-    Keep anchor fixed.
-    """
-    me = base_masses[ANCHOR]
-    out: Dict[str, float] = {ANCHOR: me}
-    for k, m in base_masses.items():
-        if k == ANCHOR:
-            continue
-        z = rng.gauss(0.0, 1.0)
-        out[k] = m * math.exp(sigma * z)
-    return out
+# Lattice, observed dataset, anchored fit and the ensembles themselves live in
+# the golden_unification package; this script adds checkpoints, raw output
+# and the published LaTeX table.
+from golden_unification.blocks import format_sci, format_summary, tex_banner, write_tex_block
+from golden_unification.ensembles import (
+    EXACT_LIMIT, SKETCH_ALPHA, EnsembleState, TrialAccumulator, new_ensembles, run_ensemble,
+)
+from golden_unification.lattice import A_MAX, A_MIN, ANCHOR, B_MAX, B_MIN, C_MAX, C_MIN, OBS_MASSES_MEV
+from golden_unification.lattice import build_q_set as build_feasible_q_set
+from golden_unification.scoring import FitResult, anchored_fit_score
 
 
 # ----------------------------
 # Reporting / LaTeX writer
 # ----------------------------
 
-def format_sci(x: float) -> str:
-    # LaTeX-friendly scientific notation
-    if x == 0:
-        return "0"
-    exp = int(math.floor(math.log10(abs(x))))
-    mant = x / (10 ** exp)
-    return f"{mant:.6f}\\times 10^{{{exp}}}"
-
-
 def write_tex(
     out_path: str,
     obs: FitResult,
@@ -254,19 +81,15 @@ def write_tex(
     nullB_rows: List[Tuple[float, Dict[str, float]]],
     N: int,
     seed: int,
+    sketched: bool = False,
 ) -> None:
     """
     Write shared/paperIX_null_pvalues.tex including Null A and Null B.
     nullA_stats: keys = min, med, p16, p84, p_emp
     nullB_rows: list of (sigma, statsdict)
+    sketched: some accumulator summarized its quantiles from the sketch (adds a note)
     """
-    os.makedirs(os.path.dirname(out_path), exist_ok=True)
-
-    lines: List[str] = []
-    lines.append("% ============================================================")
-    lines.append("% Paper IX — Null tests (v2) generated by code/null_tests_fast_v2.py")
-    lines.append("% ============================================================")
-    lines.append("")
+    lines = tex_banner("Paper IX — Null tests (v2)", "null_tests_fast_v2.py")
     lines.append("\\subsection{Null tests and empirical tail probabilities}")
     lines.append(
         "We evaluate the anchored lattice score $\\overline{\\epsilon}$ on the observed spectrum and on "
@@ -309,30 +132,109 @@ def write_tex(
     lines.append("\\hline")
     lines.append("\\end{tabular}")
     lines.append("\\end{center}")
+    if sketched:
+        lines.append(
+            f"\\noindent{{\\footnotesize Beyond {EXACT_LIMIT} trials per ensemble the median and the "
+            f"$16\\%$/$84\\%$ quantiles are read from a log-binned sketch (relative error "
+            f"$\\le {SKETCH_ALPHA:g}$); minima and $p_\\mathrm{{emp}}$ are exact.}}"
+        )
     lines.append("")
     lines.append("% End of auto-generated block.")
+    write_tex_block(out_path, lines)
+
 
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines) + "\n")
+# ----------------------------
+# Checkpoints
+# ----------------------------
 
+CHECKPOINT_VERSION = 1
 
-def summarize_trials(vals: List[float], obs_val: float) -> Dict[str, float]:
-    if not vals:
-        raise ValueError("No trials to summarize")
-    s = sorted(vals)
-    return {
-        "min": s[0],
-        "med": quantile(s, 0.5),
-        "p16": quantile(s, 0.16),
-        "p84": quantile(s, 0.84),
-        "p_emp": sum(1 for v in vals if v <= obs_val) / len(vals),
+
+def run_config(seed: int, sigmas: List[float], streams: str = "keyed") -> Dict[str, Any]:
+    """
+    Everything a checkpoint must agree on before it may be resumed. "streams"
+    is recorded only for legacy runs, so keyed checkpoints and shard queues
+    written before the option existed still match.
+    """
+    config: Dict[str, Any] = {
+        "seed": seed,
+        "sigma": list(sigmas),
+        "anchor": ANCHOR,
+        "masses_mev": dict(OBS_MASSES_MEV),
+        "scan_box": [A_MIN, A_MAX, B_MIN, B_MAX, C_MIN, C_MAX],
     }
+    if streams != "keyed":
+        config["streams"] = streams
+    return config
+
+
+def save_checkpoint(path: str, config: Dict[str, Any], n_target: int, states: List[EnsembleState]) -> None:
+    """Write the checkpoint atomically (tmp file + os.replace), so a crash never leaves it torn."""
+    ens = []
+    for st in states:
+        version, internal, gauss_next = st.rng.getstate()
+        ens.append({
+            "name": st.name,
+            "sigma": st.sigma,
+            "done": st.done,
+            "rng_state": [version, list(internal), gauss_next],
+            "acc": st.acc.to_dict(),
+        })
+    payload = {"version": CHECKPOINT_VERSION, "config": config, "N": n_target, "ensembles": ens}
+    d = os.path.dirname(os.path.abspath(path))
+    os.makedirs(d, exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path: str) -> Tuple[Dict[str, Any], int, List[EnsembleState]]:
+    with open(path, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+    if payload.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version in {path}: {payload.get('version')}")
+    states: List[EnsembleState] = []
+    for e in payload["ensembles"]:
+        version, internal, gauss_next = e["rng_state"]
+        rng = random.Random()
+        rng.setstate((version, tuple(internal), gauss_next))
+        states.append(EnsembleState(
+            name=e["name"],
+            sigma=e["sigma"],
+            rng=rng,
+            done=int(e["done"]),
+            acc=TrialAccumulator.from_dict(e["acc"]),
+        ))
+    if payload["config"].get("streams") == "legacy":
+        # one shared stream: every ensemble saved the same state
+        for st in states[1:]:
+            st.rng = states[0].rng
+    return payload["config"], int(payload["N"]), states
 
 
 # ----------------------------
 # Main
 # ----------------------------
 
+def raw_tag(state: EnsembleState) -> str:
+    return sigma_tag(state.sigma)
+
+
+def sigma_tag(sigma: Optional[float]) -> str:
+    """File tag of an ensemble's raw columns: Null A, or Null B at this sigma."""
+    return "nullA" if sigma is None else f"nullB_sigma{sigma!r}"
+
+
+def raw_sink(writer: Any, species: List[str]) -> Callable[[FitResult], None]:
+    """on_trial callback appending one row per trial to a RawTrialWriter."""
+    def sink(fit: FitResult) -> None:
+        writer.add(fit.mean_eps,
+                   [fit.per_particle_eps[k] for k in species],
+                   [fit.per_particle_qbest[k] for k in species])
+    return sink
+
+
 def resolve_default_out_tex() -> str:
     # Place output in ../shared relative to this file.
     here = os.path.dirname(os.path.abspath(__file__))
@@ -340,7 +242,7 @@ def resolve_default_out_tex() -> str:
     return os.path.join(shared, "paperIX_null_pvalues.tex")
 
 
-def main() -> None:
+def main(argv: Optional[List[str]] = None) -> None:
     ap = argparse.ArgumentParser(description="Null tests v2 (fast) for anchored lattice score.")
     ap.add_argument("--N", type=int, default=2000, help="number of null trials per ensemble")
     ap.add_argument("--seed", type=int, default=1, help="RNG seed")
@@ -352,7 +254,30 @@ def main() -> None:
         help="sigma values for jittered null (log-space); e.g. 0.15 0.30 0.50",
     )
     ap.add_argument("--out-tex", type=str, default=resolve_default_out_tex(), help="output .tex path")
-    args = ap.parse_args()
+    ap.add_argument("--streams", choices=["legacy", "keyed"], default="legacy",
+                    help="legacy: one stream for all ensembles (reproduces the published table); "
+                         "keyed: one stream per ensemble (needed for --extend-to)")
+    ap.add_argument("--checkpoint", type=str, default=None,
+                    help="checkpoint file (JSON) for accumulator and RNG state")
+    ap.add_argument("--checkpoint-every", type=int, default=100000,
+                    help="write the checkpoint every this many trials per ensemble")
+    ap.add_argument("--resume", action="store_true",
+                    help="continue an interrupted run from --checkpoint")
+    ap.add_argument("--extend-to", type=int, default=None, metavar="N2",
+                    help="extend the run in --checkpoint to N2 trials per ensemble")
+    ap.add_argument("--fixed-point", action="store_true",
+                    help="score on the certified fixed-point path (identical p_emp, quantiles within ~1e-8)")
+    ap.add_argument("--frac-bits", type=int, default=24, help="fractional bits for --fixed-point")
+    ap.add_argument("--raw-dir", type=str, default=None,
+                    help="also write per-trial mean eps, per-species eps and q_best as .npy columns here")
+    ap.add_argument("--raw-batch", type=int, default=65536,
+                    help="trials buffered in memory per raw-output write")
+    args = ap.parse_args(argv)
+
+    if (args.resume or args.extend_to is not None) and not args.checkpoint:
+        ap.error("--resume/--extend-to require --checkpoint")
+    if args.fixed_point and args.raw_dir:
+        ap.error("--raw-dir needs per-species fits; it cannot be combined with --fixed-point")
 
     # Precompute feasible q values once
     print("Building feasible q-set from scan box...")
@@ -370,39 +295,94 @@ def main() -> None:
         print(f"  {k:>8s}  eps={obs.per_particle_eps[k]:.6e}  q_best={obs.per_particle_qbest[k]}")
     print("")
 
-    rng = random.Random(args.seed)
+    if args.resume or args.extend_to is not None:
+        # The checkpoint is authoritative for seed and sigmas; the dataset and
+        # scan box in this file must not have changed since it was written.
+        config, n_target, states = load_checkpoint(args.checkpoint)
+        streams = config.get("streams", "keyed")
+        current = run_config(config["seed"], config["sigma"], streams)
+        if config != current:
+            raise SystemExit(f"Checkpoint {args.checkpoint} was written for a different dataset/scan box")
+        if args.extend_to is not None and streams == "legacy":
+            raise SystemExit(f"Checkpoint {args.checkpoint} uses the legacy single stream, which cannot be "
+                             "extended; start the run with --streams keyed")
+        if args.extend_to is not None:
+            if args.extend_to < max(st.done for st in states):
+                raise SystemExit(f"--extend-to {args.extend_to} is below trials already done")
+            n_target = args.extend_to
+        seed = config["seed"]
+        sigmas = list(config["sigma"])
+        print(f"Resuming from {args.checkpoint}: seed={seed}, sigma={sigmas}, streams={streams}, "
+              f"target N={n_target}")
+        for st in states:
+            label = "A" if st.sigma is None else f"B sigma={st.sigma:.3f}"
+            print(f"  {label}: {st.done} trials done")
+        print("")
+    else:
+        seed = args.seed
+        sigmas = list(args.sigma)
+        n_target = args.N
+        config = run_config(seed, sigmas, args.streams)
+        states = new_ensembles(seed, sigmas, obs.mean_eps, args.streams)
+
+    # Raw columns resume at each ensemble's checkpointed trial count; rows
+    # written after the last checkpoint are dropped and redrawn identically.
+    species = list(OBS_MASSES_MEV.keys())
+    writers: List[Any] = []
+    if args.raw_dir:
+        from npy_columns import RawTrialWriter, write_columns_meta
+        write_columns_meta(args.raw_dir, species, config)
+        writers = [RawTrialWriter(args.raw_dir, raw_tag(st), len(species), args.raw_batch, rows_from=st.done)
+                   for st in states]
+    sinks = [raw_sink(w, species) for w in writers] or [None] * len(states)
+
+    run: Callable[..., Any] = run_ensemble
+    if args.fixed_point:
+        from fixed_point_scoring import FixedPointQ, run_ensemble_fixed
+        fx = FixedPointQ(q_list, args.frac_bits)
+
+        def run(q_list: List[int], st: EnsembleState, n: int, every: int,
+                on_checkpoint: Callable[[], None], on_trial: Any) -> None:
+            n_rescored = run_ensemble_fixed(q_list, fx, st, n, every, on_checkpoint)
+            print(f"  fixed-point: {n_rescored} trial(s) re-scored in float64 near the threshold")
+
+    def checkpoint() -> None:
+        if args.checkpoint:
+            for w in writers:
+                w.flush()
+            save_checkpoint(args.checkpoint, config, n_target, states)
 
     # Null A: log-uniform i.i.d.
     print("=== Null A: log-uniform i.i.d. ===")
-    trialsA: List[float] = []
-    labels_nonanchor = [k for k in OBS_MASSES_MEV.keys() if k != ANCHOR]
-    for _ in range(args.N):
-        massesA = null_log_uniform(rng, OBS_MASSES_MEV, n_nonanchor=len(labels_nonanchor))
-        fitA = anchored_fit_score(q_list, massesA)
-        trialsA.append(fitA.mean_eps)
-    statsA = summarize_trials(trialsA, obs.mean_eps)
-    print(f"N = {args.N}")
-    print(f"min={statsA['min']:.6e} med={statsA['med']:.6e} max={max(trialsA):.6e} p_emp={statsA['p_emp']:.6g}")
+    stA = states[0]
+    run(q_list, stA, n_target, args.checkpoint_every, checkpoint, sinks[0])
+    checkpoint()
+    statsA = stA.acc.summary()
+    print(f"N = {n_target}")
+    print(format_summary(statsA))
     print("")
 
     # Null B: jittered spectrum for each sigma
     nullB_rows: List[Tuple[float, Dict[str, float]]] = []
     print("=== Null B: jittered spectrum ===")
-    for sigma in args.sigma:
-        trialsB: List[float] = []
-        for _ in range(args.N):
-            massesB = null_jittered(rng, OBS_MASSES_MEV, sigma=sigma)
-            fitB = anchored_fit_score(q_list, massesB)
-            trialsB.append(fitB.mean_eps)
-        statsB = summarize_trials(trialsB, obs.mean_eps)
-        nullB_rows.append((sigma, statsB))
-        print(f"sigma={sigma:.3f}  min={statsB['min']:.6e} med={statsB['med']:.6e} "
-              f"max={max(trialsB):.6e} p_emp={statsB['p_emp']:.6g}")
+    for stB, sinkB in zip(states[1:], sinks[1:]):
+        assert stB.sigma is not None
+        run(q_list, stB, n_target, args.checkpoint_every, checkpoint, sinkB)
+        checkpoint()
+        statsB = stB.acc.summary()
+        nullB_rows.append((stB.sigma, statsB))
+        print(f"sigma={stB.sigma:.3f}  {format_summary(statsB)}")
     print("")
 
+    for w in writers:
+        w.close()
+    if args.raw_dir:
+        print(f"Wrote per-trial columns to: {args.raw_dir}")
+
     # Write LaTeX block
     out_tex = args.out_tex
-    write_tex(out_tex, obs, statsA, nullB_rows, N=args.N, seed=args.seed)
+    write_tex(out_tex, obs, statsA, nullB_rows, N=n_target, seed=seed,
+              sketched=any(not st.acc.exact for st in states))
     print(f"Wrote LaTeX block to: {out_tex}")
     print("")
     print("Next action:")
@@ -3,13 +3,7 @@ import os, math, random, argparse
 from dataclasses import dataclass
 from typing import Dict, List, Tuple
 
-PHI = (1.0 + 5.0 ** 0.5) / 2.0
-
-def q_of(a: int, b: int, c: int) -> int:
-    return 8*a + 15*b + 24*c
-
-def log_phi(x: float) -> float:
-    return math.log(x) / math.log(PHI)
+from golden_unification.lattice import PHI, ScanBox, build_q_set as build_box_q_set, log_phi
 
 def ratio_from_q(q: int) -> float:
     return PHI ** (q / 4.0)
@@ -31,12 +25,7 @@ DEFAULT_PARTICLES = [
 DEFAULT_BOUNDS = dict(a_min=-80, a_max=20, b_min=-40, b_max=40, c_min=-40, c_max=60)
 
 def build_q_set(bounds: Dict[str,int]) -> List[int]:
-    qs = set()
-    for a in range(bounds["a_min"], bounds["a_max"]+1):
-        for b in range(bounds["b_min"], bounds["b_max"]+1):
-            for c in range(bounds["c_min"], bounds["c_max"]+1):
-                qs.add(q_of(a,b,c))
-    return sorted(qs)
+    return build_box_q_set(ScanBox(**bounds))
 
 def best_eps_for_mass_ratio(ratio: float, q_set: List[int]) -> Tuple[float,int]:
     best_eps = 1e99
@@ -0,0 +1,235 @@
+# code/pairwise_scores.py
+# ============================================================
+# Golden Unification — anchor-free all-pairs ratio score
+# Writes (optional): ../shared/paperIX_pairwise_null.tex
+# ============================================================
+#
+# Every other scorer anchors on the electron, so its result depends on one
+# reference mass. Here the statistic uses all P(P-1)/2 mass ratios:
+#
+#   eps_ij   = min_q | q/4 - log_phi(m_j/m_i) |     (i < j, m_i <= m_j)
+#   eps_pair = mean over pairs of eps_ij
+#
+# with q ranging over the same reachable q-set (scan box of
+# golden_unification.lattice). Rescaling every mass leaves eps_pair
+# unchanged.
+#
+# Speed: the q-set is turned into prev/next lookup tables over its integer
+# span (golden_unification.scoring.NearestQ), so the nearest reachable q is
+# two list lookups instead of a binary search. The pair matrix is never
+# materialized: rows (one mass against all heavier ones) are streamed in
+# chunks, so memory is O(P) per trial, and trials are split into fixed
+# blocks with their own RNG streams so results do not depend on --workers.
+#
+# Usage examples (run from repo root):
+#   python .\code\pairwise_scores.py
+#   python .\code\pairwise_scores.py --table pdg --N 2000 --workers 8
+#   python .\code\pairwise_scores.py --table pdg --sigma 0.15 --out-tex shared\paperIX_pairwise_null.tex
+#
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from golden_unification.blocks import (
+    blocks, format_sci, format_summary, keyed_rng, map_blocks, null_row, tex_banner, write_tex_block,
+)
+from golden_unification.ensembles import TrialAccumulator
+from golden_unification.lattice import OBS_MASSES_MEV, PHI, log_phi
+from golden_unification.lattice import build_q_set as build_feasible_q_set
+from golden_unification.pdg import load_mass_width_json, massive
+from golden_unification.scoring import NearestQ, pair_count, pairwise_mean_eps
+
+
+# Trials per work unit; each block has its own RNG stream (see block_rng).
+BLOCK_TRIALS = 256
+
+
+@dataclass
+class PairDetail:
+    i: str
+    j: str
+    eps: float
+    q_best: int
+
+
+def pairwise_details(nq: NearestQ, labels: Sequence[str], logs_phi: Sequence[float]) -> List[PairDetail]:
+    """Per-pair (eps, q_best), lightest partner first; for reporting the observed spectrum."""
+    order = sorted(range(len(labels)), key=lambda k: logs_phi[k])
+    out: List[PairDetail] = []
+    for a in range(len(order)):
+        for b in range(a + 1, len(order)):
+            i, j = order[a], order[b]
+            eps, qb = nq.nearest(4.0 * (logs_phi[j] - logs_phi[i]))
+            out.append(PairDetail(labels[i], labels[j], eps, qb))
+    return out
+
+
+# ----------------------------
+# Null ensembles (anchor-free)
+# ----------------------------
+
+def block_rng(seed: int, ensemble: str, sigma: Optional[float], block: int) -> random.Random:
+    return keyed_rng(seed, "pairs", ensemble, sigma, block)
+
+
+def null_block(
+    nq: NearestQ,
+    logs_phi: Sequence[float],
+    obs_val: float,
+    ensemble: str,
+    sigma: Optional[float],
+    seed: int,
+    block: int,
+    n: int,
+) -> TrialAccumulator:
+    """
+    n trials of one ensemble:
+      "A": every mass i.i.d. log-uniform over the observed range
+      "B": every mass jittered in ln-space by N(0, sigma^2)
+    """
+    rng = block_rng(seed, ensemble, sigma, block)
+    acc = TrialAccumulator(obs_val)
+    lo, hi = min(logs_phi), max(logs_phi)
+    p = len(logs_phi)
+    s_phi = 0.0 if sigma is None else sigma / math.log(PHI)
+    for _ in range(n):
+        if ensemble == "A":
+            trial = [lo + (hi - lo) * rng.random() for _ in range(p)]
+        else:
+            trial = [x + s_phi * rng.gauss(0.0, 1.0) for x in logs_phi]
+        acc.add(pairwise_mean_eps(nq, trial))
+    return acc
+
+
+_WORKER: Dict[str, object] = {}
+
+
+def _worker_init(q_list: List[int], logs_phi: List[float]) -> None:
+    _WORKER["nq"] = NearestQ(q_list)
+    _WORKER["logs"] = logs_phi
+
+
+def _worker_block(task: Tuple[float, str, Optional[float], int, int, int]) -> Dict[str, object]:
+    obs_val, ensemble, sigma, seed, block, n = task
+    nq = _WORKER["nq"]
+    logs = _WORKER["logs"]
+    assert isinstance(nq, NearestQ) and isinstance(logs, list)
+    return null_block(nq, logs, obs_val, ensemble, sigma, seed, block, n).to_dict()
+
+
+def run_null(
+    q_list: List[int],
+    logs_phi: List[float],
+    obs_val: float,
+    ensemble: str,
+    sigma: Optional[float],
+    n_trials: int,
+    seed: int,
+    workers: int,
+) -> TrialAccumulator:
+    """Run n_trials in BLOCK_TRIALS blocks, optionally across processes; merge in block order."""
+    tasks = [(obs_val, ensemble, sigma, seed, block, n) for block, n in blocks(n_trials, BLOCK_TRIALS)]
+    acc = TrialAccumulator(obs_val)
+    for d in map_blocks(_worker_block, tasks, workers, _worker_init, (q_list, logs_phi)):
+        acc.merge(TrialAccumulator.from_dict(d))
+    return acc
+
+
+# ----------------------------
+# Data sets / reporting
+# ----------------------------
+
+def load_spectrum(table: str) -> Tuple[List[str], List[float]]:
+    """(labels, log_phi masses) for the reference set ("sm") or the full PDG table ("pdg")."""
+    if table == "sm":
+        labels = list(OBS_MASSES_MEV.keys())
+        return labels, [log_phi(OBS_MASSES_MEV[k]) for k in labels]
+    entries = massive(load_mass_width_json())
+    return [e.label for e in entries], [log_phi(e.mass_gev) for e in entries]
+
+
+def write_tex(
+    out_path: str,
+    table: str,
+    n_species: int,
+    obs_val: float,
+    rows: List[Tuple[str, Dict[str, float]]],
+    N: int,
+    seed: int,
+) -> None:
+    lines = tex_banner("Anchor-free pairwise null test", "pairwise_scores.py")
+    lines.append("\\paragraph{Anchor-free pairwise score.}")
+    lines.append(
+        f"Over all $P(P-1)/2={pair_count(n_species)}$ mass ratios of the {table} set ($P={n_species}$), "
+        "the mean nearest-lattice deviation is"
+    )
+    lines.append("\\begin{equation}")
+    lines.append(f"\\overline{{\\epsilon}}_{{\\mathrm{{pair}}}} = {format_sci(obs_val)}.")
+    lines.append("\\end{equation}")
+    lines.append("\\begin{center}")
+    lines.append("\\begin{tabular}{l c c c}")
+    lines.append("\\hline")
+    lines.append("Null & median & $[16\\%,84\\%]$ & $p_\\mathrm{emp}$ \\\\")
+    lines.append("\\hline")
+    for label, st in rows:
+        lines.append(null_row(label, st))
+    lines.append("\\hline")
+    lines.append("\\end{tabular}")
+    lines.append("\\end{center}")
+    lines.append(f"% N={N} trials per ensemble, seed={seed}.")
+    write_tex_block(out_path, lines)
+
+
+# ----------------------------
+# Main
+# ----------------------------
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Anchor-free all-pairs ratio score and null test.")
+    ap.add_argument("--table", choices=["sm", "pdg"], default="sm",
+                    help="sm: e, mu, tau, W, Z, top; pdg: every massive entry of mass_width_latest.json")
+    ap.add_argument("--N", type=int, default=2000, help="number of null trials per ensemble")
+    ap.add_argument("--seed", type=int, default=1, help="RNG seed")
+    ap.add_argument("--sigma", type=float, nargs="*", default=[0.15, 0.30, 0.50],
+                    help="sigma values for the jittered null (ln-space)")
+    ap.add_argument("--workers", type=int, default=1, help="worker processes for null blocks")
+    ap.add_argument("--top", type=int, default=10, help="print this many best-fitting pairs")
+    ap.add_argument("--out-tex", type=str, default=None, help="optional LaTeX output path")
+    args = ap.parse_args()
+
+    q_list = build_feasible_q_set()
+    nq = NearestQ(q_list)
+    labels, logs = load_spectrum(args.table)
+    obs_val = pairwise_mean_eps(nq, logs)
+
+    print(f"=== Anchor-free pairwise score ({args.table}: P={len(labels)}, pairs={pair_count(len(labels))}) ===")
+    print(f"mean_pair_eps_obs = {obs_val:.6e}")
+    details = sorted(pairwise_details(nq, labels, logs), key=lambda d: d.eps)
+    for d in details[: args.top]:
+        print(f"  {d.i:>16s} -> {d.j:<16s} eps={d.eps:.6e}  q={d.q_best}")
+    print("")
+
+    rows: List[Tuple[str, Dict[str, float]]] = []
+    accA = run_null(q_list, logs, obs_val, "A", None, args.N, args.seed, args.workers)
+    stA = accA.summary()
+    rows.append(("A (log-uniform)", stA))
+    print(f"Null A: {format_summary(stA)}")
+    for sigma in args.sigma:
+        accB = run_null(q_list, logs, obs_val, "B", sigma, args.N, args.seed, args.workers)
+        stB = accB.summary()
+        rows.append((f"B ($\\sigma={sigma:.3f}$)", stB))
+        print(f"Null B sigma={sigma:.3f}: {format_summary(stB)}")
+
+    if args.out_tex:
+        write_tex(args.out_tex, args.table, len(labels), obs_val, rows, N=args.N, seed=args.seed)
+        print(f"Wrote LaTeX block to: {args.out_tex}")
+
+
+if __name__ == "__main__":
+    main()
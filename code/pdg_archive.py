@@ -0,0 +1,405 @@
+# code/pdg_archive.py
+# ============================================================
+# Golden Unification — multi-edition PDG mass/width archive
+# Writes: ../data/pdg/archive/  (species x edition .npy columns + index.json)
+# ============================================================
+#
+# data/pdg keeps one snapshot (mass_width_latest.json, one verbose JSON
+# object per RPP line). The archive holds every ingested edition in one
+# dense species x edition table, stored as npy_columns .npy files so a
+# reader memory-maps it instead of re-parsing JSON per year:
+#
+#   years.npy       int32   (E,)      edition years, ascending
+#   mcid.npy        int32   (S,)      primary MC ID per species, ascending
+#   mass.npy        float64 (S, E)    mass [GeV]; NaN = not in that edition
+#   err_plus.npy    float64 (S, E)
+#   err_minus.npy   float64 (S, E)
+#   width.npy       float64 (S, E)    NaN also when the edition gives no width
+#   index.json      names, charge states and full MC ID tuples per species;
+#                   source, sha256 and entry count per edition
+#
+# Both axes are sorted, so (MC ID, year) -> cell is two bisections, and a
+# species' time series is one contiguous row. Ingesting an edition whose
+# year is already present replaces it; the columns are rewritten (tmp +
+# os.replace, index.json last) since E is part of their shape.
+#
+# rescore fits every (species, edition) cell against its own edition's
+# electron mass in a single merge sweep: the distinct ratios of the whole
+# table are sorted once and walked alongside the sorted q-set, so each
+# edition costs nothing beyond its new values. Results match
+# best_eps_for_mass_ratio cell by cell.
+#
+# Usage examples (run from repo root):
+#   python .\code\pdg_archive.py ingest .\data\pdg\mass_width_latest.json
+#   python .\code\pdg_archive.py ingest C:\pdg\mass_width_2022.txt C:\pdg\mass_width_2024.json
+#   python .\code\pdg_archive.py list
+#   python .\code\pdg_archive.py series 13 15 24
+#   python .\code\pdg_archive.py rescore --moved-only
+#   python .\code\pdg_archive.py rescore --out-csv .\data\derived\pdg_editions_fits.csv
+#
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import csv
+import hashlib
+import json
+import math
+import os
+import re
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from golden_unification.lattice import build_q_set, log_phi
+from npy_columns import NpyAppender, open_npy
+from golden_unification.pdg import PDG_DIR, PdgEntry, load_mass_width_lines, load_mass_width_txt
+
+
+ARCHIVE_DIR = os.path.join(PDG_DIR, "archive")
+COLUMNS = ("mass", "err_plus", "err_minus", "width")
+ANCHOR_MCID = 11
+NAN = float("nan")
+
+
+# ----------------------------
+# Editions
+# ----------------------------
+
+@dataclass
+class Edition:
+    year: int
+    source: str
+    sha256: str
+    entries: List[PdgEntry]
+
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _year_from_lines(lines: Sequence[str]) -> Optional[int]:
+    for ln in lines[:20]:
+        m = re.search(r"FROM (\d{4}) EDITION", ln)
+        if m:
+            return int(m.group(1))
+    return None
+
+
+def read_edition(path: str, year: Optional[int] = None) -> Edition:
+    """
+    One mass_width_YYYY edition from its .json dump or original .txt file.
+    The year comes from (in order) the argument, the JSON metadata, the
+    "FROM YYYY EDITION" header line, or the file name.
+    """
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        lines = [p["raw"] for p in payload["particles"]]
+        year = year or payload.get("metadata", {}).get("year")
+        entries = load_mass_width_lines(lines)
+    else:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            lines = [ln.rstrip("\n") for ln in f]
+        entries = load_mass_width_txt(path)
+    year = year or _year_from_lines(lines)
+    if not year:
+        m = re.search(r"mass_width_(\d{4})", os.path.basename(path))
+        if not m:
+            raise ValueError(f"{path}: cannot tell the edition year (pass --year)")
+        year = int(m.group(1))
+    return Edition(int(year), os.path.basename(path), _sha256(path), entries)
+
+
+# ----------------------------
+# Store
+# ----------------------------
+
+class PdgArchive:
+    """Memory-mapped view of an archive directory (see the header for the layout)."""
+
+    def __init__(self, path: str = ARCHIVE_DIR) -> None:
+        self.path = path
+        with open(os.path.join(path, "index.json"), "r", encoding="utf-8") as f:
+            self.index: Dict[str, Any] = json.load(f)
+        with open_npy(os.path.join(path, "years.npy")) as v:
+            self.years: List[int] = v.data.tolist()
+        with open_npy(os.path.join(path, "mcid.npy")) as v:
+            self.mcids: List[int] = v.data.tolist()
+        self._views = {name: open_npy(os.path.join(path, f"{name}.npy")) for name in COLUMNS}
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.mcids), len(self.years)
+
+    def species_row(self, mcid: int) -> int:
+        i = bisect.bisect_left(self.mcids, mcid)
+        if i == len(self.mcids) or self.mcids[i] != mcid:
+            raise KeyError(f"MC ID {mcid} is not in the archive")
+        return i
+
+    def edition_col(self, year: int) -> int:
+        j = bisect.bisect_left(self.years, year)
+        if j == len(self.years) or self.years[j] != year:
+            raise KeyError(f"edition {year} is not in the archive")
+        return j
+
+    def value(self, column: str, mcid: int, year: int) -> float:
+        return self._views[column].data[self.species_row(mcid), self.edition_col(year)]
+
+    def series(self, column: str, mcid: int) -> List[float]:
+        """One species across all editions (NaN where absent)."""
+        i, e = self.species_row(mcid), len(self.years)
+        return self._views[column].read_flat(i * e, (i + 1) * e)
+
+    def column(self, column: str) -> List[float]:
+        """The whole (S, E) column, row-major, as one flat list."""
+        return self._views[column].read_flat()
+
+    def label(self, i: int) -> str:
+        return f"{self.index['names'][i]}({self.mcids[i]})"
+
+    def close(self) -> None:
+        for v in self._views.values():
+            v.close()
+
+    def __enter__(self) -> "PdgArchive":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def _load_tables(path: str) -> Tuple[Dict[int, Dict[str, Any]], Dict[int, Dict[str, Any]]]:
+    """(species by MC ID with per-year values, editions by year) of an existing archive."""
+    species: Dict[int, Dict[str, Any]] = {}
+    editions: Dict[int, Dict[str, Any]] = {}
+    if not os.path.exists(os.path.join(path, "index.json")):
+        return species, editions
+    with PdgArchive(path) as ar:
+        cols = {name: ar.column(name) for name in COLUMNS}
+        e = len(ar.years)
+        for i, mcid in enumerate(ar.mcids):
+            values: Dict[int, Tuple[float, ...]] = {}
+            for j, year in enumerate(ar.years):
+                cell = tuple(cols[name][i * e + j] for name in COLUMNS)
+                if not math.isnan(cell[0]):
+                    values[year] = cell
+            species[mcid] = {
+                "mcids": ar.index["mcids"][i],
+                "name": ar.index["names"][i],
+                "charges": ar.index["charges"][i],
+                "values": values,
+            }
+        editions = {ed["year"]: ed for ed in ar.index["editions"]}
+    return species, editions
+
+
+def _write_column(path: str, descr: str, values: array, row_shape: Tuple[int, ...]) -> None:
+    tmp = path + ".tmp"
+    col = NpyAppender(tmp, descr, row_shape)
+    n_rows = len(values)
+    for n in row_shape:
+        n_rows //= n
+    col.append(values, n_rows)
+    col.close()
+    os.replace(tmp, path)
+
+
+def ingest(editions: Sequence[Edition], path: str = ARCHIVE_DIR) -> Tuple[int, int]:
+    """Merge editions into the archive at path (created if missing). Returns (S, E)."""
+    species, known = _load_tables(path)
+    for ed in editions:
+        for sp in species.values():
+            sp["values"].pop(ed.year, None)
+        for entry in ed.entries:
+            sp = species.setdefault(entry.mcids[0], {"values": {}})
+            if ed.year >= max(sp["values"], default=0):       # names / charges of the newest edition
+                sp.update(mcids=list(entry.mcids), name=entry.name, charges=entry.charges)
+            width = NAN if entry.width_gev is None else entry.width_gev
+            sp["values"][ed.year] = (entry.mass_gev, entry.err_plus_gev, entry.err_minus_gev, width)
+        known[ed.year] = {"year": ed.year, "source": ed.source, "sha256": ed.sha256, "entries": len(ed.entries)}
+    species = {k: v for k, v in species.items() if v["values"]}
+
+    years = sorted(known)
+    mcids = sorted(species)
+    os.makedirs(path, exist_ok=True)
+    _write_column(os.path.join(path, "years.npy"), "<i4", array("i", years), ())
+    _write_column(os.path.join(path, "mcid.npy"), "<i4", array("i", mcids), ())
+    for k, name in enumerate(COLUMNS):
+        buf = array("d")
+        for mcid in mcids:
+            values = species[mcid]["values"]
+            buf.extend(values[y][k] if y in values else NAN for y in years)
+        _write_column(os.path.join(path, f"{name}.npy"), "<f8", buf, (len(years),))
+    index = {
+        "editions": [known[y] for y in years],
+        "mcids": [species[m]["mcids"] for m in mcids],
+        "names": [species[m]["name"] for m in mcids],
+        "charges": [species[m]["charges"] for m in mcids],
+    }
+    tmp = os.path.join(path, "index.json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1)
+        f.write("\n")
+    os.replace(tmp, os.path.join(path, "index.json"))
+    return len(mcids), len(years)
+
+
+# ----------------------------
+# Re-scoring
+# ----------------------------
+
+def rescore(ar: PdgArchive, q_list: Optional[List[int]] = None) -> Tuple[List[Optional[int]], List[float]]:
+    """
+    Best q and eps = |q/4 - log_phi(m / m_e)| of every (species, edition)
+    cell, flat row-major like the columns (None / NaN where the cell has no
+    positive mass or its edition has no electron).
+    """
+    q_list = q_list if q_list is not None else build_q_set()
+    s, e = ar.shape
+    mass = ar.column("mass")
+    anchor = ar.series("mass", ANCHOR_MCID) if ANCHOR_MCID in ar.mcids else [NAN] * e
+
+    # distinct targets 4 log_phi(m / m_e) of the whole table, scored in one sorted sweep
+    targets: Dict[float, Optional[Tuple[int, float]]] = {}
+    cell_x: List[Optional[float]] = []
+    for k, m in enumerate(mass):
+        m_e = anchor[k % e]
+        if m > 0.0 and math.isfinite(m) and m_e > 0.0:
+            x = log_phi(m / m_e)
+            cell_x.append(x)
+            targets[x] = None
+        else:
+            cell_x.append(None)
+    lo, n_q = 0, len(q_list)
+    for x in sorted(targets):
+        target = 4.0 * x
+        while lo < n_q - 1 and q_list[lo] < target:
+            lo += 1
+        best = q_list[lo]
+        if lo > 0 and abs(q_list[lo - 1] / 4.0 - x) < abs(best / 4.0 - x):
+            best = q_list[lo - 1]
+        targets[x] = (best, abs(best / 4.0 - x))
+
+    q_best: List[Optional[int]] = []
+    eps: List[float] = []
+    for x in cell_x:
+        if x is None:
+            q_best.append(None)
+            eps.append(NAN)
+        else:
+            qb, ep = targets[x]
+            q_best.append(qb)
+            eps.append(ep)
+    return q_best, eps
+
+
+# ----------------------------
+# Main
+# ----------------------------
+
+def _fmt(v: Optional[float], spec: str) -> str:
+    return "-" if v is None or (isinstance(v, float) and math.isnan(v)) else format(v, spec)
+
+
+def cmd_ingest(args: argparse.Namespace) -> None:
+    if args.year and len(args.paths) != 1:
+        raise SystemExit("--year applies to a single input file")
+    editions = [read_edition(p, args.year) for p in args.paths]
+    for ed in editions:
+        print(f"read {ed.source}: edition {ed.year}, {len(ed.entries)} entries with a mass")
+    s, e = ingest(editions, args.archive)
+    print(f"archive {args.archive}: {s} species x {e} editions")
+
+
+def cmd_list(args: argparse.Namespace) -> None:
+    with PdgArchive(args.archive) as ar:
+        s, e = ar.shape
+        print(f"archive {args.archive}: {s} species x {e} editions")
+        for ed in ar.index["editions"]:
+            print(f"  {ed['year']}  {ed['entries']:4d} entries  {ed['source']}  sha256 {ed['sha256'][:12]}")
+
+
+def cmd_series(args: argparse.Namespace) -> None:
+    with PdgArchive(args.archive) as ar:
+        for mcid in args.mcids:
+            i = ar.species_row(mcid)
+            print(f"{ar.label(i)}:")
+            cols = {name: ar.series(name, mcid) for name in COLUMNS}
+            for j, year in enumerate(ar.years):
+                if math.isnan(cols["mass"][j]):
+                    print(f"  {year}  (not in this edition)")
+                    continue
+                print(f"  {year}  m={_fmt(cols['mass'][j], '.10g')}  +{_fmt(cols['err_plus'][j], '.3g')}"
+                      f" -{_fmt(abs(cols['err_minus'][j]), '.3g')}  width={_fmt(cols['width'][j], '.6g')}")
+
+
+def cmd_rescore(args: argparse.Namespace) -> None:
+    with PdgArchive(args.archive) as ar:
+        s, e = ar.shape
+        q_best, eps = rescore(ar)
+        rows = range(s) if not args.mcids else [ar.species_row(m) for m in args.mcids]
+        years = " ".join(f"{y:>16d}" for y in ar.years)
+        print(f"=== best q / eps per edition ({s} species x {e} editions, anchor MC ID {ANCHOR_MCID}) ===")
+        print(f"{'species':>24s} {years}")
+        out: List[List[Any]] = []
+        n_moved = 0
+        for i in rows:
+            cells = [(q_best[i * e + j], eps[i * e + j]) for j in range(e)]
+            qs = {qb for qb, _ in cells if qb is not None}
+            moved = len(qs) > 1
+            n_moved += moved
+            for j, (qb, ep) in enumerate(cells):
+                if qb is not None:
+                    out.append([ar.mcids[i], ar.index["names"][i], ar.years[j], qb, ep])
+            if args.moved_only and not moved:
+                continue
+            line = " ".join(f"{_fmt(qb, 'd'):>5s} {_fmt(ep, '.3e'):>10s}" for qb, ep in cells)
+            print(f"{ar.label(i):>24s} {line}{'  *' if moved else ''}")
+        print(f"species whose best q changed between editions: {n_moved}")
+
+    if args.out_csv:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out_csv)), exist_ok=True)
+        with open(args.out_csv, "w", encoding="utf-8", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["mcid", "pdg_name", "year", "q_best", "eps"])
+            w.writerows(out)
+        print(f"Wrote: {args.out_csv}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Multi-edition PDG mass/width archive.")
+    ap.add_argument("--archive", type=str, default=ARCHIVE_DIR, help="archive directory")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("ingest", help="add or replace editions from mass_width_YYYY .json / .txt files")
+    p.add_argument("paths", nargs="+")
+    p.add_argument("--year", type=int, default=None, help="edition year (single file; default: detected)")
+    p.set_defaults(func=cmd_ingest)
+
+    p = sub.add_parser("list", help="editions in the archive")
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser("series", help="mass / errors / width of species across editions")
+    p.add_argument("mcids", type=int, nargs="+")
+    p.set_defaults(func=cmd_series)
+
+    p = sub.add_parser("rescore", help="best q and eps of every species in every edition")
+    p.add_argument("mcids", type=int, nargs="*", help="MC IDs to show (default: all)")
+    p.add_argument("--moved-only", action="store_true", help="print only species whose best q changed")
+    p.add_argument("--out-csv", type=str, default=None, help="optional long-format CSV (mcid, year, q_best, eps)")
+    p.set_defaults(func=cmd_rescore)
+
+    args = ap.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+# code/refit_pdg.py
+# ============================================================
+# Golden Unification — diff-aware refit after a PDG snapshot update
+# Patches: ../data/derived/paperIII_bestfits.csv
+#          ../data/derived/paperIII_multiplicity.csv
+# ============================================================
+#
+# update_pdg_and_pull.ps1 keeps the outgoing SM table as
+# data/pdg/sm_masses_previous.csv before pulling the new one. This script
+# compares the two snapshots by MC ID and refits only the species whose
+# mass or mass errors changed (plus species that are new or missing from
+# the derived tables). Unchanged rows of the derived CSVs are left as-is.
+#
+# Fit model (same as compute_mass_errors_v2.py, anchored on the electron):
+#   m_pred = m_e * PHI^((q - q_e)/4),  epsilon = (m_pred - m_exp)/m_exp
+# best q minimizes |epsilon| over the reachable q-set of the v2 scan box;
+# multiplicity = number of distinct q with |epsilon| <= TAU_FRAC, obtained
+# by two binary searches instead of a scan.
+#
+# If the electron (anchor) changes, every row is refit. Rows whose MC ID is
+# not the particle their key names (golden_unification.pdg.SM_KEY_MCID; the hadron-matched
+# quark rows) are skipped. Numbers are written in the tables' short fixed
+# form (0.000511).
+#
+# Usage examples (run from repo root):
+#   python .\code\refit_pdg.py
+#   python .\code\refit_pdg.py --dry-run
+#   python .\code\refit_pdg.py --full --rebuild
+#
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import csv
+import math
+import os
+import shutil
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import build_artifacts
+from compute_mass_errors_v2 import (
+    A_MAX, A_MIN, ANCHOR_ABC, B_MAX, B_MIN, C_MAX, C_MIN, PHI, TAU_FRAC, frac_err, q,
+)
+from golden_unification.lattice import ScanBox, build_q_set
+from golden_unification.pdg import sm_row_matches
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.normpath(os.path.join(HERE, ".."))
+PDG_DIR = os.path.join(ROOT, "data", "pdg")
+DERIVED_DIR = os.path.join(ROOT, "data", "derived")
+
+ANCHOR_KEY = "electron"
+
+
+# ----------------------------
+# Snapshots
+# ----------------------------
+
+@dataclass(frozen=True)
+class SnapshotRow:
+    key: str
+    mcid: int
+    mass_gev: float
+    err_plus_gev: float
+    err_minus_gev: float
+
+
+def _float_or_nan(s: str) -> float:
+    return float(s) if s.strip() else math.nan
+
+
+def read_snapshot(path: str) -> Dict[int, SnapshotRow]:
+    """SM table rows with a usable mass, keyed by MC ID. Missing file -> {}."""
+    if not os.path.exists(path):
+        return {}
+    rows: Dict[int, SnapshotRow] = {}
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for r in csv.DictReader(f):
+            if not r["mass_gev"].strip():
+                continue
+            row = SnapshotRow(
+                key=r["key"],
+                mcid=int(r["mcid_1"]),
+                mass_gev=float(r["mass_gev"]),
+                err_plus_gev=_float_or_nan(r["mass_err_plus_gev"]),
+                err_minus_gev=_float_or_nan(r["mass_err_minus_gev"]),
+            )
+            rows[row.mcid] = row
+    return rows
+
+
+def checked(rows: Dict[int, SnapshotRow]) -> Tuple[Dict[int, SnapshotRow], List[str]]:
+    """(rows whose MC ID is the particle their key names, keys refused); see golden_unification.pdg.SM_KEY_MCID."""
+    ok = {m: r for m, r in rows.items() if sm_row_matches(r.key, str(m))}
+    return ok, sorted(r.key for m, r in rows.items() if m not in ok)
+
+
+def _same(a: SnapshotRow, b: SnapshotRow) -> bool:
+    def eq(x: float, y: float) -> bool:
+        return x == y or (math.isnan(x) and math.isnan(y))
+    return (a.key == b.key and a.mass_gev == b.mass_gev
+            and eq(a.err_plus_gev, b.err_plus_gev) and eq(a.err_minus_gev, b.err_minus_gev))
+
+
+@dataclass
+class SnapshotDiff:
+    changed: List[str]   # species keys whose mass/errors moved (or were renamed)
+    added: List[str]
+    removed: List[str]
+
+    @property
+    def touched(self) -> List[str]:
+        return sorted(set(self.changed) | set(self.added) | set(self.removed))
+
+
+def diff_snapshots(old: Dict[int, SnapshotRow], new: Dict[int, SnapshotRow]) -> SnapshotDiff:
+    changed = [new[m].key for m in new if m in old and not _same(old[m], new[m])]
+    added = [new[m].key for m in new if m not in old]
+    removed = [old[m].key for m in old if m not in new]
+    return SnapshotDiff(sorted(changed), sorted(added), sorted(removed))
+
+
+# ----------------------------
+# Fits (q-set + binary search)
+# ----------------------------
+
+def build_q_list() -> List[int]:
+    """Sorted distinct q reachable in the compute_mass_errors_v2 scan box."""
+    return build_q_set(ScanBox(A_MIN, A_MAX, B_MIN, B_MAX, C_MIN, C_MAX))
+
+
+@dataclass(frozen=True)
+class RowFit:
+    q_best: int
+    m_pred_gev: float
+    epsilon: float
+    multiplicity: int
+
+
+def fit_mass(q_list: List[int], m_exp_gev: float, m_e_gev: float, q_e: int, tau: float) -> RowFit:
+    def pred(qq: int) -> float:
+        return m_e_gev * (PHI ** ((qq - q_e) / 4.0))
+
+    ratio = m_exp_gev / m_e_gev
+    target = q_e + 4.0 * math.log(ratio) / math.log(PHI)
+    i = bisect.bisect_left(q_list, target)
+    cands = [q_list[j] for j in (i - 1, i) if 0 <= j < len(q_list)]
+    q_best = min(cands, key=lambda qq: abs(frac_err(pred(qq), m_exp_gev)))
+    mp = pred(q_best)
+
+    # |frac_err| <= tau  <=>  (1-tau) m_exp <= m_pred <= (1+tau) m_exp
+    lo = q_e + 4.0 * math.log((1.0 - tau) * ratio) / math.log(PHI)
+    hi = q_e + 4.0 * math.log((1.0 + tau) * ratio) / math.log(PHI)
+    mult = bisect.bisect_right(q_list, hi) - bisect.bisect_left(q_list, lo)
+    return RowFit(q_best, mp, frac_err(mp, m_exp_gev), mult)
+
+
+# ----------------------------
+# Derived tables
+# ----------------------------
+
+def fixed(x: float) -> str:
+    """Short fixed-point form of the derived CSVs (0.000511, 80.369, 0.0)."""
+    s = f"{x:.6f}".rstrip("0")
+    return s + "0" if s.endswith(".") else s
+
+
+def read_table(path: str) -> Tuple[List[str], List[Dict[str, str]]]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        return list(reader.fieldnames or []), list(reader)
+
+
+def write_table(path: str, header: List[str], rows: List[Dict[str, str]]) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=header, lineterminator="\n")
+        w.writeheader()
+        w.writerows(rows)
+    os.replace(tmp, path)
+
+
+def patch_rows(
+    rows: List[Dict[str, str]],
+    updates: Dict[str, Dict[str, str]],
+    removed: List[str],
+) -> List[Dict[str, str]]:
+    """Replace rows in place (keeping order), append new species, drop removed ones."""
+    out: List[Dict[str, str]] = []
+    seen = set()
+    for r in rows:
+        name = r["particle"]
+        if name in removed:
+            continue
+        out.append(updates.get(name, r))
+        seen.add(name)
+    for name, r in updates.items():
+        if name not in seen:
+            out.append(r)
+    return out
+
+
+def refit(
+    old_path: str,
+    new_path: str,
+    bestfits_path: str,
+    mult_path: str,
+    tau: float,
+    full: bool,
+    dry_run: bool,
+) -> Tuple[SnapshotDiff, List[str]]:
+    """Refit what changed between snapshots; returns (diff, refit species keys)."""
+    old, _ = checked(read_snapshot(old_path))
+    new, refused = checked(read_snapshot(new_path))
+    for key in refused:
+        print(f"  skip {key}: its MC ID is not the particle the key names")
+    diff = diff_snapshots(old, new)
+    by_key = {r.key: r for r in new.values()}
+    if ANCHOR_KEY not in by_key:
+        raise SystemExit(f"Anchor '{ANCHOR_KEY}' missing from {new_path}")
+
+    bf_header, bf_rows = read_table(bestfits_path)
+    mu_header, mu_rows = read_table(mult_path)
+    present = {r["particle"] for r in bf_rows} & {r["particle"] for r in mu_rows}
+
+    if full or ANCHOR_KEY in diff.changed:
+        todo = sorted(by_key)
+    else:
+        todo = sorted((set(diff.changed) | set(diff.added) | (set(by_key) - present)) & set(by_key))
+
+    q_list = build_q_list()
+    q_e = q(*ANCHOR_ABC)
+    m_e = by_key[ANCHOR_KEY].mass_gev
+    bf_up: Dict[str, Dict[str, str]] = {}
+    mu_up: Dict[str, Dict[str, str]] = {}
+    for key in todo:
+        m = by_key[key].mass_gev
+        fit = fit_mass(q_list, m, m_e, q_e, tau)
+        bf_up[key] = {"particle": key, "mass_exp": fixed(m), "mass_pred": fixed(fit.m_pred_gev),
+                      "q": str(fit.q_best), "epsilon": fixed(fit.epsilon)}
+        mu_up[key] = {"particle": key, "multiplicity": str(fit.multiplicity)}
+        print(f"  {key:>10s}  q_best={fit.q_best:6d}  eps={fit.epsilon:+.3e}  mult={fit.multiplicity}")
+
+    if not dry_run:
+        write_table(bestfits_path, bf_header, patch_rows(bf_rows, bf_up, diff.removed))
+        write_table(mult_path, mu_header, patch_rows(mu_rows, mu_up, diff.removed))
+    return diff, todo
+
+
+# ----------------------------
+# Main
+# ----------------------------
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Diff-aware refit of derived tables after a PDG update.")
+    ap.add_argument("--old", type=str, default=os.path.join(PDG_DIR, "sm_masses_previous.csv"),
+                    help="previous SM snapshot (CSV)")
+    ap.add_argument("--new", type=str, default=os.path.join(PDG_DIR, "sm_masses_latest.csv"),
+                    help="new SM snapshot (CSV)")
+    ap.add_argument("--bestfits", type=str, default=os.path.join(DERIVED_DIR, "paperIII_bestfits.csv"))
+    ap.add_argument("--multiplicity", type=str, default=os.path.join(DERIVED_DIR, "paperIII_multiplicity.csv"))
+    ap.add_argument("--tau", type=float, default=TAU_FRAC, help="fractional tolerance for multiplicity")
+    ap.add_argument("--full", action="store_true", help="refit every species, not only changed ones")
+    ap.add_argument("--dry-run", action="store_true", help="report only; do not patch or rebuild")
+    ap.add_argument("--rebuild", action="store_true",
+                    help="bring shared/*.tex artifacts up to date via build_artifacts.py (cached)")
+    ap.add_argument("--accept", action="store_true",
+                    help="after patching, copy --new over --old so the next diff starts here")
+    args = ap.parse_args()
+
+    print(f"Diffing {args.old}")
+    print(f"     vs {args.new}")
+    diff, todo = refit(args.old, args.new, args.bestfits, args.multiplicity,
+                       tau=args.tau, full=args.full, dry_run=args.dry_run)
+    print(f"changed={diff.changed} added={diff.added} removed={diff.removed}")
+    print(f"refit {len(todo)} species" + (" (dry run)" if args.dry_run else ""))
+
+    if args.dry_run:
+        return
+    if args.rebuild:
+        # No generator reads the SM table, so these are cache hits unless code changed too.
+        names = list(build_artifacts.GENERATORS)
+        for r in build_artifacts.build(names, build_artifacts.default_cache_dir(),
+                                       build_artifacts.SHARED, jobs=len(names), force=False):
+            print(f"  {'cached' if r.hit else 'rebuilt'} {r.name} -> {r.out_path}")
+    if args.accept:
+        shutil.copyfile(args.new, args.old)
+        print(f"Accepted snapshot: {args.old}")
+
+
+if __name__ == "__main__":
+    main()
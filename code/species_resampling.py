@@ -0,0 +1,295 @@
+# code/species_resampling.py
+# ============================================================
+# Golden Unification — jackknife / bootstrap over the species set
+# Writes (optional): ../shared/paperIX_species_resampling.tex
+# ============================================================
+#
+# The headline anchored mean eps (null_tests_fast_v2.py) is computed on one
+# hand-picked set of six species. This script asks how much it, and its null
+# p-value, depend on that choice, using every species of
+# data/pdg/sm_masses_latest.csv whose row is the particle its key names
+# (Higgs included; the quark rows are hadron matches and are refused, see
+# golden_unification.pdg.SM_KEY_MCID):
+#
+#   leave-one-out   drop each non-anchor species in turn
+#   leave-k-out     every k-subset dropped (or a random sample, --max-subsets)
+#   bootstrap       resample the non-anchor species with replacement
+#
+# The electron stays the anchor (eps = 0) and counts as a species in the mean,
+# as in anchored_fit_score.
+#
+# Everything is computed once per species and then reused:
+#   - the observed eps of each species (one nearest-q lookup each);
+#   - N shared null draws per species, each species on its own RNG stream,
+#     stored as an eps column. Null A draws log-uniformly over the range of
+#     the FULL species set (so columns are shared by every subset); Null B
+#     jitters each species in ln-space.
+# A subset's observed statistic and null distribution are then weighted sums
+# of cached columns (C-level map over arrays), so thousands of subsets cost
+# little more than a single run.
+#
+# Usage examples (run from repo root):
+#   python .\code\species_resampling.py
+#   python .\code\species_resampling.py --k 2 3 --bootstrap 2000 --N 5000
+#   python .\code\species_resampling.py --null B --sigma 0.30 --exclude higgs
+#   python .\code\species_resampling.py --out-tex shared\paperIX_species_resampling.tex
+#
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import math
+import operator
+import random
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from golden_unification.blocks import format_sci, keyed_rng, tex_banner, write_tex_block
+from golden_unification.ensembles import TrialAccumulator
+from golden_unification.lattice import ANCHOR, PHI, log_phi
+from golden_unification.lattice import build_q_set as build_feasible_q_set
+from golden_unification.pdg import load_checked_sm_masses
+from golden_unification.scoring import NearestQ
+
+
+# ----------------------------
+# Per-species cache
+# ----------------------------
+
+@dataclass
+class SpeciesCache:
+    keys: List[str]               # non-anchor species, in table order
+    obs_eps: List[float]          # observed eps per species
+    null_eps: List[array]         # per species: eps of each of the n shared null draws
+    n: int
+
+
+def species_logs(rows: Dict[str, Dict[str, str]], keys: Sequence[str]) -> List[float]:
+    """log_phi(m / m_e) for each key."""
+    me = float(rows[ANCHOR]["mass_gev"])
+    return [log_phi(float(rows[k]["mass_gev"]) / me) for k in keys]
+
+
+def build_cache(
+    nq: NearestQ,
+    keys: List[str],
+    logs: List[float],
+    ensemble: str,
+    sigma: Optional[float],
+    n: int,
+    seed: int,
+) -> SpeciesCache:
+    obs = [nq.nearest(4.0 * x)[0] for x in logs]
+    lo, hi = min(logs), max(logs)
+    s_phi = 0.0 if sigma is None else sigma / math.log(PHI)
+    cols: List[array] = []
+    for k, x in zip(keys, logs):
+        rng = keyed_rng(seed, "species", ensemble, sigma, k)
+        if ensemble == "A":
+            draws = (lo + (hi - lo) * rng.random() for _ in range(n))
+        else:
+            draws = (x + s_phi * rng.gauss(0.0, 1.0) for _ in range(n))
+        cols.append(array("d", (nq.nearest(4.0 * y)[0] for y in draws)))
+    return SpeciesCache(keys, obs, cols, n)
+
+
+# ----------------------------
+# Subset evaluation
+# ----------------------------
+
+@dataclass
+class SubsetScore:
+    weights: Dict[int, int]       # species index -> multiplicity
+    obs_mean: float
+    p_emp: float
+
+
+def score_subset(cache: SpeciesCache, weights: Dict[int, int]) -> SubsetScore:
+    """
+    Observed anchored mean eps of a weighted species multiset and its null
+    p-value Pr(null <= obs), from the cached columns. Sums are compared rather
+    than means, and accumulated in the same order for observed and null values.
+    """
+    n_species = sum(weights.values()) + 1                      # + anchor
+    obs_sum = 0.0
+    tot: Optional[List[float]] = None
+    for j in sorted(weights):
+        w = weights[j]
+        obs_sum += w * cache.obs_eps[j]
+        col: Sequence[float] = cache.null_eps[j]
+        if w != 1:
+            col = [w * v for v in col]
+        tot = list(col) if tot is None else list(map(operator.add, tot, col))
+    if tot is None:
+        raise ValueError("score_subset(): empty species set")
+    n_le = sum(map(obs_sum.__ge__, tot))
+    return SubsetScore(dict(weights), obs_sum / n_species, n_le / cache.n)
+
+
+def leave_k_out(cache: SpeciesCache, k: int, max_subsets: int, rng: random.Random) -> List[SubsetScore]:
+    """Every subset with k species removed, or max_subsets of them drawn at random."""
+    p = len(cache.keys)
+    if k >= p:
+        raise ValueError(f"cannot leave {k} of {p} species out")
+    if math.comb(p, k) <= max_subsets:
+        drops = list(itertools.combinations(range(p), k))
+    else:
+        seen = set()
+        while len(seen) < max_subsets:
+            seen.add(tuple(sorted(rng.sample(range(p), k))))
+        drops = sorted(seen)
+    return [score_subset(cache, {j: 1 for j in range(p) if j not in d}) for d in map(set, drops)]
+
+
+def bootstrap(cache: SpeciesCache, n_boot: int, rng: random.Random) -> List[SubsetScore]:
+    p = len(cache.keys)
+    out: List[SubsetScore] = []
+    for _ in range(n_boot):
+        w: Dict[int, int] = {}
+        for _ in range(p):
+            j = rng.randrange(p)
+            w[j] = w.get(j, 0) + 1
+        out.append(score_subset(cache, w))
+    return out
+
+
+def spread(vals: Sequence[float], ref: float) -> Dict[str, float]:
+    """Accumulator summary of one quantity across subsets (p_emp: share of subsets <= ref)."""
+    acc = TrialAccumulator(ref)
+    for v in vals:
+        acc.add(v)
+    return acc.summary()
+
+
+# ----------------------------
+# Reporting
+# ----------------------------
+
+def dropped_label(cache: SpeciesCache, sc: SubsetScore) -> str:
+    return ", ".join(cache.keys[j] for j in range(len(cache.keys)) if j not in sc.weights)
+
+
+def write_tex(
+    out_path: str,
+    cache: SpeciesCache,
+    null_label: str,
+    full: SubsetScore,
+    loo: List[SubsetScore],
+    summaries: List[Tuple[str, int, Dict[str, float], Dict[str, float]]],
+    seed: int,
+) -> None:
+    lines = tex_banner("Species-set jackknife / bootstrap", "species_resampling.py")
+    lines.append("\\paragraph{Dependence on the species set.}")
+    lines.append(
+        f"On {len(cache.keys) + 1} species of the SM table (electron anchor) the anchored score is "
+        f"$\\overline{{\\epsilon}}={format_sci(full.obs_mean)}$ with $p_\\mathrm{{emp}}={full.p_emp:.6g}$ "
+        f"under Null {null_label}. Dropping one species at a time:"
+    )
+    lines.append("\\begin{center}")
+    lines.append("\\begin{tabular}{l c c}")
+    lines.append("\\hline")
+    lines.append("Dropped & $\\overline{\\epsilon}$ & $p_\\mathrm{emp}$ \\\\")
+    lines.append("\\hline")
+    for sc in loo:
+        dropped = dropped_label(cache, sc).replace("_", "\\_")
+        lines.append(f"{dropped} & ${format_sci(sc.obs_mean)}$ & ${sc.p_emp:.6g}$ \\\\")
+    lines.append("\\hline")
+    lines.append("\\end{tabular}")
+    lines.append("\\end{center}")
+    if summaries:
+        lines.append("\\begin{center}")
+        lines.append("\\begin{tabular}{l c c c}")
+        lines.append("\\hline")
+        lines.append("Resampling & subsets & $\\overline{\\epsilon}$ median $[16\\%,84\\%]$ & "
+                     "$p_\\mathrm{emp}$ median $[16\\%,84\\%]$ \\\\")
+        lines.append("\\hline")
+        for label, n_sub, s_obs, s_p in summaries:
+            lines.append(
+                f"{label} & {n_sub} & ${format_sci(s_obs['med'])}$ "
+                f"$[{format_sci(s_obs['p16'])},\\,{format_sci(s_obs['p84'])}]$ & "
+                f"${s_p['med']:.4g}$ $[{s_p['p16']:.4g},\\,{s_p['p84']:.4g}]$ \\\\"
+            )
+        lines.append("\\hline")
+        lines.append("\\end{tabular}")
+        lines.append("\\end{center}")
+    lines.append(f"% N={cache.n} shared null draws per species, seed={seed}.")
+    write_tex_block(out_path, lines)
+
+
+# ----------------------------
+# Main
+# ----------------------------
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Jackknife / bootstrap of the anchored score over the species set.")
+    ap.add_argument("--species", type=str, nargs="*", default=None,
+                    help="species keys from sm_masses_latest.csv (default: all whose MC ID checks out)")
+    ap.add_argument("--exclude", type=str, nargs="*", default=[], help="species keys to leave out")
+    ap.add_argument("--null", choices=["A", "B"], default="A", help="null ensemble")
+    ap.add_argument("--sigma", type=float, default=0.30, help="ln-space jitter for --null B")
+    ap.add_argument("--N", type=int, default=2000, help="shared null draws per species")
+    ap.add_argument("--seed", type=int, default=1, help="RNG seed")
+    ap.add_argument("--k", type=int, nargs="*", default=[2], help="leave-k-out sizes (besides k=1)")
+    ap.add_argument("--max-subsets", type=int, default=5000, help="sample subsets beyond this many")
+    ap.add_argument("--bootstrap", type=int, default=1000, help="bootstrap replicates (0: none)")
+    ap.add_argument("--out-tex", type=str, default=None, help="optional LaTeX output path")
+    args = ap.parse_args()
+
+    rows, refused = load_checked_sm_masses()
+    keys = [k for k in (args.species or list(rows)) if k != ANCHOR and k not in args.exclude]
+    bad = [k for k in keys if k in refused]
+    if bad:
+        raise SystemExit(f"Refusing {', '.join(bad)}: the SM table row is not the particle the key names")
+    missing = [k for k in keys if k not in rows]
+    if missing:
+        raise SystemExit(f"Unknown species: {', '.join(missing)}")
+    if len(keys) < 2:
+        ap.error(f"need at least two non-anchor species to leave one out (got {len(keys)})")
+    if refused and not args.species:
+        print(f"(skipping {', '.join(refused)}: SM table rows are not the particle the key names)")
+    too_big = sorted({k for k in args.k if k >= len(keys)})
+    if too_big:
+        print(f"(skipping leave-k-out for k = {', '.join(map(str, too_big))}: only {len(keys)} species)")
+
+    nq = NearestQ(build_feasible_q_set())
+    sigma = args.sigma if args.null == "B" else None
+    cache = build_cache(nq, keys, species_logs(rows, keys), args.null, sigma, args.N, args.seed)
+    null_label = "A" if sigma is None else f"B ($\\sigma={sigma:.3f}$)"
+    rng = keyed_rng(args.seed, "species", "resample")
+
+    full = score_subset(cache, {j: 1 for j in range(len(keys))})
+    print(f"=== {len(keys) + 1} species (anchor {ANCHOR}), Null {args.null}, N={args.N} ===")
+    print(f"full set: mean_eps={full.obs_mean:.6e} p_emp={full.p_emp:.6g}")
+    for k, e in zip(keys, cache.obs_eps):
+        print(f"  {k:>10s}  eps={e:.6e}")
+    print("")
+
+    loo = leave_k_out(cache, 1, args.max_subsets, rng)
+    print("leave-one-out:")
+    for sc in loo:
+        print(f"  -{dropped_label(cache, sc):<10s} mean_eps={sc.obs_mean:.6e} p_emp={sc.p_emp:.6g}")
+    print("")
+
+    summaries: List[Tuple[str, int, Dict[str, float], Dict[str, float]]] = []
+    groups: List[Tuple[str, List[SubsetScore]]] = [("leave-1-out", loo)]
+    groups += [(f"leave-{k}-out", leave_k_out(cache, k, args.max_subsets, rng)) for k in args.k if 1 < k < len(keys)]
+    if args.bootstrap > 0:
+        groups.append(("bootstrap", bootstrap(cache, args.bootstrap, rng)))
+    for label, scores in groups:
+        s_obs = spread([sc.obs_mean for sc in scores], full.obs_mean)
+        s_p = spread([sc.p_emp for sc in scores], full.p_emp)
+        summaries.append((label, len(scores), s_obs, s_p))
+        print(f"{label:>12s} ({len(scores)} subsets): mean_eps med={s_obs['med']:.6e} "
+              f"[{s_obs['p16']:.6e}, {s_obs['p84']:.6e}]  p_emp med={s_p['med']:.4g} "
+              f"[{s_p['p16']:.4g}, {s_p['p84']:.4g}] range [{s_p['min']:.4g}, {s_p['max']:.4g}]")
+
+    if args.out_tex:
+        write_tex(args.out_tex, cache, null_label, full, loo, summaries, seed=args.seed)
+        print(f"Wrote LaTeX block to: {args.out_tex}")
+
+
+if __name__ == "__main__":
+    main()
@@ -40,6 +40,11 @@ finally {
   Pop-Location
 }
 
+# Keep the outgoing SM table so refit_pdg.py can diff old vs new by MC ID
+$smLatest   = Join-Path $guRoot "data\pdg\sm_masses_latest.csv"
+$smPrevious = Join-Path $guRoot "data\pdg\sm_masses_previous.csv"
+if (Test-Path $smLatest) { Copy-Item -Force -Path $smLatest -Destination $smPrevious }
+
 # Pull artifacts from GPP -> GU
 $pull = Join-Path $guRoot "code\pull_from_gpp.ps1"
 if (-not (Test-Path $pull)) { throw "Missing: $pull" }
@@ -47,4 +52,17 @@ if (-not (Test-Path $pull)) { throw "Missing: $pull" }
 Write-Host "`n[RUN] pull_from_gpp.ps1" -ForegroundColor Yellow
 powershell -ExecutionPolicy Bypass -File $pull -GppRoot $GppRoot
 
-Write-Host "`nOK: PDG updated in GPP, SM extracted, and artifacts copied into GU." -ForegroundColor Green
+# Archive the new edition (replaces its year if already ingested) so older editions survive the next pull
+$archive = Join-Path $guRoot "code\pdg_archive.py"
+$mwLatest = Join-Path $guRoot "data\pdg\mass_width_latest.json"
+Write-Host "`n[RUN] python code\pdg_archive.py ingest data\pdg\mass_width_latest.json" -ForegroundColor Yellow
+python $archive ingest $mwLatest
+if ($LASTEXITCODE -ne 0) { throw "pdg_archive.py failed with exit code $LASTEXITCODE" }
+
+# Refit only the species whose mass/errors changed; rebuild dependent null artifacts
+$refit = Join-Path $guRoot "code\refit_pdg.py"
+Write-Host "`n[RUN] python code\refit_pdg.py --rebuild --accept" -ForegroundColor Yellow
+python $refit --rebuild --accept
+if ($LASTEXITCODE -ne 0) { throw "refit_pdg.py failed with exit code $LASTEXITCODE" }
+
+Write-Host "`nOK: PDG updated in GPP, SM extracted, artifacts copied into GU, derived tables refit." -ForegroundColor Green
@@ -1,38 +1,10 @@
 import argparse
 import math
 
-def J_invariant(s12, s23, s13, delta_deg):
-    """J = c12 c23 c13^2 s12 s23 s13 sin(delta)"""
-    c12 = math.sqrt(max(0.0, 1.0 - s12*s12))
-    c23 = math.sqrt(max(0.0, 1.0 - s23*s23))
-    c13 = math.sqrt(max(0.0, 1.0 - s13*s13))
-    delta = math.radians(delta_deg)
-    return c12*c23*(c13**2)*s12*s23*s13*math.sin(delta)
-
-def scan_delta_match_sin(target_sin, s12, s23, s13, step_deg=0.1):
-    """Find delta that minimizes |sin(delta)-target_sin| over [0,360]."""
-    best = None
-    d = 0.0
-    while d <= 360.0 + 1e-12:
-        score = abs(math.sin(math.radians(d)) - target_sin)
-        if best is None or score < best["score"]:
-            best = {"delta_deg": d, "score": score, "J": J_invariant(s12, s23, s13, d)}
-        d += step_deg
-    return best
-
-def scan_delta_match_deg(target_deg, s12, s23, s13, step_deg=0.1):
-    """Find delta that minimizes |delta-target_deg| over [0,360]."""
-    best = None
-    d = 0.0
-    while d <= 360.0 + 1e-12:
-        score = abs(d - target_deg)
-        if best is None or score < best["score"]:
-            best = {"delta_deg": d, "score": score, "J": J_invariant(s12, s23, s13, d)}
-        d += step_deg
-    return best
-
-def latex_block(ckm, pmns, meta):
-    return rf"""% ============================================================
+from golden_unification.mixing import scan_delta_match_deg, scan_delta_match_sin
+
+def latex_block(ckm, pmns, meta, null=None):
+    tex = rf"""% ============================================================
 % AUTO-GENERATED: Mixing verification block (CKM + PMNS)
 % Generated by: code/verify_mixing.py
 % ============================================================
@@ -80,9 +52,43 @@ J_{{\mathrm{{PMNS}}}} &= {pmns['J']:.6e},\\
 
 \paragraph{{Reproducibility.}}
 Scan step: {meta['step_deg']:.3f}$^\circ$. Output file: \texttt{{shared/paperV\_mixing\_results.tex}}.
+"""
+    if null is not None:
+        tex += null_paragraph(null)
+    return tex
+
+def null_paragraph(null):
+    """Haar / angle-conditioned null p-values of the measured phases (see golden_unification/mixing.py)."""
+    rows = []
+    for sector, pack in (("CKM", null["ckm"]), ("PMNS", null["pmns"])):
+        h, a = pack["haar"], pack["angles"]
+        rows.append(
+            rf"{sector} & ${pack['delta_obs_deg']:.1f}^\circ$ & ${pack['theta_pred_deg']:.1f}^\circ$ & "
+            rf"${h['score_sin']:.3e}$ & ${h['p_sin']:.4g}$ & ${h['p_deg']:.4g}$ & "
+            rf"${a['p_sin_exact']:.4g}$ & ${a['p_deg_exact']:.4g}$ \\"
+        )
+    body = "\n".join(rows)
+    return rf"""
+\paragraph{{Null models for the phase match.}}
+How often does a random mixing matrix match $\theta_{{\mathrm{{pred}}}}$ as well as the measured phase?
+Under a Haar-random $U(3)$ (angles and phase extracted rephasing-invariantly) and under the measured
+angles with $\delta$ uniform (the Haar measure is flat in $\delta$), we report
+$p=\Pr(\mathrm{{score}}_{{\mathrm{{null}}}}\le\mathrm{{score}}_{{\mathrm{{obs}}}})$ for the
+$|\sin\delta-\sin\theta_{{\mathrm{{pred}}}}|$ and angular-distance criteria.
+\begin{{center}}
+\begin{{tabular}}{{l c c c c c c c}}
+\hline
+Sector & $\delta_{{\mathrm{{meas}}}}$ & $\theta_{{\mathrm{{pred}}}}$ & $|\sin\delta-\sin\theta|$ &
+$p_{{\mathrm{{Haar}}}}^{{\sin}}$ & $p_{{\mathrm{{Haar}}}}^{{\angle}}$ & $p_{{\delta}}^{{\sin}}$ & $p_{{\delta}}^{{\angle}}$ \\
+\hline
+{body}
+\hline
+\end{{tabular}}
+\end{{center}}
+Haar: $N={null['ckm']['haar']['N']}$ matrices per sector (seed {null['seed']}); $p_\delta$ exact for uniform $\delta$.
 """
 
-def main():
+def main(argv=None):
     ap = argparse.ArgumentParser()
     ap.add_argument("--ckm_s12", type=float, default=0.2243)
     ap.add_argument("--ckm_s23", type=float, default=0.0422)
@@ -95,11 +101,18 @@ def main():
     ap.add_argument("--pmns_s13", type=float, default=math.sqrt(0.02220))
     ap.add_argument("--theta_pred_pmns_deg", type=float, default=69.0)
 
+    # Measured phases (for the null test of the match)
+    ap.add_argument("--ckm_delta_deg", type=float, default=65.7)
+    ap.add_argument("--pmns_delta_deg", type=float, default=197.0)
+    ap.add_argument("--null_N", type=int, default=0, help="Haar-random U(3) trials per sector (0: no null)")
+    ap.add_argument("--null_seed", type=int, default=1)
+    ap.add_argument("--null_workers", type=int, default=1)
+
     ap.add_argument("--step_deg", type=float, default=0.1)
     ap.add_argument("--write_tex", action="store_true")
     ap.add_argument("--out_tex", type=str, default="..\\shared\\paperV_mixing_results.tex")
 
-    args = ap.parse_args()
+    args = ap.parse_args(argv)
 
     # --- CKM ---
     ckm_best_sin = scan_delta_match_sin(
@@ -140,6 +153,29 @@ def main():
     print(f"match_score |sin(delta)-sin(theta_pred)|: {pmns_best_sin['score']:.3e}")
     print(f"J_pmns: {pmns_best_sin['J']:.6e}\n")
 
+    null = None
+    if args.null_N > 0:
+        from golden_unification.mixing import null_pack
+        null = {
+            "seed": args.null_seed,
+            "ckm": null_pack(args.theta_pred_ckm_deg, args.ckm_delta_deg,
+                             (args.ckm_s12, args.ckm_s23, args.ckm_s13),
+                             args.null_N, args.null_seed, args.null_workers),
+            "pmns": null_pack(args.theta_pred_pmns_deg, args.pmns_delta_deg,
+                              (args.pmns_s12, args.pmns_s23, args.pmns_s13),
+                              args.null_N, args.null_seed, args.null_workers),
+        }
+        print(f"Null tests of the measured phases (N={args.null_N} per sector):")
+        for sector in ("ckm", "pmns"):
+            pack = null[sector]
+            h, a = pack["haar"], pack["angles"]
+            print(f"[{sector}] delta_meas={pack['delta_obs_deg']:.1f}  |sin d - sin theta|={h['score_sin']:.3e}  "
+                  f"angle={h['score_deg']:.2f} deg")
+            print(f"  Haar U(3):      p_sin={h['p_sin']:.4g}  p_deg={h['p_deg']:.4g}  <|J|>={h['mean_abs_J']:.3e}")
+            print(f"  angles, uniform delta: p_sin={a['p_sin']:.4g} (exact {a['p_sin_exact']:.4g})  "
+                  f"p_deg={a['p_deg']:.4g} (exact {a['p_deg_exact']:.4g})")
+        print("")
+
     if args.write_tex:
         ckm_pack = {
             "s12": args.ckm_s12, "s23": args.ckm_s23, "s13": args.ckm_s13,
@@ -156,7 +192,7 @@ def main():
         }
         meta = {"step_deg": args.step_deg}
 
-        tex = latex_block(ckm_pack, pmns_pack, meta)
+        tex = latex_block(ckm_pack, pmns_pack, meta, null)
 
         # write UTF-8
         with open(args.out_tex, "w", encoding="utf-8") as f:
@@ -2,7 +2,8 @@
 param(
   [ValidateSet('MASTER','CORE_MASTER')][string[]]$Targets = @('MASTER','CORE_MASTER'),
   [switch]$Clean,
-  [switch]$UseLatexmk
+  [switch]$UseLatexmk,
+  [switch]$RefreshArtifacts
 )
 
 <#[
@@ -19,6 +20,9 @@ param(
 
   If -Clean is provided, common auxiliary files in papers/ are removed first.
 
+  If -RefreshArtifacts is provided, code/build_artifacts.py regenerates the
+  numerical shared/*.tex blocks first (cached: unchanged inputs are not rerun).
+
 .EXAMPLE
   powershell -NoProfile -ExecutionPolicy Bypass -File .\scripts\rx_build_papers.ps1
 
@@ -43,6 +47,12 @@ if ($Clean) {
   }
 }
 
+if ($RefreshArtifacts) {
+  Write-Host 'Refreshing generated shared/*.tex artifacts ...'
+  & python (Join-Path $repoRoot 'code\build_artifacts.py') | Out-Host
+  if ($LASTEXITCODE -ne 0) { throw 'build_artifacts.py failed' }
+}
+
 function Invoke-PdflatexTwice {
   param([Parameter(Mandatory=$true)][string]$BaseName)
 